@@ -0,0 +1,188 @@
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from domain.entities import ChatSession, Message, PageCursor, SearchHit
+from domain.ports import ChatRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    sessions: int = 0
+    messages: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class _Entry:
+    session: ChatSession
+    messages: int
+    bytes: int
+
+
+def _message_size(message: Message) -> int:
+    return len(message.content.encode("utf-8"))
+
+
+class CachingChatRepository(ChatRepository):
+    """
+    Write-through ChatRepository decorator keeping hot sessions in memory.
+
+    Writes go to the wrapped repository first and are then applied to the
+    cached copy, so a chat turn no longer reloads the whole history.
+    Sessions are evicted least-recently-used once the cache holds more than
+    max_messages messages or max_bytes of message content.
+    """
+
+    def __init__(
+        self,
+        inner: ChatRepository,
+        max_messages: int = 10_000,
+        max_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.inner = inner
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[UUID, _Entry]" = OrderedDict()
+        # Bumped on every write so a load racing with a write is not cached stale
+        self._generations: Dict[UUID, int] = {}
+        self._messages = 0
+        self._bytes = 0
+        self._stats = CacheStats()
+
+    def stats(self) -> CacheStats:
+        return replace(
+            self._stats, sessions=len(self._entries), messages=self._messages, bytes=self._bytes
+        )
+
+    def _bump(self, session_id: UUID) -> None:
+        self._generations[session_id] = self._generations.get(session_id, 0) + 1
+
+    def _store(self, session: ChatSession) -> None:
+        entry = _Entry(
+            session=session,
+            messages=len(session.messages),
+            bytes=sum(_message_size(m) for m in session.messages),
+        )
+        self._discard(session.id)
+        if entry.messages > self.max_messages or entry.bytes > self.max_bytes:
+            return
+        self._entries[session.id] = entry
+        self._messages += entry.messages
+        self._bytes += entry.bytes
+        self._evict()
+
+    def _discard(self, session_id: UUID) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._messages -= entry.messages
+            self._bytes -= entry.bytes
+
+    def _evict(self) -> None:
+        while self._entries and (
+            self._messages > self.max_messages or self._bytes > self.max_bytes
+        ):
+            session_id = next(iter(self._entries))
+            self._discard(session_id)
+            self._stats.evictions += 1
+
+    @staticmethod
+    def _copy(session: ChatSession) -> ChatSession:
+        # Callers may mutate the list (e.g. prepend a system prompt)
+        return replace(session, messages=list(session.messages))
+
+    async def get_session(self, session_id: UUID) -> Optional[ChatSession]:
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            self._entries.move_to_end(session_id)
+            self._stats.hits += 1
+            return self._copy(entry.session)
+
+        self._stats.misses += 1
+        generation = self._generations.get(session_id, 0)
+        session = await self.inner.get_session(session_id)
+        if session is not None and self._generations.get(session_id, 0) == generation:
+            self._store(self._copy(session))
+        return session
+
+    async def create_session(self, title: str, model_name: str) -> ChatSession:
+        session = await self.inner.create_session(title, model_name)
+        self._store(self._copy(session))
+        return session
+
+    async def add_message(self, session_id: UUID, message: Message) -> None:
+        await self.inner.add_message(session_id, message)
+        self._bump(session_id)
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return
+        if message.parent_id is not None and message.parent_id != entry.session.head_id:
+            # Started a new branch: the cached history no longer applies
+            self._discard(session_id)
+            return
+        entry.session.messages.append(message)
+        entry.session.updated_at = message.created_at
+        entry.session.head_id = message.id
+        size = _message_size(message)
+        entry.messages += 1
+        entry.bytes += size
+        self._messages += 1
+        self._bytes += size
+        self._entries.move_to_end(session_id)
+        self._evict()
+
+    async def fork_session(
+        self, session_id: UUID, message_id: Optional[UUID] = None, title: Optional[str] = None
+    ) -> Optional[ChatSession]:
+        return await self.inner.fork_session(session_id, message_id=message_id, title=title)
+
+    async def list_sessions(
+        self, limit: Optional[int] = None, before: Optional[PageCursor] = None
+    ) -> List[ChatSession]:
+        return await self.inner.list_sessions(limit=limit, before=before)
+
+    async def get_messages(
+        self, session_id: UUID, before: Optional[PageCursor] = None, limit: int = 50
+    ) -> List[Message]:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return await self.inner.get_messages(session_id, before=before, limit=limit)
+
+        self._entries.move_to_end(session_id)
+        self._stats.hits += 1
+        messages = entry.session.messages
+        if before is not None:
+            key = (before.timestamp, before.id)
+            messages = [m for m in messages if (m.created_at, m.id) < key]
+        return messages[-limit:] if limit > 0 else []
+
+    async def search_messages(
+        self, query: str, limit: int = 20, offset: int = 0, session_id: Optional[UUID] = None
+    ) -> List[SearchHit]:
+        return await self.inner.search_messages(
+            query, limit=limit, offset=offset, session_id=session_id
+        )
+
+    async def update_session_title(self, session_id: UUID, title: str) -> None:
+        await self.inner.update_session_title(session_id, title)
+        self._bump(session_id)
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            entry.session.title = title
+
+    async def delete_session(self, session_id: UUID) -> None:
+        await self.inner.delete_session(session_id)
+        self._bump(session_id)
+        self._discard(session_id)
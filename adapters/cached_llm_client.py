@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from domain.entities import GenerationStats, KeepAlive, Message, ModelInfo
+from domain.ports import LLMClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _DetailsEntry:
+    digest: str
+    details: Dict[str, Any]
+
+
+class CachingLLMClient(LLMClient):
+    """
+    LLMClient decorator caching model metadata.
+
+    list_models() is served from memory for `ttl` seconds; concurrent
+    refreshes share a single upstream request. show_model() results are
+    kept per model until its digest changes (re-pull) or it is deleted.
+    pull_model() and delete_model() invalidate the cache. Chat passes through.
+    Models are keyed by full name, so "llama3" and "llama3:latest" share
+    an entry.
+    """
+
+    def __init__(self, inner: LLMClient, ttl: float = 30.0):
+        self.inner = inner
+        self.ttl = ttl
+        self._models: Optional[List[ModelInfo]] = None
+        self._fetched_at = 0.0
+        self._refresh: Optional["asyncio.Task[List[ModelInfo]]"] = None
+        self._digests: Dict[str, str] = {}
+        self._details: Dict[str, _DetailsEntry] = {}
+        self._details_inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop the model listing and the details of `name` (or of all models)."""
+        self._models = None
+        if name is None:
+            self._details.clear()
+        else:
+            self._details.pop(ModelInfo.full_name(name), None)
+
+    async def list_models(self) -> List[ModelInfo]:
+        if self._models is not None and time.monotonic() - self._fetched_at < self.ttl:
+            return list(self._models)
+
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._fetch_models())
+        # shield: one caller being cancelled must not cancel the shared refresh
+        return list(await asyncio.shield(self._refresh))
+
+    async def _fetch_models(self) -> List[ModelInfo]:
+        models = await self.inner.list_models()
+        digests = {ModelInfo.full_name(m.name): m.digest for m in models}
+
+        # A changed or missing digest means the cached details are stale
+        for name, entry in list(self._details.items()):
+            if digests.get(name) != entry.digest:
+                del self._details[name]
+
+        self._digests = digests
+        self._models = models
+        self._fetched_at = time.monotonic()
+        return models
+
+    async def show_model(self, name: str) -> Dict[str, Any]:
+        key = ModelInfo.full_name(name)
+        entry = self._details.get(key)
+        if entry is not None and entry.digest == self._digests.get(key, entry.digest):
+            return dict(entry.details)
+
+        task = self._details_inflight.get(key)
+        if task is None or task.done():
+            task = asyncio.create_task(self._fetch_details(name, key))
+            self._details_inflight[key] = task
+        return dict(await asyncio.shield(task))
+
+    async def _fetch_details(self, name: str, key: str) -> Dict[str, Any]:
+        try:
+            details = await self.inner.show_model(name)
+            self._details[key] = _DetailsEntry(digest=self._digests.get(key, ""), details=details)
+            return details
+        finally:
+            self._details_inflight.pop(key, None)
+
+    def chat_stream(
+        self,
+        model: str,
+        messages: List[Message],
+        options: Optional[Dict[str, Any]] = None,
+        keep_alive: Optional[KeepAlive] = None,
+        stats: Optional[GenerationStats] = None,
+    ) -> AsyncIterator[str]:
+        return self.inner.chat_stream(
+            model=model, messages=messages, options=options, keep_alive=keep_alive, stats=stats
+        )
+
+    async def list_running_models(self) -> List[Dict[str, Any]]:
+        return await self.inner.list_running_models()
+
+    async def load_model(self, name: str, keep_alive: Optional[KeepAlive] = None) -> None:
+        await self.inner.load_model(name, keep_alive=keep_alive)
+
+    async def unload_model(self, name: str) -> None:
+        await self.inner.unload_model(name)
+
+    async def pull_model(self, name: str) -> AsyncIterator[dict]:
+        try:
+            async for progress in self.inner.pull_model(name):
+                yield progress
+        finally:
+            self.invalidate(name)
+
+    async def delete_model(self, name: str) -> bool:
+        try:
+            return await self.inner.delete_model(name)
+        finally:
+            self.invalidate(name)
+
+    async def embed(self, model: str, inputs: List[str]) -> List[List[float]]:
+        return await self.inner.embed(model, inputs)
@@ -1,111 +1,533 @@
 import logging
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
 from uuid import UUID
 
-from sqlalchemy import delete, desc, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import (
+    Text,
+    and_,
+    bindparam,
+    delete,
+    desc,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    type_coerce,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import aliased
 
-from adapters.db import SessionLocal
+from adapters.db import AsyncSessionLocal
 from adapters.orm import ChatSessionModel, MessageModel
-from domain.entities import ChatSession, Message, Role
+from domain.entities import ChatSession, Message, PageCursor, Role, SearchHit
 from domain.ports import ChatRepository
 
 logger = logging.getLogger(__name__)
 
+SNIPPET_TOKENS = 16
+
+# History reads select plain columns and build domain messages straight from
+# the rows: no ORM identity map, and metadata stays raw JSON text until used.
+MESSAGE_COLUMNS = (
+    MessageModel.id,
+    MessageModel.role,
+    MessageModel.content,
+    MessageModel.created_at,
+    type_coerce(MessageModel.metadata_, Text).label("metadata"),
+    MessageModel.parent_id,
+)
+SESSION_COLUMNS = (
+    ChatSessionModel.id,
+    ChatSessionModel.title,
+    ChatSessionModel.created_at,
+    ChatSessionModel.updated_at,
+    ChatSessionModel.model_name,
+    ChatSessionModel.head_id,
+    ChatSessionModel.forked_from_id,
+)
+
+FTS_SEARCH_SQL = """
+SELECT m.id, m.session_id, s.title, m.role, m.created_at,
+       snippet(messages_fts, 0, '**', '**', '…', :tokens) AS snippet,
+       bm25(messages_fts) AS rank
+FROM messages_fts
+JOIN messages AS m ON m.rowid = messages_fts.rowid
+JOIN chat_sessions AS s ON s.id = m.session_id
+WHERE messages_fts MATCH :query {session_filter}
+ORDER BY rank
+LIMIT :limit OFFSET :offset
+"""
+
+
+def branch_history(start: Any, limit: Optional[int] = None) -> Any:
+    """
+    Messages from `start` (a message id or scalar subquery) back to the
+    root, following parent links with a recursive CTE, returned oldest
+    first; at most `limit` of them. One primary-key lookup per message, so
+    the cost depends on the branch length only, not on how many other
+    messages or forks exist.
+    """
+    parent = aliased(MessageModel)
+    branch = (
+        select(MessageModel.id, MessageModel.parent_id, literal(0).label("depth"))
+        .where(MessageModel.id == start)
+        .cte("branch", recursive=True)
+    )
+    step = select(parent.id, parent.parent_id, branch.c.depth + 1).where(
+        parent.id == branch.c.parent_id
+    )
+    if limit is not None:
+        step = step.where(branch.c.depth + 1 < limit)
+    branch = branch.union_all(step)
+    return (
+        select(*MESSAGE_COLUMNS)
+        .join(branch, MessageModel.id == branch.c.id)
+        .order_by(desc(branch.c.depth))
+    )
+
+
+def to_fts_query(query: str) -> str:
+    """
+    Quote each whitespace-separated term so user input can't inject FTS5
+    syntax. Terms are implicitly ANDed; the last one matches as a prefix.
+    """
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
 
 class SqlAlchemyChatRepository(ChatRepository):
     """
     SQLAlchemy implementation of the ChatRepository port.
+
+    Runs on the async engine (aiosqlite for SQLite) so database I/O yields
+    to the event loop instead of stalling concurrent chat streams.
+
+    Messages are stored as a tree (parent_id) and each session points at
+    the last message of its branch (head_id). A fork is a new session
+    whose head is an existing message: one row, however long the history.
+    Messages belong to the session that created them (session_id); a
+    deleted session hands the messages its forks still use over to them.
     """
 
-    def _to_domain_session(self, model: ChatSessionModel) -> ChatSession:
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal):
+        self._session_factory = session_factory
+
+    @staticmethod
+    def _to_domain_session(
+        id: str,
+        title: str,
+        created_at: datetime,
+        updated_at: datetime,
+        model_name: str,
+        head_id: Optional[str] = None,
+        forked_from_id: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+    ) -> ChatSession:
         return ChatSession(
-            id=UUID(model.id),
-            title=model.title,
-            created_at=model.created_at,
-            updated_at=model.updated_at,
-            model_name=model.model_name,
-            messages=[
-                Message(
-                    id=UUID(m.id),
-                    role=Role(m.role),
-                    content=m.content,
-                    created_at=m.created_at,
-                    metadata=m.metadata_,
-                )
-                for m in model.messages
-            ],
+            id=UUID(id),
+            title=title,
+            created_at=created_at,
+            updated_at=updated_at,
+            model_name=model_name,
+            messages=messages if messages is not None else [],
+            head_id=UUID(head_id) if head_id else None,
+            forked_from_id=UUID(forked_from_id) if forked_from_id else None,
         )
 
     async def get_session(self, session_id: UUID) -> Optional[ChatSession]:
-        with SessionLocal() as db:
-            stmt = (
-                select(ChatSessionModel)
-                .options(selectinload(ChatSessionModel.messages))
-                .where(ChatSessionModel.id == str(session_id))
-            )
-            model = db.execute(stmt).scalar_one_or_none()
-            if model:
-                return self._to_domain_session(model)
-            return None
+        sid = str(session_id)
+        async with self._session_factory() as db:
+            session_row = (
+                await db.execute(select(*SESSION_COLUMNS).where(ChatSessionModel.id == sid))
+            ).first()
+            if session_row is None:
+                return None
+            messages: List[Message] = []
+            if session_row.head_id is not None:
+                rows = await db.execute(branch_history(session_row.head_id))
+                from_row = Message.from_row
+                messages = [from_row(*row) for row in rows]
+            return self._to_domain_session(*session_row, messages=messages)
 
     async def create_session(self, title: str, model_name: str) -> ChatSession:
-        with SessionLocal() as db:
+        async with self._session_factory() as db:
             model = ChatSessionModel(title=title, model_name=model_name)
             db.add(model)
-            db.commit()
-            db.refresh(model)
-            return self._to_domain_session(model)
+            await db.commit()
+            # A new session has no messages; avoid a lazy load on the relationship
+            return self._to_domain_session(
+                model.id, model.title, model.created_at, model.updated_at, model.model_name
+            )
 
     async def add_message(self, session_id: UUID, message: Message) -> None:
-        with SessionLocal() as db:
-            model = MessageModel(
-                id=str(message.id),
-                session_id=str(session_id),
-                role=message.role.value,
-                content=message.content,
-                created_at=message.created_at,
-                metadata_=message.metadata,
+        await self.add_messages([(session_id, message)])
+
+    async def add_messages(self, items: Sequence[Tuple[UUID, Message]]) -> None:
+        """
+        Append many messages to their sessions' branches and bump the
+        sessions' head and updated_at in one transaction: one SELECT of the
+        heads, one bulk INSERT and one bulk UPDATE by primary key. Messages
+        without a parent_id are chained onto the head in order. Messages of
+        sessions that no longer exist (a reply finishing after its session
+        was deleted) are dropped.
+        """
+        if not items:
+            return
+
+        async with self._session_factory() as db:
+            heads = await self._heads(db, {str(sid) for sid, _ in items})
+            orphans = [sid for sid, _ in items if str(sid) not in heads]
+            if orphans:
+                logger.warning(
+                    f"Dropping {len(orphans)} messages of deleted sessions: "
+                    f"{', '.join(sorted({str(sid) for sid in orphans}))}"
+                )
+                items = [(sid, m) for sid, m in items if str(sid) in heads]
+                if not items:
+                    return
+
+            latest: Dict[str, datetime] = {}
+            for session_id, message in items:
+                sid = str(session_id)
+                if sid not in latest or message.created_at > latest[sid]:
+                    latest[sid] = message.created_at
+
+            for session_id, message in items:
+                sid = str(session_id)
+                if message.parent_id is None and heads.get(sid):
+                    message.parent_id = UUID(heads[sid])
+                heads[sid] = str(message.id)
+            await db.execute(insert(MessageModel), self._message_rows(items))
+            # Update session heads and timestamps. A Core executemany on the table
+            # rather than the ORM bulk UPDATE, which fails if a session was
+            # deleted meanwhile
+            sessions = ChatSessionModel.__table__
+            await db.execute(
+                update(sessions)
+                .where(sessions.c.id == bindparam("b_id"))
+                .values(updated_at=bindparam("b_updated_at"), head_id=bindparam("b_head_id")),
+                [
+                    {"b_id": sid, "b_updated_at": ts, "b_head_id": heads[sid]}
+                    for sid, ts in latest.items()
+                ],
             )
-            db.add(model)
-            # Update session timestamp
-            session_stmt = select(ChatSessionModel).where(ChatSessionModel.id == str(session_id))
-            session = db.execute(session_stmt).scalar_one()
-            session.updated_at = message.created_at
-
-            db.commit()
-
-    async def list_sessions(self) -> List[ChatSession]:
-        with SessionLocal() as db:
-            # For listing, we might not need all messages, but for simplicity we load them or just header info
-            # Optimization: don't load messages for list view if not needed.
-            # Here we keep it simple.
-            stmt = select(ChatSessionModel).order_by(desc(ChatSessionModel.updated_at))
-            models = db.execute(stmt).scalars().all()
-            # We map without messages for the list view to be faster?
-            # Let's return full objects for consistency for now, but in prod we'd split this.
-            return [
-                ChatSession(
-                    id=UUID(m.id),
-                    title=m.title,
-                    created_at=m.created_at,
-                    updated_at=m.updated_at,
-                    model_name=m.model_name,
-                    messages=[],  # Lazy load optimization: empty messages in list view
+            await db.commit()
+
+    @staticmethod
+    async def _heads(db: AsyncSession, session_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        rows = await db.execute(
+            select(ChatSessionModel.id, ChatSessionModel.head_id).where(
+                ChatSessionModel.id.in_(list(session_ids))
+            )
+        )
+        return dict(rows.all())
+
+    @staticmethod
+    def _message_rows(items: Sequence[Tuple[UUID, Message]]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": str(message.id),
+                "session_id": str(session_id),
+                "role": message.role.value,
+                "content": message.content,
+                "created_at": message.created_at,
+                "metadata_": message.metadata,
+                "parent_id": str(message.parent_id) if message.parent_id is not None else None,
+            }
+            for session_id, message in items
+        ]
+
+    async def list_sessions(
+        self, limit: Optional[int] = None, before: Optional[PageCursor] = None
+    ) -> List[ChatSession]:
+        async with self._session_factory() as db:
+            stmt = select(*SESSION_COLUMNS).order_by(
+                desc(ChatSessionModel.updated_at), desc(ChatSessionModel.id)
+            )
+            if before is not None:
+                # Keyset: strictly after the cursor in (updated_at, id) DESC order
+                stmt = stmt.where(
+                    or_(
+                        ChatSessionModel.updated_at < before.timestamp,
+                        and_(
+                            ChatSessionModel.updated_at == before.timestamp,
+                            ChatSessionModel.id < str(before.id),
+                        ),
+                    )
                 )
-                for m in models
-            ]
+            if limit is not None:
+                stmt = stmt.limit(limit)
+            rows = await db.execute(stmt)
+            # Lazy load optimization: empty messages in list view
+            return [self._to_domain_session(*row) for row in rows]
+
+    async def get_messages(
+        self, session_id: UUID, before: Optional[PageCursor] = None, limit: int = 50
+    ) -> List[Message]:
+        if limit <= 0:
+            return []
+        # Walk back from the head, or from the message before the cursor
+        if before is None:
+            start = (
+                select(ChatSessionModel.head_id)
+                .where(ChatSessionModel.id == str(session_id))
+                .scalar_subquery()
+            )
+        else:
+            start = (
+                select(MessageModel.parent_id)
+                .where(MessageModel.id == str(before.id))
+                .scalar_subquery()
+            )
+        async with self._session_factory() as db:
+            rows = await db.execute(branch_history(start, limit))
+            from_row = Message.from_row
+            return [from_row(*row) for row in rows]
+
+    async def fork_session(
+        self, session_id: UUID, message_id: Optional[UUID] = None, title: Optional[str] = None
+    ) -> Optional[ChatSession]:
+        async with self._session_factory() as db:
+            source = (
+                await db.execute(
+                    select(*SESSION_COLUMNS).where(ChatSessionModel.id == str(session_id))
+                )
+            ).first()
+            if source is None:
+                return None
+            fork_at = source.head_id
+            if message_id is not None:
+                fork_at = str(message_id)
+                found = await db.execute(select(MessageModel.id).where(MessageModel.id == fork_at))
+                if found.first() is None:
+                    raise ValueError(f"Message {message_id} not found")
+            model = ChatSessionModel(
+                title=title or source.title,
+                model_name=source.model_name,
+                head_id=fork_at,
+                forked_from_id=fork_at,
+            )
+            db.add(model)
+            await db.commit()
+            return self._to_domain_session(
+                model.id,
+                model.title,
+                model.created_at,
+                model.updated_at,
+                model.model_name,
+                model.head_id,
+                model.forked_from_id,
+            )
 
     async def update_session_title(self, session_id: UUID, title: str) -> None:
-        with SessionLocal() as db:
+        async with self._session_factory() as db:
             stmt = select(ChatSessionModel).where(ChatSessionModel.id == str(session_id))
-            model = db.execute(stmt).scalar_one_or_none()
+            model = (await db.execute(stmt)).scalar_one_or_none()
             if model:
                 model.title = title
-                db.commit()
+                await db.commit()
+
+    async def search_messages(
+        self, query: str, limit: int = 20, offset: int = 0, session_id: Optional[UUID] = None
+    ) -> List[SearchHit]:
+        fts_query = to_fts_query(query)
+        if not fts_query:
+            return []
+
+        async with self._session_factory() as db:
+            if db.bind.dialect.name != "sqlite":
+                return await self._search_like(db, query, limit, offset, session_id)
+
+            params: Dict[str, object] = {
+                "query": fts_query,
+                "tokens": SNIPPET_TOKENS,
+                "limit": limit,
+                "offset": offset,
+            }
+            session_filter = ""
+            if session_id is not None:
+                session_filter = "AND m.session_id = :session_id"
+                params["session_id"] = str(session_id)
+
+            stmt = text(FTS_SEARCH_SQL.format(session_filter=session_filter))
+            rows = (await db.execute(stmt, params)).all()
+            return [
+                SearchHit(
+                    message_id=UUID(row.id),
+                    session_id=UUID(row.session_id),
+                    session_title=row.title,
+                    role=Role(row.role),
+                    created_at=(
+                        datetime.fromisoformat(row.created_at)
+                        if isinstance(row.created_at, str)
+                        else row.created_at
+                    ),
+                    snippet=row.snippet,
+                    rank=row.rank,
+                )
+                for row in rows
+            ]
+
+    async def _search_like(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int,
+        offset: int,
+        session_id: Optional[UUID],
+    ) -> List[SearchHit]:
+        """Fallback for databases without FTS5: unranked substring match."""
+        stmt = (
+            select(MessageModel, ChatSessionModel.title)
+            .join(ChatSessionModel, ChatSessionModel.id == MessageModel.session_id)
+            .where(MessageModel.content.ilike(f"%{query}%"))
+            .order_by(desc(MessageModel.created_at))
+            .limit(limit)
+            .offset(offset)
+        )
+        if session_id is not None:
+            stmt = stmt.where(MessageModel.session_id == str(session_id))
+        rows = (await db.execute(stmt)).all()
+        return [
+            SearchHit(
+                message_id=UUID(m.id),
+                session_id=UUID(m.session_id),
+                session_title=title,
+                role=Role(m.role),
+                created_at=m.created_at,
+                snippet=m.content[:200],
+                rank=0.0,
+            )
+            for m, title in rows
+        ]
 
     async def delete_session(self, session_id: UUID) -> None:
-        with SessionLocal() as db:
+        async with self._session_factory() as db:
+            # Messages forks still share move to the oldest such fork
+            handover: Dict[str, str] = {}
+            for fork_id, message_id in await db.execute(self._shared_with_forks(str(session_id))):
+                handover.setdefault(message_id, fork_id)
+            if handover:
+                await db.execute(
+                    update(MessageModel),
+                    [{"id": mid, "session_id": fork_id} for mid, fork_id in handover.items()],
+                )
+            # Core DELETE bypasses the ORM cascade; remove messages explicitly so
+            # they don't linger as orphans (and in the search index).
+            await db.execute(delete(MessageModel).where(MessageModel.session_id == str(session_id)))
             stmt = delete(ChatSessionModel).where(ChatSessionModel.id == str(session_id))
-            db.execute(stmt)
-            db.commit()
+            await db.execute(stmt)
+            await db.commit()
+
+    @staticmethod
+    def _shared_with_forks(sid: str) -> Any:
+        """
+        (fork id, message id) for `sid`'s messages that other forks use,
+        oldest fork first. Only forks whose branch can reach `sid`'s
+        messages are walked: those forked at one of them, and those that
+        own their fork point because it was handed over to them (their
+        branch may continue into any session's messages).
+        """
+        fork_point, parent = aliased(MessageModel), aliased(MessageModel)
+        forks = select(
+            ChatSessionModel.id.label("fork_id"),
+            ChatSessionModel.created_at.label("forked_at"),
+            ChatSessionModel.forked_from_id.label("id"),
+        ).join(fork_point, fork_point.id == ChatSessionModel.forked_from_id)
+        chain = forks.where(fork_point.session_id == sid, ChatSessionModel.id != sid).cte(
+            "chain", recursive=True
+        )
+        chain = chain.union_all(
+            forks.where(fork_point.session_id == ChatSessionModel.id, ChatSessionModel.id != sid),
+            select(chain.c.fork_id, chain.c.forked_at, parent.parent_id).where(
+                parent.id == chain.c.id, parent.parent_id.is_not(None)
+            ),
+        )
+        return (
+            select(chain.c.fork_id, MessageModel.id)
+            .join(MessageModel, MessageModel.id == chain.c.id)
+            .where(MessageModel.session_id == sid)
+            .order_by(chain.c.forked_at)
+        )
+
+    async def stream_sessions(self, batch_size: int = 1000) -> AsyncIterator[ChatSession]:
+        async with self._session_factory() as db:
+            stmt = (
+                select(*SESSION_COLUMNS)
+                .order_by(ChatSessionModel.created_at, ChatSessionModel.id)
+                .execution_options(yield_per=batch_size)
+            )
+            result = await db.stream(stmt)
+            async for row in result:
+                yield self._to_domain_session(*row)
+
+    async def stream_messages(self, batch_size: int = 1000) -> AsyncIterator[Tuple[UUID, Message]]:
+        async with self._session_factory() as db:
+            stmt = (
+                select(MessageModel.session_id, *MESSAGE_COLUMNS)
+                .order_by(MessageModel.session_id, MessageModel.created_at, MessageModel.id)
+                .execution_options(yield_per=batch_size)
+            )
+            result = await db.stream(stmt)
+            from_row = Message.from_row
+            async for session_id, *columns in result:
+                yield UUID(session_id), from_row(*columns)
+
+    async def import_sessions(self, sessions: Sequence[ChatSession]) -> List[UUID]:
+        if not sessions:
+            return []
+        async with self._session_factory() as db:
+            ids = [str(s.id) for s in sessions]
+            existing = set(
+                (
+                    await db.execute(
+                        select(ChatSessionModel.id).where(ChatSessionModel.id.in_(ids))
+                    )
+                ).scalars()
+            )
+            rows = [
+                {
+                    "id": str(s.id),
+                    "title": s.title,
+                    "created_at": s.created_at,
+                    "updated_at": s.updated_at,
+                    "model_name": s.model_name,
+                    "head_id": str(s.head_id) if s.head_id else None,
+                    "forked_from_id": str(s.forked_from_id) if s.forked_from_id else None,
+                }
+                for s in sessions
+                if str(s.id) not in existing
+            ]
+            if rows:
+                await db.execute(insert(ChatSessionModel), rows)
+            await db.commit()
+        return [UUID(sid) for sid in existing]
+
+    async def import_messages(self, items: Sequence[Tuple[UUID, Message]]) -> None:
+        """
+        Insert messages as-is. A message continuing its session's head
+        becomes the new head, so sessions imported without one (older
+        archives) end up pointing at their last message.
+        """
+        if not items:
+            return
+        async with self._session_factory() as db:
+            heads = await self._heads(db, {str(sid) for sid, _ in items})
+            moved: Dict[str, str] = {}
+            for session_id, message in items:
+                sid = str(session_id)
+                parent = str(message.parent_id) if message.parent_id is not None else None
+                if sid in heads and heads[sid] == parent:
+                    heads[sid] = moved[sid] = str(message.id)
+            await db.execute(insert(MessageModel), self._message_rows(items))
+            if moved:
+                await db.execute(
+                    update(ChatSessionModel),
+                    [{"id": sid, "head_id": head} for sid, head in moved.items()],
+                )
+            await db.commit()
@@ -0,0 +1,269 @@
+import asyncio
+import logging
+import time
+from contextlib import aclosing, asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from domain.entities import (
+    BackendHealth,
+    CircuitState,
+    GenerationStats,
+    KeepAlive,
+    Message,
+    ModelInfo,
+)
+from domain.exceptions import (
+    LLMConnectionError,
+    LLMException,
+    LLMTimeoutError,
+    LLMUnavailableError,
+)
+from domain.ports import LLMClient
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreakerLLMClient(LLMClient):
+    """
+    LLMClient decorator that stops sending requests to a backend that is down.
+
+    - closed: requests pass through; `failure_threshold` consecutive
+      connection failures (LLMConnectionError: refused, timed out, 503)
+      open the circuit.
+    - open: requests fail at once with LLMUnavailableError. After
+      `reset_timeout` seconds the circuit goes half-open.
+    - half-open: up to `half_open_max_calls` trial requests go through.
+      A success closes the circuit; a failure re-opens it, doubling the
+      reset timeout up to `max_reset_timeout`.
+
+    Any other outcome (a reply, even an error like "model not found")
+    counts as the backend being up. A background prober (start()/stop())
+    lists models when there has been no successful request for
+    `probe_interval` seconds, so an outage is noticed before a user hits
+    it, and recovery closes the circuit without waiting for traffic.
+    """
+
+    def __init__(
+        self,
+        inner: LLMClient,
+        failure_threshold: int = 3,
+        reset_timeout: float = 5.0,
+        max_reset_timeout: float = 60.0,
+        half_open_max_calls: int = 1,
+        probe_interval: float = 10.0,
+        probe_timeout: float = 3.0,
+    ):
+        self.inner = inner
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._trials = 0
+        self._open_for = reset_timeout
+        self._open_until = 0.0
+        self._last_error: Optional[str] = None
+        self._last_failure_at: Optional[datetime] = None
+        self._last_success = 0.0
+        self._last_probe = 0.0
+        self._prober: Optional[asyncio.Task[None]] = None
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def health(self) -> BackendHealth:
+        retry_in = None
+        if self._state == CircuitState.OPEN:
+            retry_in = max(self._open_until - time.monotonic(), 0.0)
+        return BackendHealth(
+            state=self._state,
+            consecutive_failures=self._failures,
+            last_error=self._last_error,
+            last_failure_at=self._last_failure_at,
+            retry_in=retry_in,
+        )
+
+    # --- State machine ---
+
+    def _admit(self) -> bool:
+        """Raise LLMUnavailableError if the request may not go through; True for a trial."""
+        if self._state == CircuitState.OPEN:
+            remaining = self._open_until - time.monotonic()
+            if remaining > 0:
+                raise LLMUnavailableError(
+                    f"LLM backend unavailable, retrying in {remaining:.0f}s: {self._last_error}"
+                )
+            self._transition(CircuitState.HALF_OPEN)
+        if self._state == CircuitState.HALF_OPEN:
+            if self._trials >= self.half_open_max_calls:
+                raise LLMUnavailableError("LLM backend is recovering, try again shortly")
+            self._trials += 1
+            return True
+        return False
+
+    def _on_success(self) -> None:
+        self._last_success = time.monotonic()
+        self._failures = 0
+        if self._state != CircuitState.CLOSED:
+            self._open_for = self.reset_timeout
+            self._transition(CircuitState.CLOSED)
+
+    def _on_failure(self, error: Exception) -> None:
+        self._failures += 1
+        self._last_error = str(error)
+        self._last_failure_at = datetime.now()
+        if self._state == CircuitState.HALF_OPEN:
+            self._open_for = min(self._open_for * 2, self.max_reset_timeout)
+            self._open()
+        elif self._state == CircuitState.CLOSED and self._failures >= self.failure_threshold:
+            self._open()
+        # Already open: a request admitted earlier failed late; keep the timer
+
+    def _open(self) -> None:
+        self._open_until = time.monotonic() + self._open_for
+        self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        previous, self._state = self._state, state
+        if state == CircuitState.OPEN:
+            logger.warning(
+                f"LLM backend circuit open after {self._failures} failures, "
+                f"retrying in {self._open_for:.0f}s: {self._last_error}"
+            )
+        elif state == CircuitState.CLOSED:
+            logger.info(f"LLM backend recovered (circuit closed, was {previous.value})")
+        else:
+            logger.info("LLM backend circuit half-open, sending a trial request")
+
+    @asynccontextmanager
+    async def _guard(self) -> AsyncIterator[None]:
+        trial = self._admit()
+        try:
+            yield
+        except LLMUnavailableError:
+            raise  # from a nested breaker: says nothing new
+        except LLMConnectionError as e:
+            self._on_failure(e)
+            raise
+        except LLMException:
+            self._on_success()  # the backend replied, with an error
+            raise
+        else:
+            self._on_success()
+        finally:
+            if trial:
+                self._trials -= 1
+
+    # --- Health probing ---
+
+    async def start(self) -> None:
+        if self._prober is None or self._prober.done():
+            self._prober = asyncio.create_task(self._probe_loop(), name="llm-health-prober")
+
+    async def stop(self) -> None:
+        if self._prober is not None:
+            self._prober.cancel()
+            try:
+                await self._prober
+            except asyncio.CancelledError:
+                pass
+            self._prober = None
+
+    def _probe_delay(self) -> float:
+        if self._state == CircuitState.OPEN:
+            return max(self._open_until - time.monotonic(), 0.0)
+        # Recent traffic (or the last probe) already tells us the state
+        last = max(self._last_success, self._last_probe)
+        return max(last + self.probe_interval - time.monotonic(), 0.0)
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._probe_delay())
+            if self._probe_delay() > 0:
+                continue  # a request succeeded meanwhile
+            try:
+                await self.probe()
+            except Exception as e:  # never let the prober die
+                logger.error(f"LLM health probe failed unexpectedly: {e}")
+
+    async def probe(self) -> bool:
+        """One health check through the breaker (a trial while half-open); True if it answered."""
+        self._last_probe = time.monotonic()
+        try:
+            async with self._guard():
+                try:
+                    async with asyncio.timeout(self.probe_timeout):
+                        await self.inner.list_models()
+                except TimeoutError as e:
+                    raise LLMTimeoutError(
+                        f"Health probe got no answer in {self.probe_timeout}s"
+                    ) from e
+            return True
+        except LLMConnectionError as e:
+            logger.debug(f"LLM health probe failed: {e}")
+            return False
+
+    # --- LLMClient ---
+
+    async def list_models(self) -> List[ModelInfo]:
+        async with self._guard():
+            return await self.inner.list_models()
+
+    async def show_model(self, name: str) -> Dict[str, Any]:
+        async with self._guard():
+            return await self.inner.show_model(name)
+
+    async def chat_stream(
+        self,
+        model: str,
+        messages: List[Message],
+        options: Optional[Dict[str, Any]] = None,
+        keep_alive: Optional[KeepAlive] = None,
+        stats: Optional[GenerationStats] = None,
+    ) -> AsyncIterator[str]:
+        async with self._guard():
+            stream = self.inner.chat_stream(
+                model=model, messages=messages, options=options, keep_alive=keep_alive, stats=stats
+            )
+            async with aclosing(stream):
+                first = True
+                async for chunk in stream:
+                    if first:
+                        # Tokens are flowing: close the circuit now rather
+                        # than when a long generation ends
+                        self._on_success()
+                        first = False
+                    yield chunk
+
+    async def list_running_models(self) -> List[Dict[str, Any]]:
+        async with self._guard():
+            return await self.inner.list_running_models()
+
+    async def load_model(self, name: str, keep_alive: Optional[KeepAlive] = None) -> None:
+        async with self._guard():
+            await self.inner.load_model(name, keep_alive=keep_alive)
+
+    async def unload_model(self, name: str) -> None:
+        async with self._guard():
+            await self.inner.unload_model(name)
+
+    async def pull_model(self, name: str) -> AsyncIterator[dict]:
+        async with self._guard():
+            stream = self.inner.pull_model(name)
+            async with aclosing(stream):
+                async for progress in stream:
+                    yield progress
+
+    async def delete_model(self, name: str) -> bool:
+        async with self._guard():
+            return await self.inner.delete_model(name)
+
+    async def embed(self, model: str, inputs: List[str]) -> List[List[float]]:
+        async with self._guard():
+            return await self.inner.embed(model, inputs)
@@ -1,11 +1,16 @@
 import logging
 import os
-from typing import Generator
+import time
+from typing import Any, Dict, Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from infra.config import get_settings
+from infra.tracing import current_span
 
 logger = logging.getLogger(__name__)
 
@@ -36,8 +41,111 @@ if settings.DATABASE_URL.startswith("sqlite"):
 
 engine = create_engine(settings.DATABASE_URL, connect_args=connect_args, pool_pre_ping=True)
 
+
+def apply_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    """
+    Per-connection SQLite tuning (SQLITE_* settings). WAL lets readers run
+    alongside the writer; synchronous=NORMAL is durable under WAL except
+    for the last transactions on power loss.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+if settings.DATABASE_URL.startswith("sqlite") and settings.SQLITE_PERFORMANCE_MODE:
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+
+
+def _query_started(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _query_finished(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    elapsed_ms = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+    span = current_span()
+    if span is not None:
+        span.add("db.statements", 1)
+        span.add("db.time_ms", round(elapsed_ms, 3))
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold is not None and elapsed_ms >= threshold:
+        compact = " ".join(statement.split())
+        logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {compact[:500]}")
+        if span is not None:
+            span.add("db.slow_statements", 1)
+
+
+def instrument_queries(sync_engine: Any) -> None:
+    """
+    Time every statement: add the DB time to the current trace span and
+    log statements slower than SLOW_QUERY_THRESHOLD_MS.
+    """
+    event.listen(sync_engine, "before_cursor_execute", _query_started)
+    event.listen(sync_engine, "after_cursor_execute", _query_finished)
+
+
+if settings.SLOW_QUERY_THRESHOLD_MS is not None or settings.TRACING_ENABLED:
+    instrument_queries(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers used by the repositories so DB I/O never blocks the event loop
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Map a sync database URL to its async driver equivalent.
+    URLs that already name a driver (e.g. sqlite+aiosqlite://) are kept as-is.
+    """
+    parsed = make_url(url)
+    if "+" in parsed.drivername:
+        return url
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        raise ValueError(f"No async driver known for database URL: {parsed.drivername}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _create_async_engine() -> AsyncEngine:
+    url = to_async_url(settings.DATABASE_URL)
+    kwargs: Dict[str, Any] = {"pool_pre_ping": True}
+
+    if url.startswith("sqlite") and (":memory:" in url or url.endswith("://")):
+        # In-memory SQLite only exists on a single connection
+        kwargs["poolclass"] = StaticPool
+    else:
+        kwargs["pool_size"] = settings.DATABASE_POOL_SIZE
+        kwargs["max_overflow"] = settings.DATABASE_MAX_OVERFLOW
+        kwargs["pool_timeout"] = settings.DATABASE_POOL_TIMEOUT
+
+    async_engine = create_async_engine(url, **kwargs)
+    if url.startswith("sqlite") and settings.SQLITE_PERFORMANCE_MODE:
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    if settings.SLOW_QUERY_THRESHOLD_MS is not None or settings.TRACING_ENABLED:
+        instrument_queries(async_engine.sync_engine)
+    return async_engine
+
+
+async_engine = _create_async_engine()
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -63,3 +171,21 @@ def init_db() -> None:
     from adapters.orm import Base
 
     Base.metadata.create_all(bind=engine)
+
+
+async def init_db_async() -> None:
+    """
+    Async variant of init_db() running on the async engine.
+    """
+    from adapters.orm import Base
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def dispose_engines() -> None:
+    """
+    Close pooled connections. Call on application shutdown.
+    """
+    await async_engine.dispose()
+    engine.dispose()
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import os
+import re
+from html import unescape
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+from domain.entities import Document
+
+logger = logging.getLogger(__name__)
+
+TEXT_EXTENSIONS = frozenset(
+    {".txt", ".md", ".markdown", ".rst", ".html", ".htm", ".csv", ".json", ".yaml", ".yml",
+     ".toml", ".ini", ".log", ".py", ".js", ".ts", ".java", ".go", ".rs", ".c", ".h", ".cpp",
+     ".sh", ".sql"}
+)  # fmt: skip
+
+_HTML_DROP = re.compile(r"<(script|style)\b.*?</\1>", re.IGNORECASE | re.DOTALL)
+_HTML_BLOCK = re.compile(r"</?(p|div|br|li|h[1-6]|tr|section|article)\b[^>]*>", re.IGNORECASE)
+_HTML_TAG = re.compile(r"<[^>]+>")
+
+
+def html_to_text(html: str) -> str:
+    """Rough HTML to text: drop scripts and styles, block tags become paragraph breaks."""
+    text = _HTML_DROP.sub(" ", html)
+    text = _HTML_BLOCK.sub("\n\n", text)
+    return unescape(_HTML_TAG.sub("", text))
+
+
+def _walk(paths: Iterable[str], extensions: frozenset) -> Iterator[str]:
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in extensions:
+                    yield os.path.join(root, name)
+
+
+def _read(path: str, max_bytes: int) -> Optional[str]:
+    if os.path.getsize(path) > max_bytes:
+        logger.warning(f"Skipping {path}: larger than {max_bytes} bytes")
+        return None
+    with open(path, "rb") as f:
+        raw = f.read()
+    if b"\0" in raw[:8192]:
+        logger.warning(f"Skipping {path}: not a text file")
+        return None
+    text = raw.decode("utf-8", errors="replace")
+    if os.path.splitext(path)[1].lower() in (".html", ".htm"):
+        text = html_to_text(text)
+    return text
+
+
+async def load_documents(
+    paths: Iterable[str],
+    extensions: frozenset = TEXT_EXTENSIONS,
+    max_bytes: int = 20 * 1024 * 1024,
+) -> AsyncIterator[Document]:
+    """
+    Documents from files and directories (walked recursively, hidden
+    directories skipped), read one at a time in a worker thread. Files
+    given explicitly are read whatever their extension.
+    """
+    for path in _walk(paths, extensions):
+        try:
+            text = await asyncio.to_thread(_read, path, max_bytes)
+        except OSError as e:
+            logger.warning(f"Skipping {path}: {e}")
+            continue
+        if text and text.strip():
+            yield Document(source=path, text=text)
@@ -0,0 +1,120 @@
+import logging
+from typing import List, Optional, Sequence, Set
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from adapters.db import AsyncSessionLocal
+from adapters.orm import DocumentChunkModel, DocumentModel
+from domain.entities import DocumentChunk
+from domain.ports import DocumentStore
+
+logger = logging.getLogger(__name__)
+
+
+class SqlAlchemyDocumentStore(DocumentStore):
+    """
+    Documents and chunk text in the application database. Vectors are not
+    stored here: a chunk's id is its row in the VectorIndex.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal):
+        self._session_factory = session_factory
+
+    async def begin_document(self, source: str, content_hash: str) -> Optional[UUID]:
+        lookup = select(DocumentModel.id, DocumentModel.chunk_count).where(
+            DocumentModel.content_hash == content_hash
+        )
+        async with self._session_factory() as db:
+            row = (await db.execute(lookup)).first()
+            if row is None:
+                document_id = str(uuid4())
+                try:
+                    await db.execute(
+                        insert(DocumentModel).values(
+                            id=document_id, source=source, content_hash=content_hash
+                        )
+                    )
+                    await db.commit()
+                    return UUID(document_id)
+                except IntegrityError:
+                    # Registered concurrently by another ingestion
+                    await db.rollback()
+                    row = (await db.execute(lookup)).one()
+        if row.chunk_count is not None:
+            return None
+        return UUID(row.id)  # interrupted earlier: resume it
+
+    async def finish_document(self, document_id: UUID, chunk_count: int) -> None:
+        async with self._session_factory() as db:
+            await db.execute(
+                update(DocumentModel)
+                .where(DocumentModel.id == str(document_id))
+                .values(chunk_count=chunk_count)
+            )
+            await db.commit()
+
+    async def existing_chunk_hashes(self, hashes: Sequence[str]) -> Set[str]:
+        if not hashes:
+            return set()
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(DocumentChunkModel.content_hash).where(
+                    DocumentChunkModel.content_hash.in_(hashes)
+                )
+            )
+            return set(result.scalars())
+
+    async def add_chunks(self, chunks: Sequence[DocumentChunk]) -> None:
+        if not chunks:
+            return
+        rows = [
+            {
+                "id": c.id,
+                "document_id": str(c.document_id),
+                "ordinal": c.ordinal,
+                "content": c.content,
+                "content_hash": c.content_hash,
+            }
+            for c in chunks
+        ]
+        # Another process (app.ingest) may have stored the same chunk since
+        # existing_chunk_hashes(): keep its row, leave this vector unreferenced
+        stmt = sqlite_insert(DocumentChunkModel).on_conflict_do_nothing(
+            index_elements=[DocumentChunkModel.content_hash]
+        )
+        async with self._session_factory() as db:
+            await db.execute(stmt, rows)
+            await db.commit()
+
+    async def get_chunks(self, ids: Sequence[int]) -> List[DocumentChunk]:
+        if not ids:
+            return []
+        stmt = (
+            select(
+                DocumentChunkModel.id,
+                DocumentChunkModel.document_id,
+                DocumentModel.source,
+                DocumentChunkModel.ordinal,
+                DocumentChunkModel.content,
+                DocumentChunkModel.content_hash,
+            )
+            .join(DocumentModel, DocumentModel.id == DocumentChunkModel.document_id)
+            .where(DocumentChunkModel.id.in_(list(ids)))
+        )
+        async with self._session_factory() as db:
+            result = await db.execute(stmt)
+            return [
+                DocumentChunk(
+                    id=row.id,
+                    document_id=UUID(row.document_id),
+                    source=row.source,
+                    ordinal=row.ordinal,
+                    content=row.content,
+                    content_hash=row.content_hash,
+                )
+                for row in result
+            ]
@@ -0,0 +1,100 @@
+import asyncio
+import gzip
+import io
+import json
+from typing import IO, Any, AsyncIterable, AsyncIterator, Dict, List, Literal
+
+from utils import fast_json
+
+Compression = Literal["auto", "none", "gzip", "zstd"]
+
+
+def detect_compression(path: str) -> Compression:
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith((".zst", ".zstd")):
+        return "zstd"
+    return "none"
+
+
+def open_archive(path: str, mode: Literal["r", "w"], compression: Compression = "auto") -> IO[str]:
+    """Open a (possibly compressed) text file. zstd needs the 'zstd' extra (zstandard)."""
+    if compression == "auto":
+        compression = detect_compression(path)
+    if compression == "gzip":
+        return gzip.open(path, f"{mode}t", encoding="utf-8", compresslevel=6)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError("zstd compression requires the 'zstd' extra (zstandard)") from e
+        raw = open(path, f"{mode}b")  # closed by the wrapper
+        stream: Any = (
+            zstandard.ZstdCompressor(level=6).stream_writer(raw)
+            if mode == "w"
+            else zstandard.ZstdDecompressor().stream_reader(raw)
+        )
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _read_lines(f: IO[str], count: int) -> List[str]:
+    lines = []
+    for line in f:
+        lines.append(line)
+        if len(lines) >= count:
+            break
+    return lines
+
+
+async def write_jsonl(
+    path: str,
+    records: AsyncIterable[Dict[str, Any]],
+    compression: Compression = "auto",
+    batch_lines: int = 1000,
+) -> int:
+    """
+    Write records as JSON lines. Lines are serialised on the event loop
+    and written in batches from a worker thread, so file and compression
+    work never blocks other tasks. Returns the number of records written.
+    """
+    f = await asyncio.to_thread(open_archive, path, "w", compression)
+    written = 0
+    try:
+        batch: List[str] = []
+        async for record in records:
+            batch.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            if len(batch) >= batch_lines:
+                await asyncio.to_thread(f.write, "\n".join(batch) + "\n")
+                written += len(batch)
+                batch = []
+        if batch:
+            await asyncio.to_thread(f.write, "\n".join(batch) + "\n")
+            written += len(batch)
+    finally:
+        await asyncio.to_thread(f.close)
+    return written
+
+
+async def read_jsonl(
+    path: str, compression: Compression = "auto", batch_lines: int = 1000
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream records from a JSON-lines file, reading `batch_lines` at a time in a thread."""
+    f = await asyncio.to_thread(open_archive, path, "r", compression)
+    try:
+        line_number = 0
+        while True:
+            lines = await asyncio.to_thread(_read_lines, f, batch_lines)
+            if not lines:
+                break
+            for line in lines:
+                line_number += 1
+                if not line.strip():
+                    continue
+                try:
+                    record: Dict[str, Any] = fast_json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_number}: invalid JSON line") from e
+                yield record
+    finally:
+        await asyncio.to_thread(f.close)
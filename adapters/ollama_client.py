@@ -1,13 +1,21 @@
+import asyncio
 import json
 import logging
+from contextlib import aclosing
 from datetime import datetime
 from typing import Any, AsyncIterator, Dict, List, Optional
 
 import httpx
 
-from domain.entities import Message, ModelInfo
-from domain.exceptions import LLMConnectionError, LLMException
+from domain.entities import GenerationStats, KeepAlive, Message, ModelInfo
+from domain.exceptions import (
+    LLMConnectionError,
+    LLMException,
+    LLMModelNotFoundError,
+    LLMTimeoutError,
+)
 from domain.ports import LLMClient
+from utils import fast_json
 
 logger = logging.getLogger(__name__)
 
@@ -16,56 +24,195 @@ class OllamaClient(LLMClient):
     """
     Implementation of LLMClient for Ollama.
     Uses httpx for async HTTP requests.
+
+    Timeouts are split so a dead server fails fast while a slow model
+    does not: `connect_timeout` for establishing a connection,
+    `first_byte_timeout` for the first response (model load and prompt
+    evaluation happen before it), `read_timeout` between chunks of a
+    response after that, and `timeout` for everything else.
     """
 
-    def __init__(self, base_url: str, timeout: float = 60.0):
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 60.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        first_byte_timeout: float = 120.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        json_loads: fast_json.JSONLoads = fast_json.loads,
+    ):
         self.base_url = base_url.rstrip("/")
-        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.first_byte_timeout = first_byte_timeout
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout, read=read_timeout)
+        # Requests that make the server load a model before it answers
+        self._slow_timeout = httpx.Timeout(
+            timeout, connect=connect_timeout, read=first_byte_timeout
+        )
+        # Chat streams: the first chunk and the gaps between chunks are
+        # timed in chat_stream() itself
+        self._stream_timeout = httpx.Timeout(timeout, connect=connect_timeout, read=None)
         self.headers = {"Content-Type": "application/json"}
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        # Decoder for NDJSON stream lines (orjson when available)
+        self.json_loads = json_loads
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Shared pooled client. Created lazily so the adapter also works
+        when the owner never calls open() (e.g. in scripts).
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but 'h2' is not installed; using HTTP/1.1")
+                http2 = False
+
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=self.limits,
+            http2=http2,
+            headers=self.headers,
+        )
+
+    async def open(self) -> None:
+        """Create the pooled HTTP client ahead of the first request."""
+        _ = self.client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and release its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def _handle_request_error(self, e: Exception, context: str) -> None:
-        logger.error(f"Ollama request failed during {context}: {str(e)}")
-        if isinstance(e, httpx.ConnectError):
+        logger.error(f"Ollama request failed during {context}: {str(e) or type(e).__name__}")
+        if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
             raise LLMConnectionError(f"Could not connect to Ollama at {self.base_url}") from e
+        if isinstance(e, (httpx.TimeoutException, TimeoutError)):
+            raise LLMTimeoutError(f"Ollama at {self.base_url} timed out during {context}") from e
+        if isinstance(e, httpx.TransportError):
+            raise LLMConnectionError(f"Connection to Ollama at {self.base_url} failed: {e}") from e
+        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 503:
+            raise LLMConnectionError(f"Ollama at {self.base_url} is overloaded") from e
         raise LLMException(f"Ollama error: {str(e)}") from e
 
     async def list_models(self) -> List[ModelInfo]:
-        url = f"{self.base_url}/api/tags"
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
+            response = await self.client.get("/api/tags")
+            response.raise_for_status()
+            data = response.json()
 
-                models = []
-                for m in data.get("models", []):
-                    # Parse ISO format timestamp provided by Ollama
-                    # Example: "2023-11-04T15:23:45.123456Z"
-                    try:
-                        # Python 3.11 fromisoformat handles 'Z'
-                        modified_at = datetime.fromisoformat(m.get("modified_at", ""))
-                    except ValueError:
-                        modified_at = datetime.now()
-
-                    models.append(
-                        ModelInfo(
-                            name=m.get("name", "unknown"),
-                            size=m.get("size", 0),
-                            digest=m.get("digest", ""),
-                            modified_at=modified_at,
-                            details=m.get("details", {}),
-                        )
+            models = []
+            for m in data.get("models", []):
+                # Parse ISO format timestamp provided by Ollama
+                # Example: "2023-11-04T15:23:45.123456Z"
+                try:
+                    # Python 3.11 fromisoformat handles 'Z'
+                    modified_at = datetime.fromisoformat(m.get("modified_at", ""))
+                except ValueError:
+                    modified_at = datetime.now()
+
+                models.append(
+                    ModelInfo(
+                        name=m.get("name", "unknown"),
+                        size=m.get("size", 0),
+                        digest=m.get("digest", ""),
+                        modified_at=modified_at,
+                        details=m.get("details", {}),
                     )
-                return models
+                )
+            return models
         except Exception as e:
             await self._handle_request_error(e, "list_models")
             return []
 
+    async def list_running_models(self) -> List[Dict[str, Any]]:
+        """Models currently loaded in memory (/api/ps)."""
+        try:
+            response = await self.client.get("/api/ps")
+            response.raise_for_status()
+            models: List[Dict[str, Any]] = response.json().get("models", [])
+            return models
+        except Exception as e:
+            await self._handle_request_error(e, "list_running_models")
+            return []
+
+    async def load_model(self, name: str, keep_alive: Optional[KeepAlive] = None) -> None:
+        """Load a model into memory: /api/generate without a prompt."""
+        payload: Dict[str, Any] = {"model": name}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        try:
+            response = await self.client.post(
+                "/api/generate", json=payload, timeout=self._slow_timeout
+            )
+            response.raise_for_status()
+        except Exception as e:
+            await self._handle_request_error(e, "load_model")
+
+    async def unload_model(self, name: str) -> None:
+        await self.load_model(name, keep_alive=0)
+
+    async def show_model(self, name: str) -> Dict[str, Any]:
+        """
+        Fetch /api/show and flatten what the app needs: the `details` block
+        plus context_length (model maximum) and num_ctx (configured runtime
+        context) when present.
+        """
+        try:
+            response = await self.client.post("/api/show", json={"name": name})
+            if response.status_code == 404:
+                raise LLMModelNotFoundError(f"Model not found: {name}")
+            response.raise_for_status()
+            data = response.json()
+        except LLMModelNotFoundError:
+            raise
+        except Exception as e:
+            await self._handle_request_error(e, "show_model")
+            return {}
+
+        details: Dict[str, Any] = dict(data.get("details", {}))
+        model_info = data.get("model_info", {})
+        architecture = model_info.get("general.architecture")
+        if architecture and f"{architecture}.context_length" in model_info:
+            details["context_length"] = model_info[f"{architecture}.context_length"]
+
+        # parameters is Modelfile text, e.g. "num_ctx 8192\nstop <|eot|>"
+        for line in data.get("parameters", "").splitlines():
+            key, _, value = line.partition(" ")
+            if key == "num_ctx" and value.strip().isdigit():
+                details["num_ctx"] = int(value.strip())
+        return details
+
     async def chat_stream(
-        self, model: str, messages: List[Message], options: Optional[Dict[str, Any]] = None
+        self,
+        model: str,
+        messages: List[Message],
+        options: Optional[Dict[str, Any]] = None,
+        keep_alive: Optional[KeepAlive] = None,
+        stats: Optional[GenerationStats] = None,
     ) -> AsyncIterator[str]:
-        url = f"{self.base_url}/api/chat"
-
         # Convert domain messages to Ollama API format
         api_messages = [{"role": msg.role.value, "content": msg.content} for msg in messages]
 
@@ -77,64 +224,117 @@ class OllamaClient(LLMClient):
 
         if options:
             payload["options"] = options
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
 
+        loop = asyncio.get_running_loop()
+        first_byte_by = loop.time() + self.first_byte_timeout
+        request = self.client.build_request(
+            "POST", "/api/chat", json=payload, timeout=self._stream_timeout
+        )
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                async with client.stream(
-                    "POST", url, json=payload, headers=self.headers
-                ) as response:
-                    response.raise_for_status()
-                    async for line in response.aiter_lines():
+            # Every wait is timed on its own: up to the first chunk, then
+            # between chunks, never while the consumer holds a chunk. Not one
+            # asyncio.timeout() around the loop: that is bound to the task
+            # entering it, and the stream coalescer reads each chunk from a
+            # new task, so it would never fire.
+            response = await asyncio.wait_for(
+                self.client.send(request, stream=True), first_byte_by - loop.time()
+            )
+            try:
+                response.raise_for_status()
+                async with aclosing(response.aiter_lines()) as lines:
+                    timeout = first_byte_by - loop.time()
+                    while True:
+                        try:
+                            line = await asyncio.wait_for(anext(lines), timeout)
+                        except StopAsyncIteration:
+                            break
+                        timeout = self.read_timeout
                         if not line:
                             continue
                         try:
-                            chunk = json.loads(line)
-
-                            if chunk.get("done", False):
-                                # Could capture total_duration here if needed
-                                break
-
-                            if "message" in chunk:
-                                content = chunk["message"].get("content", "")
-                                if content:
-                                    yield content
-
+                            chunk = self.json_loads(line)
                         except json.JSONDecodeError:
-                            logger.warning(f"Failed to decode JSON chunk: {line}")
+                            logger.warning(f"Failed to decode JSON chunk: {line[:200]}")
                             continue
+
+                        if chunk.get("done", False):
+                            if stats is not None:
+                                self._fill_stats(stats, chunk)
+                            break
+
+                        if "message" in chunk:
+                            content = chunk["message"].get("content", "")
+                            if content:
+                                yield content
+            finally:
+                await response.aclose()
         except Exception as e:
             await self._handle_request_error(e, "chat_stream")
 
+    @staticmethod
+    def _fill_stats(stats: GenerationStats, chunk: Dict[str, Any]) -> None:
+        stats.eval_count = int(chunk.get("eval_count") or 0)
+        stats.eval_duration = int(chunk.get("eval_duration") or 0)
+        stats.prompt_eval_count = int(chunk.get("prompt_eval_count") or 0)
+        stats.prompt_eval_duration = int(chunk.get("prompt_eval_duration") or 0)
+        stats.load_duration = int(chunk.get("load_duration") or 0)
+        stats.total_duration = int(chunk.get("total_duration") or 0)
+        stats.done = True
+
     async def pull_model(self, name: str) -> AsyncIterator[dict]:
-        url = f"{self.base_url}/api/pull"
         payload = {"name": name, "stream": True}
 
         try:
-            async with httpx.AsyncClient(timeout=None) as client:  # No timeout for long downloads
-                async with client.stream(
-                    "POST", url, json=payload, headers=self.headers
-                ) as response:
-                    response.raise_for_status()
-                    async for line in response.aiter_lines():
-                        if not line:
-                            continue
-                        try:
-                            data = json.loads(line)
-                            yield data
-                        except json.JSONDecodeError:
-                            pass
+            # No read timeout for long downloads, but do not hang on connect
+            async with self.client.stream(
+                "POST",
+                "/api/pull",
+                json=payload,
+                timeout=httpx.Timeout(None, connect=self.connect_timeout),
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    try:
+                        data = self.json_loads(line)
+                        yield data
+                    except json.JSONDecodeError:
+                        pass
         except Exception as e:
             await self._handle_request_error(e, "pull_model")
 
     async def delete_model(self, name: str) -> bool:
-        url = f"{self.base_url}/api/delete"
         payload = {"name": name}
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.delete(url, json=payload, headers=self.headers)
-                response.raise_for_status()
-                return True
+            # httpx.AsyncClient.delete() does not accept a body
+            response = await self.client.request("DELETE", "/api/delete", json=payload)
+            response.raise_for_status()
+            return True
         except Exception as e:
             await self._handle_request_error(e, "delete_model")
             return False
+
+    async def embed(self, model: str, inputs: List[str]) -> List[List[float]]:
+        """Batch embeddings via /api/embed (inputs longer than the model context are truncated)."""
+        payload = {"model": model, "input": inputs, "truncate": True}
+        try:
+            response = await self.client.post(
+                "/api/embed", json=payload, timeout=self._slow_timeout
+            )
+            if response.status_code == 404:
+                raise LLMModelNotFoundError(f"Model not found: {model}")
+            response.raise_for_status()
+            # Embedding responses are large; the fast decoder pays off here
+            embeddings: List[List[float]] = self.json_loads(response.content)["embeddings"]
+        except LLMModelNotFoundError:
+            raise
+        except Exception as e:
+            await self._handle_request_error(e, "embed")
+            return []
+        if len(embeddings) != len(inputs):
+            raise LLMException(f"Expected {len(inputs)} embeddings, got {len(embeddings)}")
+        return embeddings
@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from adapters.ollama_client import OllamaClient
+from domain.entities import GenerationStats, KeepAlive, Message, ModelInfo
+from domain.exceptions import LLMConnectionError, LLMException
+from domain.ports import LLMClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OllamaNode:
+    client: OllamaClient
+    # Model names are stored in full, "name:tag" (ModelInfo.full_name)
+    resident: Set[str] = field(default_factory=set)  # models loaded in memory (/api/ps)
+    running: List[Dict[str, Any]] = field(default_factory=list)  # raw /api/ps entries
+    installed: Set[str] = field(default_factory=set)  # models on disk (/api/tags)
+    in_flight: int = 0
+    down_until: float = 0.0
+    failures: int = 0
+
+    @property
+    def url(self) -> str:
+        return self.client.base_url
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+
+class OllamaRouter(LLMClient):
+    """
+    LLMClient spreading requests over several Ollama nodes.
+
+    A chat goes to a healthy node that already has the model resident
+    (per /api/ps, polled every `poll_interval` seconds), falling back to
+    nodes that have it installed and then to any node, picking the least
+    loaded (fewest in-flight requests) at each step. Nodes that fail to
+    connect are taken out of rotation for `cooldown` seconds; a chat that
+    fails before its first token is retried on the next candidate.
+    """
+
+    def __init__(
+        self,
+        clients: List[OllamaClient],
+        poll_interval: float = 5.0,
+        cooldown: float = 15.0,
+    ):
+        if not clients:
+            raise ValueError("OllamaRouter needs at least one client")
+        self.nodes = [OllamaNode(client=c) for c in clients]
+        self.poll_interval = poll_interval
+        self.cooldown = cooldown
+        self._poller: Optional[asyncio.Task[None]] = None
+
+    async def start(self) -> None:
+        await self.refresh()
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll(), name="ollama-router-poller")
+
+    async def stop(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh()
+            except Exception as e:  # never let the poller die
+                logger.error(f"Ollama node refresh failed: {e}")
+
+    async def refresh(self) -> None:
+        """Probe every node (including down ones) for resident models."""
+        await asyncio.gather(*(self._refresh_node(node) for node in self.nodes))
+
+    async def _refresh_node(self, node: OllamaNode) -> None:
+        try:
+            running = await node.client.list_running_models()
+        except LLMException as e:
+            self._mark_down(node, e)
+            return
+        node.running = running
+        node.resident = {ModelInfo.full_name(m["name"]) for m in running if m.get("name")}
+        if node.failures:
+            logger.info(f"Ollama node {node.url} is back in rotation")
+        node.down_until = 0.0
+        node.failures = 0
+
+    def _mark_down(self, node: OllamaNode, error: Exception) -> None:
+        node.failures += 1
+        node.down_until = time.monotonic() + self.cooldown
+        logger.warning(f"Ollama node {node.url} out of rotation for {self.cooldown}s: {error}")
+
+    def candidates(self, model: Optional[str] = None) -> List[OllamaNode]:
+        """Nodes in preference order for `model`."""
+        healthy = [n for n in self.nodes if n.healthy]
+        if not healthy:
+            # Everything is down: try the node that failed longest ago
+            return sorted(self.nodes, key=lambda n: n.down_until)
+
+        name = ModelInfo.full_name(model) if model is not None else None
+
+        def score(node: OllamaNode) -> tuple:
+            resident = name is not None and name in node.resident
+            installed = name is not None and name in node.installed
+            return (not resident, not installed, node.in_flight)
+
+        return sorted(healthy, key=score)
+
+    async def list_models(self) -> List[ModelInfo]:
+        nodes = [n for n in self.nodes if n.healthy] or self.nodes
+        results = await asyncio.gather(
+            *(n.client.list_models() for n in nodes), return_exceptions=True
+        )
+        models: Dict[str, ModelInfo] = {}
+        errors: List[BaseException] = []
+        for node, result in zip(nodes, results, strict=True):
+            if isinstance(result, BaseException):
+                if isinstance(result, LLMConnectionError):
+                    self._mark_down(node, result)
+                errors.append(result)
+                continue
+            node.installed = {ModelInfo.full_name(m.name) for m in result}
+            for m in result:
+                models.setdefault(m.name, m)
+        if errors and len(errors) == len(nodes):
+            raise errors[0]
+        return list(models.values())
+
+    async def show_model(self, name: str) -> Dict[str, Any]:
+        for node in self.candidates(name):
+            try:
+                return await node.client.show_model(name)
+            except LLMConnectionError as e:
+                self._mark_down(node, e)
+        raise LLMConnectionError("No Ollama node reachable")
+
+    async def chat_stream(
+        self,
+        model: str,
+        messages: List[Message],
+        options: Optional[Dict[str, Any]] = None,
+        keep_alive: Optional[KeepAlive] = None,
+        stats: Optional[GenerationStats] = None,
+    ) -> AsyncIterator[str]:
+        last_error: Optional[Exception] = None
+        for node in self.candidates(model):
+            started = False
+            node.in_flight += 1
+            try:
+                async for chunk in node.client.chat_stream(
+                    model, messages, options, keep_alive, stats
+                ):
+                    started = True
+                    yield chunk
+                node.resident.add(ModelInfo.full_name(model))
+                return
+            except LLMConnectionError as e:
+                self._mark_down(node, e)
+                if started:
+                    raise
+                last_error = e
+            finally:
+                node.in_flight -= 1
+        raise last_error or LLMConnectionError("No Ollama node reachable")
+
+    async def list_running_models(self) -> List[Dict[str, Any]]:
+        """Union of resident models across nodes; each entry carries its node URL."""
+        await self.refresh()
+        running: List[Dict[str, Any]] = []
+        for node in self.nodes:
+            if node.healthy:
+                running.extend({**m, "node": node.url} for m in node.running)
+        return running
+
+    async def load_model(self, name: str, keep_alive: Optional[KeepAlive] = None) -> None:
+        """Warm the model on the node a chat for it would be routed to."""
+        for node in self.candidates(name):
+            try:
+                await node.client.load_model(name, keep_alive=keep_alive)
+                node.resident.add(ModelInfo.full_name(name))
+                return
+            except LLMConnectionError as e:
+                self._mark_down(node, e)
+        raise LLMConnectionError("No Ollama node reachable")
+
+    async def unload_model(self, name: str) -> None:
+        full_name = ModelInfo.full_name(name)
+        nodes = [n for n in self.nodes if full_name in n.resident]
+        await asyncio.gather(*(n.client.unload_model(name) for n in nodes), return_exceptions=True)
+        for node in nodes:
+            node.resident.discard(full_name)
+
+    async def pull_model(self, name: str) -> AsyncIterator[dict]:
+        """Pull onto every healthy node; progress dicts carry the node URL."""
+        for node in [n for n in self.nodes if n.healthy]:
+            async for progress in node.client.pull_model(name):
+                yield {**progress, "node": node.url}
+            node.installed.add(ModelInfo.full_name(name))
+
+    async def delete_model(self, name: str) -> bool:
+        results = await asyncio.gather(
+            *(n.client.delete_model(name) for n in self.nodes), return_exceptions=True
+        )
+        full_name = ModelInfo.full_name(name)
+        for node in self.nodes:
+            node.installed.discard(full_name)
+            node.resident.discard(full_name)
+        return any(r is True for r in results)
+
+    async def embed(self, model: str, inputs: List[str]) -> List[List[float]]:
+        for node in self.candidates(model):
+            node.in_flight += 1
+            try:
+                embeddings = await node.client.embed(model, inputs)
+                node.resident.add(ModelInfo.full_name(model))
+                return embeddings
+            except LLMConnectionError as e:
+                self._mark_down(node, e)
+            finally:
+                node.in_flight -= 1
+        raise LLMConnectionError("No Ollama node reachable")
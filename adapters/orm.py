@@ -1,8 +1,8 @@
 import uuid
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from sqlalchemy import JSON, DateTime, ForeignKey, String, Text
+from sqlalchemy import DDL, JSON, DateTime, ForeignKey, Index, Integer, String, Text, event
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -12,6 +12,12 @@ class Base(DeclarativeBase):
 
 class ChatSessionModel(Base):
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        # Sidebar listing: ORDER BY updated_at DESC, id DESC (keyset)
+        Index("ix_chat_sessions_updated_at_id", "updated_at", "id"),
+        # Forks whose shared history a deleted session must hand over
+        Index("ix_chat_sessions_forked_from_id", "forked_from_id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title: Mapped[str] = mapped_column(String(255), default="New Chat")
@@ -20,6 +26,10 @@ class ChatSessionModel(Base):
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
     model_name: Mapped[str] = mapped_column(String(100), default="llama2")
+    # Last message of the session's branch; its history is the chain of parents
+    head_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+    # Message the session was forked at (history up to it is shared), if a fork
+    forked_from_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
 
     # Relationships
     messages: Mapped[list["MessageModel"]] = relationship(
@@ -41,9 +51,15 @@ class ChatSessionModel(Base):
 
 class MessageModel(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # History loads: WHERE session_id = ? ORDER BY created_at, id
+        Index("ix_messages_session_id_created_at", "session_id", "created_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    session_id: Mapped[str] = mapped_column(String(36), ForeignKey("chat_sessions.id"), index=True)
+    session_id: Mapped[str] = mapped_column(String(36), ForeignKey("chat_sessions.id"))
+    # Previous message in the conversation; not a foreign key (see migration 005)
+    parent_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
     role: Mapped[str] = mapped_column(String(50))  # system, user, assistant
     content: Mapped[str] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -53,3 +69,52 @@ class MessageModel(Base):
     session: Mapped["ChatSessionModel"] = relationship(
         "ChatSessionModel", back_populates="messages"
     )
+
+
+class DocumentModel(Base):
+    __tablename__ = "documents"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    source: Mapped[str] = mapped_column(Text)
+    # sha256 of the normalised text; identical documents are ingested once
+    content_hash: Mapped[str] = mapped_column(String(64), unique=True)
+    # NULL until every chunk is stored, so an interrupted ingestion is resumed
+    chunk_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class DocumentChunkModel(Base):
+    __tablename__ = "document_chunks"
+
+    # Also the chunk's row in the vector index file
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    document_id: Mapped[str] = mapped_column(String(36), ForeignKey("documents.id"), index=True)
+    ordinal: Mapped[int] = mapped_column(Integer)
+    content: Mapped[str] = mapped_column(Text)
+    content_hash: Mapped[str] = mapped_column(String(64), unique=True)
+
+
+# Full-text index over messages.content (SQLite FTS5), mirrored from migration 003
+# so init_db() creates it too.
+MESSAGES_FTS_DDL = (
+    "CREATE VIRTUAL TABLE messages_fts USING fts5("
+    "content, content='messages', content_rowid='rowid', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER messages_fts_ai AFTER INSERT ON messages BEGIN "
+    "INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content); "
+    "END",
+    "CREATE TRIGGER messages_fts_ad AFTER DELETE ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, content) "
+    "VALUES ('delete', old.rowid, old.content); "
+    "END",
+    "CREATE TRIGGER messages_fts_au AFTER UPDATE OF content ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, content) "
+    "VALUES ('delete', old.rowid, old.content); "
+    "INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content); "
+    "END",
+)
+
+for _statement in MESSAGES_FTS_DDL:
+    event.listen(
+        MessageModel.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+    )
@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from domain.entities import GenerationStats, KeepAlive, Message, ModelInfo
+from domain.ports import LLMClient
+
+logger = logging.getLogger(__name__)
+
+
+def is_deterministic(options: Optional[Dict[str, Any]]) -> bool:
+    """Greedy decoding (temperature 0) or a fixed seed gives repeatable output."""
+    if not options:
+        return False
+    return options.get("temperature") == 0 or options.get("seed") is not None
+
+
+def cache_key(digest: str, messages: List[Message], options: Dict[str, Any]) -> str:
+    payload = {
+        "digest": digest,
+        "messages": [m.to_dict() for m in messages],
+        "options": options,
+    }
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    bypassed: int = 0  # non-deterministic requests
+
+
+class SqliteResponseStore:
+    """Optional on-disk backing store; blocking sqlite3 calls run in a thread."""
+
+    def __init__(self, path: str, ttl: float, max_entries: int):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, chunks TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _get(self, key: str) -> Optional[List[str]]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT chunks FROM response_cache WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE response_cache SET last_used = ? WHERE key = ?", (now, key))
+            chunks: List[str] = json.loads(row[0])
+            return chunks
+
+    def _put(self, key: str, chunks: List[str]) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?)",
+                (key, json.dumps(chunks), now, now),
+            )
+            conn.execute("DELETE FROM response_cache WHERE created_at <= ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                "SELECT key FROM response_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    async def get(self, key: str) -> Optional[List[str]]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, chunks: List[str]) -> None:
+        await asyncio.to_thread(self._put, key, chunks)
+
+
+class ResponseCachingLLMClient(LLMClient):
+    """
+    Opt-in cache of complete chat responses for deterministic requests.
+
+    Requests are keyed by model digest, messages and options, and cached
+    only when the options make generation repeatable (temperature 0 or a
+    fixed seed). Hits are replayed chunk by chunk, so callers still see a
+    stream. Entries are evicted LRU beyond max_entries and expire after
+    ttl seconds; an optional SQLite store keeps them across restarts.
+    """
+
+    def __init__(
+        self,
+        inner: LLMClient,
+        max_entries: int = 1000,
+        ttl: float = 24 * 3600,
+        store: Optional[SqliteResponseStore] = None,
+    ):
+        self.inner = inner
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = store
+        self._entries: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+        self._no_digest: Set[str] = set()  # models already reported as uncacheable
+        self.stats = ResponseCacheStats()
+
+    async def _digest(self, model: str) -> Optional[str]:
+        name = ModelInfo.full_name(model)
+        for info in await self.inner.list_models():
+            if ModelInfo.full_name(info.name) == name and info.digest:
+                self._no_digest.discard(name)
+                return info.digest
+        if name not in self._no_digest:
+            self._no_digest.add(name)
+            logger.warning(f"No digest listed for model {model}; its responses are not cached")
+        return None
+
+    async def _lookup(self, key: str) -> Optional[List[str]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            created_at, chunks = entry
+            if time.monotonic() - created_at < self.ttl:
+                self._entries.move_to_end(key)
+                return chunks
+            del self._entries[key]
+
+        if self.store is not None:
+            stored = await self.store.get(key)
+            if stored is not None:
+                self._remember(key, stored)
+                return stored
+        return None
+
+    def _remember(self, key: str, chunks: List[str]) -> None:
+        self._entries[key] = (time.monotonic(), chunks)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def chat_stream(
+        self,
+        model: str,
+        messages: List[Message],
+        options: Optional[Dict[str, Any]] = None,
+        keep_alive: Optional[KeepAlive] = None,
+        stats: Optional[GenerationStats] = None,
+    ) -> AsyncIterator[str]:
+        digest = await self._digest(model) if is_deterministic(options) else None
+        if digest is None:
+            self.stats.bypassed += 1
+            async for chunk in self.inner.chat_stream(model, messages, options, keep_alive, stats):
+                yield chunk
+            return
+
+        key = cache_key(digest, messages, options or {})
+        cached = await self._lookup(key)
+        if cached is not None:
+            self.stats.hits += 1
+            if stats is not None:
+                stats.cached = True
+            for chunk in cached:
+                yield chunk
+            return
+
+        self.stats.misses += 1
+        chunks: List[str] = []
+        async for chunk in self.inner.chat_stream(model, messages, options, keep_alive, stats):
+            chunks.append(chunk)
+            yield chunk
+
+        # Only reached when the stream completed (not on error or early close)
+        if chunks:
+            self._remember(key, chunks)
+            self.stats.stores += 1
+            if self.store is not None:
+                try:
+                    await self.store.put(key, chunks)
+                except sqlite3.Error as e:
+                    logger.warning(f"Could not persist cached response: {e}")
+
+    async def list_models(self) -> List[ModelInfo]:
+        return await self.inner.list_models()
+
+    async def show_model(self, name: str) -> Dict[str, Any]:
+        return await self.inner.show_model(name)
+
+    def pull_model(self, name: str) -> AsyncIterator[dict]:
+        # A re-pulled model gets a new digest, so old entries simply stop matching
+        return self.inner.pull_model(name)
+
+    async def delete_model(self, name: str) -> bool:
+        return await self.inner.delete_model(name)
+
+    async def list_running_models(self) -> List[Dict[str, Any]]:
+        return await self.inner.list_running_models()
+
+    async def load_model(self, name: str, keep_alive: Optional[KeepAlive] = None) -> None:
+        await self.inner.load_model(name, keep_alive=keep_alive)
+
+    async def unload_model(self, name: str) -> None:
+        await self.inner.unload_model(name)
+
+    async def embed(self, model: str, inputs: List[str]) -> List[List[float]]:
+        return await self.inner.embed(model, inputs)
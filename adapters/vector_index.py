@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import os
+import struct
+from typing import Any, List, Optional, Sequence, Tuple
+
+from domain.ports import VectorIndex
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: one writer process at a time
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# File layout: a 64-byte header, then float32 rows of `dim` values, appended
+# in place. Rows are L2-normalised on the way in, so cosine similarity is a
+# plain dot product.
+MAGIC = b"GOVEC001"
+HEADER = struct.Struct("<8sI52s")  # magic, dimensions, embedding model (utf-8, NUL padded)
+
+
+class MmapVectorIndex(VectorIndex):
+    """
+    Append-only vector index in a memory-mapped file, searched with NumPy.
+
+    Vectors are never loaded into the Python heap: searches run one
+    matrix-vector product over the mapping and the OS pages the file in
+    and out, so memory stays bounded by the page cache rather than by
+    the number of chunks. At 768 dimensions, 50k vectors are ~150 MB on
+    disk and a search takes a few milliseconds.
+
+    Several processes may share the file (the app and `python -m
+    app.ingest`): appends hold an exclusive flock while they pick their
+    row ids and write, and every search first remaps the file if it grew,
+    so rows appended elsewhere are found without a restart.
+    """
+
+    def __init__(self, path: str):
+        if np is None:
+            raise RuntimeError("The vector index requires the 'rag' extra (numpy)")
+        self.path = path
+        self.model: Optional[str] = None
+        self.dimensions = 0
+        self._count = 0
+        self._size = 0  # file size the mapping was made for
+        self._matrix: Any = None
+        self._lock = asyncio.Lock()
+        self._refresh()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _refresh(self) -> None:
+        """Pick up rows other processes appended since the last look."""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return
+        if size == self._size or size < HEADER.size:
+            return
+        if self.model is None:
+            with open(self.path, "rb") as f:
+                self._read_header(f)
+        # A row still being written elsewhere is left out until it is complete
+        self._remap((size - HEADER.size) // (self.dimensions * 4))
+        self._size = size
+
+    def _read_header(self, f: Any) -> None:
+        f.seek(0)
+        magic, dimensions, model = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a vector index")
+        self.model = model.rstrip(b"\0").decode()
+        self.dimensions = dimensions
+
+    def _remap(self, count: int) -> None:
+        self._count = count
+        self._matrix = (
+            np.memmap(
+                self.path,
+                dtype=np.float32,
+                mode="r",
+                offset=HEADER.size,
+                shape=(count, self.dimensions),
+            )
+            if count
+            else None
+        )
+
+    def _append(self, model: str, vectors: Sequence[Sequence[float]]) -> int:
+        rows = np.array(vectors, dtype=np.float32)  # a copy: normalised in place below
+        if rows.ndim != 2 or not len(rows):
+            raise ValueError("Expected a non-empty batch of vectors")
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        rows /= np.where(norms == 0, 1, norms)
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)  # released when the file closes
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                f.truncate(0)
+                f.write(HEADER.pack(MAGIC, rows.shape[1], model.encode()[:52]))
+                self.model, self.dimensions = model, rows.shape[1]
+                size = HEADER.size
+            else:
+                self._read_header(f)
+            if model != self.model or rows.shape[1] != self.dimensions:
+                raise ValueError(
+                    f"Index {self.path} holds {self.dimensions}-d vectors from {self.model}; "
+                    f"got {rows.shape[1]}-d vectors from {model}"
+                )
+
+            row_bytes = self.dimensions * 4
+            partial = (size - HEADER.size) % row_bytes
+            if partial:
+                # A write was interrupted (writers hold the lock); its chunks
+                # were never recorded
+                logger.warning(f"Dropping a partially written row from {self.path}")
+                size -= partial
+                f.truncate(size)
+            first = (size - HEADER.size) // row_bytes
+            f.write(rows.tobytes())  # "a" mode: always at the end
+            f.flush()
+            os.fsync(f.fileno())
+            size += len(rows) * row_bytes
+
+        self._remap(first + len(rows))
+        self._size = size
+        return first
+
+    async def add(self, model: str, vectors: Sequence[Sequence[float]]) -> int:
+        async with self._lock:  # rows are handed out in append order
+            return await asyncio.to_thread(self._append, model, vectors)
+
+    def _search(self, vector: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        self._refresh()
+        matrix = self._matrix  # a concurrent append swaps in a new mapping
+        if matrix is None or k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        if query.shape != (self.dimensions,):
+            raise ValueError(f"Expected a {self.dimensions}-d query, got shape {query.shape}")
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+
+        scores = matrix @ (query / norm)
+        if k < len(scores):
+            top = np.argpartition(scores, -k)[-k:]  # O(n), then sort only the k winners
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(int(row), float(scores[row])) for row in top]
+
+    async def search(self, vector: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        return await asyncio.to_thread(self._search, vector, k)
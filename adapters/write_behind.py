@@ -0,0 +1,221 @@
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.exc import IntegrityError
+
+from domain.entities import ChatSession, Message, PageCursor, SearchHit
+from domain.ports import ChatRepository, MessageBatchWriter
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindChatRepository(ChatRepository):
+    """
+    ChatRepository decorator that buffers add_message() calls and writes
+    them in batches.
+
+    Inserts from all sessions are coalesced into one transaction, flushed
+    when max_batch_size messages are pending or max_delay seconds after the
+    first pending message, whichever comes first. Every other operation
+    flushes first, so reads always see earlier writes. close() flushes
+    everything that is still buffered.
+
+    A batch that fails with an error retrying cannot fix (an
+    IntegrityError) is retried one message at a time, so one bad message
+    cannot hold back the others; the messages that fail on their own are
+    logged and dropped. Any other error (the database is locked or
+    unavailable) keeps the batch buffered and retries it with exponential
+    backoff, from max_delay up to max_backoff seconds. close() never
+    drops: what the batch path cannot write is inserted directly, and the
+    error is raised if that fails too.
+    """
+
+    def __init__(
+        self,
+        inner: ChatRepository,
+        writer: MessageBatchWriter,
+        max_batch_size: int = 100,
+        max_delay: float = 0.05,
+        max_pending: int = 1000,
+        max_backoff: float = 5.0,
+    ):
+        self.inner = inner
+        self.writer = writer
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.max_backoff = max_backoff
+
+        self._buffer: List[Tuple[UUID, Message]] = []
+        self._dropped = 0
+        self._failures = 0  # consecutive failed flushes, for the backoff
+        self._flush_lock = asyncio.Lock()
+        self._pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._stop = asyncio.Event()  # cuts a backoff short on close
+        self._task: Optional[asyncio.Task[None]] = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def dropped(self) -> int:
+        """Messages given up on because retrying could not write them."""
+        return self._dropped
+
+    def start(self) -> None:
+        """Start the background flusher. Called lazily on the first write."""
+        if self._task is None or self._task.done():
+            self._closed = False
+            self._stop.clear()
+            self._task = asyncio.create_task(self._run(), name="write-behind-flusher")
+
+    async def close(self) -> None:
+        """
+        Stop the background flusher and persist every buffered message.
+        Messages the batch path cannot write are inserted one by one through
+        the inner repository; if that fails too they stay buffered and the
+        error is raised.
+        """
+        self._closed = True
+        if self._task is not None:
+            self._pending.set()
+            self._full.set()
+            self._stop.set()
+            await self._task
+            self._task = None
+        try:
+            await self._flush(drop=False)
+        except Exception as e:
+            logger.warning(
+                f"Write-behind flush failed on close ({e}), "
+                f"inserting {len(self._buffer)} messages directly"
+            )
+            async with self._flush_lock:
+                while self._buffer:
+                    session_id, message = self._buffer[0]
+                    await self.inner.add_message(session_id, message)
+                    del self._buffer[0]
+
+    async def flush(self) -> None:
+        """
+        Write all buffered messages now. Messages that could not be written
+        stay buffered, in order, and the error is raised.
+        """
+        await self._flush(drop=True)
+
+    async def _flush(self, drop: bool) -> None:
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[: self.max_batch_size]
+                del self._buffer[: len(batch)]
+                try:
+                    await self.writer.add_messages(batch)
+                except IntegrityError as e:
+                    logger.warning(f"Write-behind batch of {len(batch)} failed ({e}), isolating")
+                    failed = await self._write_each(batch, drop)
+                    if failed:
+                        self._buffer[:0] = failed
+                        raise
+                except Exception:
+                    # Put them back in front so ordering is preserved
+                    self._buffer[:0] = batch
+                    raise
+            self._full.clear()
+            self._pending.clear()
+
+    async def _write_each(
+        self, batch: List[Tuple[UUID, Message]], drop: bool
+    ) -> List[Tuple[UUID, Message]]:
+        """
+        Write a batch that hit an IntegrityError message by message, dropping
+        those that hit one on their own if drop is set. Returns the messages
+        still to write; the first other error stops the pass.
+        """
+        for i, (session_id, message) in enumerate(batch):
+            try:
+                await self.writer.add_messages([(session_id, message)])
+            except IntegrityError as e:
+                if not drop:
+                    return batch[i:]
+                self._dropped += 1
+                logger.error(f"Dropping message {message.id} of session {session_id}: {e}")
+            except Exception:
+                return batch[i:]
+        return []
+
+    async def _run(self) -> None:
+        while not self._closed:
+            await self._pending.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.max_delay)
+            except TimeoutError:
+                pass
+            try:
+                await self.flush()
+                self._failures = 0
+            except Exception as e:
+                self._failures += 1
+                backoff = min(self.max_delay * 2 ** (self._failures - 1), self.max_backoff)
+                logger.error(f"Write-behind flush failed, retrying in {backoff:.2f}s: {e}")
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=backoff)
+                except TimeoutError:
+                    pass
+
+    async def add_message(self, session_id: UUID, message: Message) -> None:
+        if self._closed:
+            raise RuntimeError("Write-behind repository is closed")
+        self.start()
+        self._buffer.append((session_id, message))
+        self._pending.set()
+        if len(self._buffer) >= self.max_batch_size:
+            self._full.set()
+        if len(self._buffer) >= self.max_pending:
+            # Backpressure: the database is not keeping up
+            await self.flush()
+
+    async def get_session(self, session_id: UUID) -> Optional[ChatSession]:
+        await self.flush()
+        return await self.inner.get_session(session_id)
+
+    async def create_session(self, title: str, model_name: str) -> ChatSession:
+        return await self.inner.create_session(title, model_name)
+
+    async def fork_session(
+        self, session_id: UUID, message_id: Optional[UUID] = None, title: Optional[str] = None
+    ) -> Optional[ChatSession]:
+        await self.flush()
+        return await self.inner.fork_session(session_id, message_id=message_id, title=title)
+
+    async def list_sessions(
+        self, limit: Optional[int] = None, before: Optional[PageCursor] = None
+    ) -> List[ChatSession]:
+        await self.flush()
+        return await self.inner.list_sessions(limit=limit, before=before)
+
+    async def get_messages(
+        self, session_id: UUID, before: Optional[PageCursor] = None, limit: int = 50
+    ) -> List[Message]:
+        await self.flush()
+        return await self.inner.get_messages(session_id, before=before, limit=limit)
+
+    async def search_messages(
+        self, query: str, limit: int = 20, offset: int = 0, session_id: Optional[UUID] = None
+    ) -> List[SearchHit]:
+        await self.flush()
+        return await self.inner.search_messages(
+            query, limit=limit, offset=offset, session_id=session_id
+        )
+
+    async def update_session_title(self, session_id: UUID, title: str) -> None:
+        await self.flush()
+        await self.inner.update_session_title(session_id, title)
+
+    async def delete_session(self, session_id: UUID) -> None:
+        await self.flush()
+        await self.inner.delete_session(session_id)
@@ -0,0 +1,66 @@
+"""
+Backup and migration of chat history.
+
+    python -m app.archive export backup.jsonl.gz
+    python -m app.archive import backup.jsonl.gz
+
+The format is JSON lines (a header, then sessions, then messages),
+compressed according to the extension: .gz (gzip) or .zst (zstd, needs
+the 'zstd' extra).
+"""
+
+import argparse
+import asyncio
+import logging
+
+from adapters.chat_repository import SqlAlchemyChatRepository
+from adapters.db import AsyncSessionLocal, dispose_engines
+from adapters.jsonl_archive import read_jsonl, write_jsonl
+from app.container import container
+from services.archive import ArchiveService, TransferProgress
+
+logger = logging.getLogger(__name__)
+
+
+def log_progress(progress: TransferProgress) -> None:
+    state = "done" if progress.finished else "progress"
+    logger.info(
+        f"{state}: {progress.sessions} sessions, {progress.messages} messages, "
+        f"{progress.records_per_second:,.0f} records/s, {progress.elapsed:.1f}s"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    _ = container.settings  # configures logging
+    service = ArchiveService(
+        SqlAlchemyChatRepository(session_factory=AsyncSessionLocal), batch_size=args.batch_size
+    )
+    try:
+        if args.command == "export":
+            records = service.export_records(on_progress=log_progress)
+            written = await write_jsonl(args.path, records, compression=args.compression)
+            logger.info(f"Exported {written} records to {args.path}")
+        else:
+            records = read_jsonl(args.path, compression=args.compression)
+            progress = await service.import_records(records, on_progress=log_progress)
+            if progress.skipped_sessions:
+                logger.info(
+                    f"Skipped {progress.skipped_sessions} existing sessions "
+                    f"({progress.skipped_messages} messages)"
+                )
+    finally:
+        await dispose_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export or import chat history as JSONL")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path")
+    parser.add_argument("--compression", choices=["auto", "none", "gzip", "zstd"], default="auto")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,30 @@
 import logging
-from typing import Optional
+from typing import List, Optional
 
+from adapters.cached_chat_repository import CachingChatRepository
+from adapters.cached_llm_client import CachingLLMClient
 from adapters.chat_repository import SqlAlchemyChatRepository
+from adapters.circuit_breaker import CircuitBreakerLLMClient
+from adapters.db import AsyncSessionLocal, dispose_engines
+from adapters.document_store import SqlAlchemyDocumentStore
 from adapters.ollama_client import OllamaClient
+from adapters.ollama_router import OllamaRouter
+from adapters.response_cache import ResponseCachingLLMClient, SqliteResponseStore
+from adapters.vector_index import MmapVectorIndex
+from adapters.write_behind import WriteBehindChatRepository
 from domain.ports import ChatRepository, LLMClient
 from infra.config import Settings, get_settings
 from infra.logging import configure_logging
+from infra.metrics import MetricsRegistry, register_chat_metrics
+from infra.tracing import configure_tracing, instrument
 from services.chat_services import ChatService
+from services.context_window import ContextWindowBuilder
+from services.ingestion import IngestionService
+from services.model_residency import ModelResidencyManager
+from services.pull_manager import PullManager
+from services.retrieval import Retriever
+from services.scheduler import RequestScheduler
+from services.stream_coalescer import TokenCoalescer
 
 logger = logging.getLogger(__name__)
 
@@ -21,38 +39,263 @@ class Container:
     def __init__(self) -> None:
         self._settings: Optional[Settings] = None
         self._llm_client: Optional[LLMClient] = None
+        self._ollama_clients: List[OllamaClient] = []
+        self._ollama_router: Optional[OllamaRouter] = None
+        self._breaker: Optional[CircuitBreakerLLMClient] = None
         self._chat_repo: Optional[ChatRepository] = None
+        self._write_behind: Optional[WriteBehindChatRepository] = None
         self._chat_service: Optional[ChatService] = None
+        self._residency: Optional[ModelResidencyManager] = None
+        self._metrics: Optional[MetricsRegistry] = None
+        self._pulls: Optional[PullManager] = None
+        self._vector_index: Optional[MmapVectorIndex] = None
+        self._retriever: Optional[Retriever] = None
+        self._ingestion: Optional[IngestionService] = None
 
     @property
     def settings(self) -> Settings:
         if self._settings is None:
             self._settings = get_settings()
-            configure_logging(self._settings.log_level, self._settings.environment)
+            configure_logging(
+                self._settings.LOG_LEVEL,
+                self._settings.ENVIRONMENT,
+                queue_size=self._settings.LOG_QUEUE_SIZE,
+                drop_policy=self._settings.LOG_QUEUE_DROP_POLICY,
+                rate_limit=self._settings.LOG_RATE_LIMIT,
+                rate_limit_burst=self._settings.LOG_RATE_LIMIT_BURST,
+                sample_rates=self._settings.LOG_SAMPLE_RATES,
+            )
+            configure_tracing(
+                enabled=self._settings.TRACING_ENABLED,
+                sample_rate=self._settings.TRACING_SAMPLE_RATE,
+                slow_trace_ms=self._settings.TRACING_SLOW_TRACE_MS,
+                max_traces=self._settings.TRACING_MAX_TRACES,
+                export_path=self._settings.TRACING_EXPORT_PATH,
+                export_format=self._settings.TRACING_EXPORT_FORMAT,
+            )
             logger.info("Settings loaded and logging configured.")
         return self._settings
 
+    def _build_ollama_client(self, base_url: str) -> OllamaClient:
+        client = OllamaClient(
+            base_url=base_url,
+            timeout=self.settings.OLLAMA_TIMEOUT,
+            connect_timeout=self.settings.OLLAMA_CONNECT_TIMEOUT,
+            read_timeout=self.settings.OLLAMA_READ_TIMEOUT,
+            first_byte_timeout=self.settings.OLLAMA_FIRST_BYTE_TIMEOUT,
+            max_connections=self.settings.OLLAMA_MAX_CONNECTIONS,
+            max_keepalive_connections=self.settings.OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=self.settings.OLLAMA_KEEPALIVE_EXPIRY,
+            http2=self.settings.OLLAMA_HTTP2,
+        )
+        return instrument(client, "ollama", exclude=("open", "aclose"))
+
     @property
     def llm_client(self) -> LLMClient:
         if self._llm_client is None:
             # Auto-register default adapter
-            self._llm_client = OllamaClient(
-                base_url=self.settings.OLLAMA_BASE_URL, timeout=self.settings.OLLAMA_TIMEOUT
-            )
+            urls = self.settings.OLLAMA_BASE_URLS or [self.settings.OLLAMA_BASE_URL]
+            self._ollama_clients = [self._build_ollama_client(url) for url in urls]
+
+            backend: LLMClient = self._ollama_clients[0]
+            if len(self._ollama_clients) > 1:
+                self._ollama_router = OllamaRouter(
+                    self._ollama_clients,
+                    poll_interval=self.settings.OLLAMA_NODE_POLL_INTERVAL,
+                    cooldown=self.settings.OLLAMA_NODE_COOLDOWN,
+                )
+                backend = self._ollama_router
+            if self.settings.CIRCUIT_BREAKER_ENABLED:
+                self._breaker = CircuitBreakerLLMClient(
+                    backend,
+                    failure_threshold=self.settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                    reset_timeout=self.settings.CIRCUIT_BREAKER_RESET_TIMEOUT,
+                    max_reset_timeout=self.settings.CIRCUIT_BREAKER_MAX_RESET_TIMEOUT,
+                    probe_interval=self.settings.HEALTH_PROBE_INTERVAL,
+                    probe_timeout=self.settings.HEALTH_PROBE_TIMEOUT,
+                )
+                backend = self._breaker
+
+            client: LLMClient = CachingLLMClient(backend, ttl=self.settings.MODEL_CACHE_TTL)
+            if self.settings.RESPONSE_CACHE_ENABLED:
+                store = None
+                if self.settings.RESPONSE_CACHE_PATH:
+                    store = SqliteResponseStore(
+                        self.settings.RESPONSE_CACHE_PATH,
+                        ttl=self.settings.RESPONSE_CACHE_TTL,
+                        max_entries=self.settings.RESPONSE_CACHE_MAX_ENTRIES,
+                    )
+                client = ResponseCachingLLMClient(
+                    client,
+                    max_entries=self.settings.RESPONSE_CACHE_MAX_ENTRIES,
+                    ttl=self.settings.RESPONSE_CACHE_TTL,
+                    store=store,
+                )
+            self._llm_client = client
         return self._llm_client
 
     @property
     def chat_repo(self) -> ChatRepository:
         if self._chat_repo is None:
-            self._chat_repo = SqlAlchemyChatRepository()
+            sql_repo = SqlAlchemyChatRepository(session_factory=AsyncSessionLocal)
+            repo: ChatRepository = sql_repo
+            if self.settings.WRITE_BEHIND_ENABLED:
+                self._write_behind = WriteBehindChatRepository(
+                    sql_repo,
+                    writer=sql_repo,
+                    max_batch_size=self.settings.WRITE_BEHIND_BATCH_SIZE,
+                    max_delay=self.settings.WRITE_BEHIND_MAX_DELAY,
+                    max_pending=self.settings.WRITE_BEHIND_MAX_PENDING,
+                )
+                repo = self._write_behind
+            if self.settings.SESSION_CACHE_ENABLED:
+                repo = CachingChatRepository(
+                    repo,
+                    max_messages=self.settings.SESSION_CACHE_MAX_MESSAGES,
+                    max_bytes=self.settings.SESSION_CACHE_MAX_BYTES,
+                )
+            instrument(sql_repo, "repo")  # in place, so the write-behind writer is traced too
+            self._chat_repo = repo
         return self._chat_repo
 
+    @property
+    def residency(self) -> Optional[ModelResidencyManager]:
+        if self._residency is None and self.settings.MODEL_RESIDENCY_ENABLED:
+            self._residency = ModelResidencyManager(
+                self.llm_client,
+                default_keep_alive=self.settings.MODEL_KEEP_ALIVE_DEFAULT,
+                keep_alive=self.settings.MODEL_KEEP_ALIVE,
+                memory_budget=self.settings.MODEL_MEMORY_BUDGET_BYTES,
+                poll_interval=self.settings.MODEL_RESIDENCY_POLL_INTERVAL,
+            )
+        return self._residency
+
+    @property
+    def pulls(self) -> PullManager:
+        if self._pulls is None:
+            self._pulls = PullManager(
+                self.llm_client,
+                max_concurrent=self.settings.PULL_MAX_CONCURRENT,
+                progress_interval=self.settings.PULL_PROGRESS_INTERVAL,
+                max_retries=self.settings.PULL_MAX_RETRIES,
+                retry_backoff=self.settings.PULL_RETRY_BACKOFF,
+                stall_timeout=self.settings.PULL_STALL_TIMEOUT,
+            )
+        return self._pulls
+
+    @property
+    def vector_index(self) -> MmapVectorIndex:
+        if self._vector_index is None:
+            self._vector_index = MmapVectorIndex(self.settings.RAG_INDEX_PATH)
+        return self._vector_index
+
+    @property
+    def retriever(self) -> Optional[Retriever]:
+        if self._retriever is None and self.settings.RAG_ENABLED:
+            retriever = Retriever(
+                self.llm_client,
+                self.vector_index,
+                SqlAlchemyDocumentStore(session_factory=AsyncSessionLocal),
+                model=self.settings.RAG_EMBED_MODEL,
+                top_k=self.settings.RAG_TOP_K,
+                min_score=self.settings.RAG_MIN_SCORE,
+                max_context_tokens=self.settings.RAG_MAX_CONTEXT_TOKENS,
+            )
+            self._retriever = instrument(retriever, "rag")
+        return self._retriever
+
+    @property
+    def ingestion(self) -> IngestionService:
+        if self._ingestion is None:
+            self._ingestion = IngestionService(
+                self.llm_client,
+                self.vector_index,
+                SqlAlchemyDocumentStore(session_factory=AsyncSessionLocal),
+                model=self.settings.RAG_EMBED_MODEL,
+                chunk_tokens=self.settings.RAG_CHUNK_TOKENS,
+                overlap_tokens=self.settings.RAG_CHUNK_OVERLAP_TOKENS,
+                batch_size=self.settings.RAG_EMBED_BATCH_SIZE,
+            )
+        return self._ingestion
+
+    @property
+    def metrics(self) -> Optional[MetricsRegistry]:
+        if self._metrics is None and self.settings.METRICS_ENABLED:
+            self._metrics = register_chat_metrics(MetricsRegistry())
+        return self._metrics
+
     @property
     def chat_service(self) -> ChatService:
         if self._chat_service is None:
-            self._chat_service = ChatService(llm_client=self.llm_client, chat_repo=self.chat_repo)
+            service = ChatService(
+                llm_client=self.llm_client,
+                chat_repo=self.chat_repo,
+                context_window=ContextWindowBuilder(
+                    default_budget=self.settings.CONTEXT_TOKEN_BUDGET,
+                    response_reserve=self.settings.CONTEXT_RESPONSE_RESERVE,
+                    model_budgets=self.settings.CONTEXT_MODEL_BUDGETS,
+                ),
+                coalescer=(
+                    TokenCoalescer(
+                        max_delay=self.settings.STREAM_COALESCE_MAX_DELAY,
+                        max_bytes=self.settings.STREAM_COALESCE_MAX_BYTES,
+                    )
+                    if self.settings.STREAM_COALESCE_ENABLED
+                    else None
+                ),
+                scheduler=(
+                    RequestScheduler(
+                        concurrency=self.settings.SCHEDULER_CONCURRENCY,
+                        max_queue=self.settings.SCHEDULER_MAX_QUEUE,
+                        model_concurrency=self.settings.SCHEDULER_MODEL_CONCURRENCY,
+                        max_wait=self.settings.SCHEDULER_MAX_WAIT,
+                    )
+                    if self.settings.SCHEDULER_ENABLED
+                    else None
+                ),
+                residency=self.residency,
+                metrics=self.metrics,
+                pulls=self.pulls,
+                retriever=self.retriever,
+                health=self._breaker,
+            )
+            self._chat_service = instrument(service, "chat")
         return self._chat_service
 
+    async def startup(self) -> None:
+        """Open long-lived resources. Call once when the app starts."""
+        _ = self.llm_client
+        for client in self._ollama_clients:
+            await client.open()
+        if self._ollama_router is not None:
+            await self._ollama_router.start()
+        if self._breaker is not None:
+            await self._breaker.start()
+        if self.residency is not None:
+            await self.residency.start()
+        _ = self.chat_repo
+        if self._write_behind is not None:
+            self._write_behind.start()
+        logger.info("Container started.")
+
+    async def shutdown(self) -> None:
+        """Release long-lived resources. Call once when the app stops."""
+        if self._pulls is not None:
+            await self._pulls.close()
+        if self._residency is not None:
+            await self._residency.stop()
+        if self._breaker is not None:
+            await self._breaker.stop()
+        if self._ollama_router is not None:
+            await self._ollama_router.stop()
+        for client in self._ollama_clients:
+            await client.aclose()
+        if self._write_behind is not None:
+            # Persist buffered messages before the engine goes away
+            await self._write_behind.close()
+        await dispose_engines()
+        logger.info("Container shut down.")
+
 
 # Global container instance
 container = Container()
@@ -0,0 +1,47 @@
+"""
+Ingest local documents for retrieval (RAG).
+
+    python -m app.ingest ~/notes docs/manual.md
+
+Directories are walked recursively for text files (see
+adapters.document_loader.TEXT_EXTENSIONS). Chunks are embedded with
+RAG_EMBED_MODEL and appended to the vector index at RAG_INDEX_PATH;
+documents already ingested are skipped, so re-running is cheap.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from adapters.document_loader import load_documents
+from app.container import container
+from services.ingestion import IngestionProgress
+
+logger = logging.getLogger(__name__)
+
+
+def log_progress(progress: IngestionProgress) -> None:
+    state = "done" if progress.finished else "progress"
+    logger.info(
+        f"{state}: {progress.documents} documents, {progress.chunks} chunks, "
+        f"{progress.chunks_per_second:,.0f} chunks/s, {progress.elapsed:.1f}s"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    try:
+        await container.ingestion.ingest(load_documents(args.paths), on_progress=log_progress)
+        logger.info(f"Vector index now holds {len(container.vector_index)} chunks")
+    finally:
+        await container.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest documents for retrieval")
+    parser.add_argument("paths", nargs="+", help="files or directories")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Local stand-in for the Ollama HTTP API, for benchmarks and load tests.
+
+Serves /api/chat (NDJSON stream at a configurable token rate), /api/tags,
+/api/show, /api/ps, /api/generate (load/unload), /api/pull (streamed
+progress), /api/embed and /api/delete over plain HTTP/1.1 with keep-alive,
+so the real OllamaClient and its connection pool are exercised end to end.
+Embeddings are hashed bags of words: texts sharing words are similar,
+which is enough to exercise retrieval.
+
+    python -m benchmarks.fake_ollama --port 11435 --tokens-per-second 40
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def _digest(name: str) -> str:
+    return "sha256:" + hashlib.sha256(name.encode()).hexdigest()
+
+
+@dataclass
+class FakeOllamaConfig:
+    models: List[str] = field(default_factory=lambda: ["fake:latest"])
+    tokens_per_second: float = 50.0
+    response_tokens: int = 64
+    prompt_latency: float = 0.05  # seconds before the first token (prompt eval)
+    load_latency: float = 0.5  # extra first-token delay when the model is not loaded
+    jitter: float = 0.1  # +/- fraction applied to every delay
+    pull_duration: float = 2.0  # seconds to "download" a model
+    context_length: int = 8192
+    model_size: int = 2_000_000_000  # bytes reported by /api/tags and /api/ps
+    embedding_dimensions: int = 384
+    embed_latency: float = 0.01  # seconds per /api/embed request (any model name works)
+
+
+class FakeOllamaServer:
+    def __init__(self, config: Optional[FakeOllamaConfig] = None):
+        self.config = config or FakeOllamaConfig()
+        self.models: Set[str] = set(self.config.models)
+        self.loaded: Set[str] = set()
+        self.requests = 0
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None, "server not started"
+        return int(self._server.sockets[0].getsockname()[1])
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> "FakeOllamaServer":
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        assert self._server is not None, "server not started"
+        await self._server.serve_forever()
+
+    def _delay(self, seconds: float) -> float:
+        if seconds <= 0:
+            return 0.0
+        return max(0.0, seconds * random.uniform(1 - self.config.jitter, 1 + self.config.jitter))
+
+    # --- HTTP plumbing ---------------------------------------------------
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, body = request
+                self.requests += 1
+                await self._dispatch(method, path, body, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+        length = 0
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value.strip())
+        raw = await reader.readexactly(length) if length else b""
+        body = json.loads(raw) if raw else {}
+        return method, target.split("?", 1)[0], body
+
+    async def _send_json(
+        self, writer: asyncio.StreamWriter, payload: Dict[str, Any], status: int = 200
+    ) -> None:
+        data = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n"
+        )
+        writer.write(head.encode() + data)
+        await writer.drain()
+
+    async def _send_stream(
+        self, writer: asyncio.StreamWriter, lines: AsyncIterator[Dict[str, Any]]
+    ) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        async for payload in lines:
+            data = json.dumps(payload).encode() + b"\n"
+            writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _dispatch(
+        self, method: str, path: str, body: Dict[str, Any], writer: asyncio.StreamWriter
+    ) -> None:
+        if path == "/api/tags":
+            await self._send_json(writer, {"models": [self._model_entry(m) for m in self.models]})
+        elif path == "/api/ps":
+            await self._send_json(writer, {"models": [self._running_entry(m) for m in self.loaded]})
+        elif path == "/api/show":
+            name = body.get("model") or body.get("name", "")
+            if name not in self.models:
+                await self._send_json(writer, {"error": f"model '{name}' not found"}, 404)
+            else:
+                await self._send_json(writer, self._show(name))
+        elif path == "/api/generate":
+            await self._send_json(writer, self._generate(body))
+        elif path == "/api/chat":
+            name = body.get("model", "")
+            if name not in self.models:
+                await self._send_json(writer, {"error": f"model '{name}' not found"}, 404)
+            else:
+                await self._send_stream(writer, self._chat(body))
+        elif path == "/api/pull":
+            await self._send_stream(writer, self._pull(body.get("name") or body.get("model", "")))
+        elif path == "/api/embed":
+            await self._send_json(writer, await self._embed(body))
+        elif path == "/api/delete" and method == "DELETE":
+            name = body.get("name") or body.get("model", "")
+            found = name in self.models
+            self.models.discard(name)
+            self.loaded.discard(name)
+            await self._send_json(writer, {}, 200 if found else 404)
+        else:
+            await self._send_json(writer, {"error": "not found"}, 404)
+
+    # --- API behaviour ---------------------------------------------------
+
+    def _model_entry(self, name: str) -> Dict[str, Any]:
+        return {
+            "name": name,
+            "model": name,
+            "size": self.config.model_size,
+            "digest": _digest(name),
+            "modified_at": datetime.now(timezone.utc).isoformat(),
+            "details": {"family": "fake", "parameter_size": "1B", "quantization_level": "Q4_0"},
+        }
+
+    def _running_entry(self, name: str) -> Dict[str, Any]:
+        return {
+            "name": name,
+            "model": name,
+            "size": self.config.model_size,
+            "size_vram": self.config.model_size,
+        }
+
+    def _show(self, name: str) -> Dict[str, Any]:
+        return {
+            "details": {"family": "fake", "parameter_size": "1B", "quantization_level": "Q4_0"},
+            "model_info": {
+                "general.architecture": "fake",
+                "fake.context_length": self.config.context_length,
+            },
+            "parameters": "",
+        }
+
+    def _generate(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        name = body.get("model", "")
+        if body.get("keep_alive") == 0:
+            self.loaded.discard(name)
+        elif name in self.models:
+            self.loaded.add(name)
+        return {"model": name, "response": "", "done": True}
+
+    def _embedding(self, text: str) -> List[float]:
+        vector = [0.0] * self.config.embedding_dimensions
+        for word in text.lower().split():
+            h = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+            vector[h % len(vector)] += 1.0 if h >> 63 else -1.0
+        norm = sum(v * v for v in vector) ** 0.5 or 1.0
+        return [v / norm for v in vector]
+
+    async def _embed(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        await asyncio.sleep(self._delay(self.config.embed_latency))
+        return {"model": body.get("model", ""), "embeddings": [self._embedding(t) for t in inputs]}
+
+    async def _chat(self, body: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        name = body["model"]
+        started = time.perf_counter()
+        load = 0.0
+        if name not in self.loaded:
+            load = self._delay(self.config.load_latency)
+            await asyncio.sleep(load)
+            self.loaded.add(name)
+
+        prompt_chars = sum(len(m.get("content", "")) for m in body.get("messages", []))
+        prompt_eval = self._delay(self.config.prompt_latency)
+        await asyncio.sleep(prompt_eval)
+
+        eval_started = time.perf_counter()
+        interval = 1.0 / self.config.tokens_per_second
+        for i in range(self.config.response_tokens):
+            # Schedule against the stream start so sleep overhead doesn't accumulate
+            target = eval_started + i * interval
+            await asyncio.sleep(max(0.0, target - time.perf_counter()))
+            yield {
+                "model": name,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "message": {"role": "assistant", "content": f"tok{i} "},
+                "done": False,
+            }
+        eval_duration = time.perf_counter() - eval_started
+
+        yield {
+            "model": name,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "message": {"role": "assistant", "content": ""},
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+            "load_duration": int(load * 1e9),
+            "prompt_eval_count": max(1, prompt_chars // 4),
+            "prompt_eval_duration": int(prompt_eval * 1e9),
+            "eval_count": self.config.response_tokens,
+            "eval_duration": int(eval_duration * 1e9),
+        }
+
+    async def _pull(self, name: str) -> AsyncIterator[Dict[str, Any]]:
+        yield {"status": "pulling manifest"}
+        total = self.config.model_size
+        steps = 20
+        digest = _digest(name)
+        for step in range(1, steps + 1):
+            await asyncio.sleep(self.config.pull_duration / steps)
+            yield {
+                "status": f"pulling {digest[7:19]}",
+                "digest": digest,
+                "total": total,
+                "completed": total * step // steps,
+            }
+        yield {"status": "verifying sha256 digest"}
+        yield {"status": "writing manifest"}
+        self.models.add(name)
+        yield {"status": "success"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Ollama server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--model", action="append", dest="models")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--response-tokens", type=int, default=64)
+    parser.add_argument("--prompt-latency", type=float, default=0.05)
+    parser.add_argument("--load-latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    args = parser.parse_args()
+
+    config = FakeOllamaConfig(
+        models=args.models or ["fake:latest"],
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        prompt_latency=args.prompt_latency,
+        load_latency=args.load_latency,
+        jitter=args.jitter,
+    )
+
+    async def run() -> None:
+        server = await FakeOllamaServer(config).start(args.host, args.port)
+        print(f"Fake Ollama listening on {server.base_url}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Microbenchmark: loading a long session's history.
+
+Compares the ORM path (MessageModel instances via selectinload, then one
+Message per row with UUID and metadata decoded up front) with the
+repository's column-select path (rows straight to slotted Messages with
+lazy id/metadata decoding).
+
+    python -m benchmarks.history_load --messages 1000 10000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from uuid import UUID
+
+
+async def _seed(session_factory: Any, messages: int) -> UUID:
+    from sqlalchemy import insert
+
+    from adapters.orm import ChatSessionModel, MessageModel
+
+    sid = str(uuid.uuid4())
+    start = datetime(2024, 1, 1)
+    ids = [str(uuid.uuid4()) for _ in range(messages)]
+    rows = [
+        {
+            "id": ids[i],
+            "session_id": sid,
+            "parent_id": ids[i - 1] if i else None,
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"message {i} " + "lorem ipsum dolor sit amet " * 8,
+            "created_at": start + timedelta(seconds=i),
+            "metadata_": {"token_count": 60, "cold_start": False},
+        }
+        for i in range(messages)
+    ]
+    head = ids[-1] if ids else None
+    async with session_factory() as db:
+        db.add(ChatSessionModel(id=sid, title="bench", model_name="fake:latest", head_id=head))
+        await db.flush()
+        await db.execute(insert(MessageModel), rows)
+        await db.commit()
+    return UUID(sid)
+
+
+async def _orm_get_session(session_factory: Any, session_id: UUID) -> Any:
+    """The previous implementation, kept here as the baseline."""
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+
+    from adapters.orm import ChatSessionModel
+    from domain.entities import ChatSession, Message, Role
+
+    async with session_factory() as db:
+        stmt = (
+            select(ChatSessionModel)
+            .options(selectinload(ChatSessionModel.messages))
+            .where(ChatSessionModel.id == str(session_id))
+        )
+        model = (await db.execute(stmt)).scalar_one()
+        return ChatSession(
+            id=UUID(model.id),
+            title=model.title,
+            created_at=model.created_at,
+            updated_at=model.updated_at,
+            model_name=model.model_name,
+            messages=[
+                Message(
+                    id=UUID(m.id),
+                    role=Role(m.role),
+                    content=m.content,
+                    created_at=m.created_at,
+                    metadata=m.metadata_,
+                )
+                for m in model.messages
+            ],
+        )
+
+
+async def _measure(load: Callable[[], Awaitable[Any]], repeat: int) -> Tuple[Dict[str, float], Any]:
+    await load()  # warm caches (SQLite pages, compiled statements)
+    timings: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await load()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    result = await load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }, result
+
+
+async def run(sizes: List[int], repeat: int) -> Dict[str, Any]:
+    from adapters.chat_repository import SqlAlchemyChatRepository
+    from adapters.db import AsyncSessionLocal, dispose_engines, init_db_async
+
+    await init_db_async()
+    repo = SqlAlchemyChatRepository(session_factory=AsyncSessionLocal)
+
+    results = []
+    for size in sizes:
+        session_id = await _seed(AsyncSessionLocal, size)
+        orm, baseline = await _measure(
+            lambda sid=session_id: _orm_get_session(AsyncSessionLocal, sid), repeat
+        )
+        core, loaded = await _measure(lambda sid=session_id: repo.get_session(sid), repeat)
+        assert [m.content for m in loaded.messages] == [m.content for m in baseline.messages]
+        results.append(
+            {
+                "messages": size,
+                "orm": orm,
+                "core": core,
+                "speedup": round(orm["median_ms"] / core["median_ms"], 2),
+                "memory_ratio": round(core["peak_kib"] / orm["peak_kib"], 2),
+            }
+        )
+    await dispose_engines()
+    return {"benchmark": "history_load", "repeat": repeat, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ORM vs column-select history loading")
+    parser.add_argument("--messages", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="guiollama-bench-") as tmpdir:
+        # The DB engines are created at import time
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmpdir}/history.db"
+        logging.getLogger("adapters.db").setLevel(logging.ERROR)  # seeding is a "slow query"
+        report = asyncio.run(run(args.messages, args.repeat))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Load generator: N concurrent sessions driving ChatService.stream_chat
+against the fake Ollama server, through the real container wiring
+(scheduler, caches, write-behind, SQLite).
+
+    python -m benchmarks.load --sessions 16 --turns 5 --output bench.json
+
+Prints (or writes) one JSON document with p50/p95/p99 time to first
+token, per-token latency, turn duration, turns/sec and DB time, so
+results can be diffed between commits.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_ollama import FakeOllamaConfig, FakeOllamaServer
+
+
+@dataclass
+class TurnSample:
+    ttft: float
+    duration: float
+    token_gaps: List[float]
+
+
+@dataclass
+class DbTimer:
+    """Times every statement on an engine via SQLAlchemy cursor events."""
+
+    statements: int = 0
+    total: float = 0.0
+    _started: List[float] = field(default_factory=list)
+
+    def attach(self, sync_engine: Any) -> None:
+        from sqlalchemy import event
+
+        event.listen(sync_engine, "before_cursor_execute", self._before)
+        event.listen(sync_engine, "after_cursor_execute", self._after)
+
+    def _before(self, *args: Any) -> None:
+        self._started.append(time.perf_counter())
+
+    def _after(self, *args: Any) -> None:
+        self.total += time.perf_counter() - self._started.pop()
+        self.statements += 1
+
+
+def percentiles(values: List[float], scale: float = 1000.0) -> Dict[str, float]:
+    """p50/p95/p99, mean and max of `values` (seconds), in milliseconds by default."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(p: float) -> float:
+        # Linear interpolation between closest ranks
+        k = (len(ordered) - 1) * p
+        lower = int(k)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+    return {
+        "p50": round(pick(0.50) * scale, 3),
+        "p95": round(pick(0.95) * scale, 3),
+        "p99": round(pick(0.99) * scale, 3),
+        "mean": round(statistics.fmean(ordered) * scale, 3),
+        "max": round(ordered[-1] * scale, 3),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_session(
+    service: Any, model: str, turns: int, prompt: str, samples: List[TurnSample], errors: List[str]
+) -> None:
+    session = await service.create_new_session(model)
+    for turn in range(turns):
+        started = time.perf_counter()
+        last = started
+        ttft: Optional[float] = None
+        gaps: List[float] = []
+        try:
+            async for _chunk in service.stream_chat(session.id, f"{prompt} #{turn}", model):
+                now = time.perf_counter()
+                if ttft is None:
+                    ttft = now - started
+                else:
+                    gaps.append(now - last)
+                last = now
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            continue
+        if ttft is not None:
+            samples.append(TurnSample(ttft=ttft, duration=last - started, token_gaps=gaps))
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    server = await FakeOllamaServer(
+        FakeOllamaConfig(
+            models=[args.model],
+            tokens_per_second=args.tokens_per_second,
+            response_tokens=args.response_tokens,
+            prompt_latency=args.prompt_latency,
+            load_latency=args.load_latency,
+            jitter=args.jitter,
+        )
+    ).start()
+
+    # Settings and the DB engines are read at import time
+    os.environ["OLLAMA_BASE_URL"] = server.base_url
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("LOG_LEVEL", "ERROR")  # keep stdout clean for the report
+    from adapters.db import async_engine, init_db_async
+    from app.container import Container
+
+    await init_db_async()
+    container = Container()
+    await container.startup()
+    db = DbTimer()
+    db.attach(async_engine.sync_engine)
+    service = container.chat_service
+
+    samples: List[TurnSample] = []
+    errors: List[str] = []
+    if args.warmup:
+        await run_session(service, args.model, args.warmup, args.prompt, [], errors)
+        db.statements, db.total = 0, 0.0
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_session(service, args.model, args.turns, args.prompt, samples, errors)
+            for _ in range(args.sessions)
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    await container.shutdown()  # flushes write-behind, so its DB time is counted
+    await server.stop()
+
+    turns = len(samples)
+    return {
+        "benchmark": "chat_stream_load",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "sessions": args.sessions,
+            "turns_per_session": args.turns,
+            "model": args.model,
+            "tokens_per_second": args.tokens_per_second,
+            "response_tokens": args.response_tokens,
+            "prompt_latency_s": args.prompt_latency,
+            "load_latency_s": args.load_latency,
+            "database_url": args.database_url,
+            "scheduler_concurrency": (
+                container.settings.SCHEDULER_CONCURRENCY
+                if container.settings.SCHEDULER_ENABLED
+                else None
+            ),
+        },
+        "turns": turns,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "elapsed_s": round(elapsed, 3),
+        "turns_per_sec": round(turns / elapsed, 3) if elapsed else 0.0,
+        "ttft_ms": percentiles([s.ttft for s in samples]),
+        "token_latency_ms": percentiles([g for s in samples for g in s.token_gaps]),
+        "turn_ms": percentiles([s.duration for s in samples]),
+        "db": {
+            "statements": db.statements,
+            "total_ms": round(db.total * 1000, 3),
+            "per_turn_ms": round(db.total * 1000 / turns, 3) if turns else 0.0,
+        },
+        "fake_server_requests": server.requests,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent chat load test against fake Ollama")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions")
+    parser.add_argument("--turns", type=int, default=5, help="turns per session")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed warm-up turns")
+    parser.add_argument("--model", default="fake:latest")
+    parser.add_argument("--prompt", default="Tell me something interesting")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--response-tokens", type=int, default=64)
+    parser.add_argument("--prompt-latency", type=float, default=0.02)
+    parser.add_argument("--load-latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.database_url is None:
+        tmpdir = tempfile.TemporaryDirectory(prefix="guiollama-bench-")
+        args.database_url = f"sqlite:///{tmpdir.name}/bench.db"
+
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Benchmark: document ingestion throughput and retrieval latency.
+
+Ingests synthetic documents through the real pipeline (chunking, dedupe,
+/api/embed on the fake server, vector index, SQLite), pads the index with
+random vectors up to --chunks, then times vector search alone and full
+retrieval (query embedding + search + chunk lookup).
+
+    python -m benchmarks.retrieval --documents 200 --chunks 50000 --dimensions 768
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import tempfile
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List
+
+from benchmarks.fake_ollama import FakeOllamaConfig, FakeOllamaServer
+from benchmarks.load import percentiles
+
+EMBED_MODEL = "fake-embed"
+
+
+def _vocabulary(size: int, rng: random.Random) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(3, 9))) for _ in range(size)]
+
+
+def _document_text(words: List[str], paragraphs: int, rng: random.Random) -> str:
+    return "\n\n".join(
+        ". ".join(" ".join(rng.choices(words, k=12)) for _ in range(6)) + "."
+        for _ in range(paragraphs)
+    )
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import numpy as np
+
+    server = await FakeOllamaServer(
+        FakeOllamaConfig(embedding_dimensions=args.dimensions, embed_latency=0.0, jitter=0.0)
+    ).start()
+
+    # The DB engines are created at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    from adapters.db import AsyncSessionLocal, dispose_engines, init_db_async
+    from adapters.document_store import SqlAlchemyDocumentStore
+    from adapters.ollama_client import OllamaClient
+    from adapters.vector_index import MmapVectorIndex
+    from domain.entities import Document, DocumentChunk
+    from services.ingestion import IngestionService
+    from services.retrieval import Retriever
+
+    await init_db_async()
+    llm = OllamaClient(server.base_url)
+    index = MmapVectorIndex(args.index_path)
+    store = SqlAlchemyDocumentStore(session_factory=AsyncSessionLocal)
+
+    rng = random.Random(42)
+    words = _vocabulary(5000, rng)
+    texts = [_document_text(words, args.paragraphs, rng) for _ in range(args.documents)]
+
+    async def documents() -> AsyncIterator[Document]:
+        for i, text in enumerate(texts):
+            yield Document(source=f"doc-{i}.md", text=text)
+
+    ingestion = IngestionService(llm, index, store, EMBED_MODEL, batch_size=args.batch_size)
+    progress = await ingestion.ingest(documents())
+    ingest_seconds = progress.elapsed
+    again = await ingestion.ingest(documents())  # every document is skipped
+    reingest_seconds = again.elapsed
+
+    # Pad to the target size with random vectors (and chunk rows to look up)
+    padding = max(args.chunks - len(index), 0)
+    filler_id = await store.begin_document("padding", uuid.uuid4().hex)
+    assert filler_id is not None
+    block = 10_000
+    for start in range(0, padding, block):
+        count = min(block, padding - start)
+        first = await index.add(
+            EMBED_MODEL, np.random.default_rng(start).normal(size=(count, args.dimensions))
+        )
+        await store.add_chunks(
+            [
+                DocumentChunk(
+                    id=first + i,
+                    document_id=filler_id,
+                    source="",
+                    ordinal=i,
+                    content="padding",
+                    content_hash=uuid.uuid4().hex,
+                )
+                for i in range(count)
+            ]
+        )
+
+    queries = [rng.choice(rng.choice(texts).split(". ")) for _ in range(args.queries)]
+    retriever = Retriever(llm, index, store, EMBED_MODEL, top_k=args.top_k, min_score=0.0)
+    vectors = await llm.embed(EMBED_MODEL, queries)
+
+    search: List[float] = []
+    for vector in vectors:
+        started = time.perf_counter()
+        await index.search(vector, args.top_k)
+        search.append(time.perf_counter() - started)
+
+    retrieve: List[float] = []
+    hits = 0
+    for query in queries:
+        started = time.perf_counter()
+        results = await retriever.retrieve(query)
+        retrieve.append(time.perf_counter() - started)
+        hits += bool(results) and any(query in r.chunk.content for r in results)
+
+    await llm.aclose()
+    await server.stop()
+    await dispose_engines()
+
+    return {
+        "benchmark": "retrieval",
+        "config": {
+            "documents": args.documents,
+            "dimensions": args.dimensions,
+            "batch_size": args.batch_size,
+            "top_k": args.top_k,
+            "queries": args.queries,
+        },
+        "ingestion": {
+            "documents": progress.documents,
+            "chunks": progress.chunks,
+            "duplicate_chunks": progress.duplicate_chunks,
+            "seconds": round(ingest_seconds, 3),
+            "chunks_per_sec": round(progress.chunks / ingest_seconds, 1),
+            "reingest_skipped_documents": again.skipped_documents,
+            "reingest_seconds": round(reingest_seconds, 3),
+        },
+        "index": {
+            "chunks": len(index),
+            "file_mb": round(os.path.getsize(args.index_path) / 2**20, 1),
+        },
+        "search_ms": percentiles(search),
+        "retrieve_ms": percentiles(retrieve),
+        "retrieve_recall": round(hits / len(queries), 3),  # query sentence found in a hit
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingestion throughput and retrieval latency")
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=20, help="per document")
+    parser.add_argument("--chunks", type=int, default=50_000, help="index size after padding")
+    parser.add_argument("--dimensions", type=int, default=768)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="guiollama-bench-") as tmpdir:
+        args.database_url = f"sqlite:///{tmpdir}/rag.db"
+        args.index_path = f"{tmpdir}/vectors.f32"
+        logging.getLogger("adapters.db").setLevel(logging.ERROR)  # bulk inserts are "slow"
+        report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
+import base64
+import json
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Generic, List, Optional, TypeVar, Union
 from uuid import UUID, uuid4
 
+T = TypeVar("T")
+
+# Ollama keep_alive: a duration string ("10m", "1h"), seconds, 0 to unload, -1 forever
+KeepAlive = Union[str, int]
+
 
 class Role(str, Enum):
     SYSTEM = "system"
@@ -12,13 +19,103 @@ class Role(str, Enum):
     TOOL = "tool"
 
 
-@dataclass
 class Message:
-    role: Role
-    content: str
-    id: UUID = field(default_factory=uuid4)
-    created_at: datetime = field(default_factory=datetime.now)
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    """
+    A chat message. Slotted to keep long histories compact. Messages read
+    from the database via from_row() keep their id and metadata in stored
+    form (string / JSON text) and decode them on first access, since most
+    loaded messages are only rendered, never inspected.
+
+    `parent_id` is the previous message of the conversation. Histories are
+    trees: forks share the messages before their fork point.
+    """
+
+    __slots__ = ("role", "content", "created_at", "_id", "_metadata", "_parent_id")
+
+    def __init__(
+        self,
+        role: Role,
+        content: str,
+        id: Optional[UUID] = None,
+        created_at: Optional[datetime] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        parent_id: Optional[UUID] = None,
+    ):
+        self.role = role
+        self.content = content
+        self.created_at = created_at if created_at is not None else datetime.now()
+        self._id: Union[UUID, str] = id if id is not None else uuid4()
+        self._metadata: Union[Dict[str, Any], str, None] = metadata if metadata is not None else {}
+        self._parent_id: Union[UUID, str, None] = parent_id
+
+    @classmethod
+    def from_row(
+        cls,
+        id: str,
+        role: str,
+        content: str,
+        created_at: datetime,
+        metadata: Union[Dict[str, Any], str, None],
+        parent_id: Optional[str] = None,
+    ) -> "Message":
+        """Build from raw column values without decoding the ids or metadata."""
+        message = cls.__new__(cls)
+        message.role = Role(role)
+        message.content = content
+        message.created_at = created_at
+        message._id = id
+        message._metadata = metadata
+        message._parent_id = parent_id
+        return message
+
+    @property
+    def id(self) -> UUID:
+        if not isinstance(self._id, UUID):
+            self._id = UUID(self._id)
+        return self._id
+
+    @id.setter
+    def id(self, value: UUID) -> None:
+        self._id = value
+
+    @property
+    def parent_id(self) -> Optional[UUID]:
+        if self._parent_id is not None and not isinstance(self._parent_id, UUID):
+            self._parent_id = UUID(self._parent_id)
+        return self._parent_id
+
+    @parent_id.setter
+    def parent_id(self, value: Optional[UUID]) -> None:
+        self._parent_id = value
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if not isinstance(self._metadata, dict):
+            self._metadata = json.loads(self._metadata) if self._metadata else {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]) -> None:
+        self._metadata = value
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Message):
+            return NotImplemented
+        return (self.id, self.role, self.content, self.created_at, self.metadata) == (
+            other.id,
+            other.role,
+            other.content,
+            other.created_at,
+            other.metadata,
+        )
+
+    __hash__ = None  # type: ignore[assignment]  # mutable, like the dataclass it replaces
+
+    def __repr__(self) -> str:
+        return (
+            f"Message(role={self.role!r}, content={self.content!r}, id={self.id!r}, "
+            f"created_at={self.created_at!r}, metadata={self.metadata!r})"
+        )
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -27,7 +124,7 @@ class Message:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatSession:
     id: UUID = field(default_factory=uuid4)
     title: str = "New Chat"
@@ -35,6 +132,8 @@ class ChatSession:
     updated_at: datetime = field(default_factory=datetime.now)
     messages: List[Message] = field(default_factory=list)
     model_name: str = "llama2"  # Default fallback
+    head_id: Optional[UUID] = None  # last message of the session's branch
+    forked_from_id: Optional[UUID] = None  # message this session branched off at
 
 
 @dataclass
@@ -44,3 +143,150 @@ class ModelInfo:
     digest: str
     modified_at: datetime
     details: Dict[str, Any] = field(default_factory=dict)  # family, format, quantization_level
+
+    @staticmethod
+    def full_name(name: str) -> str:
+        """Ollama's canonical model name: "llama3" means "llama3:latest"."""
+        # Only the last path segment holds a tag; a registry host may hold a port
+        return name if ":" in name.rsplit("/", 1)[-1] else f"{name}:latest"
+
+
+@dataclass
+class GenerationStats:
+    """
+    Timings of one generation. Server-side fields come from Ollama's final
+    `done` chunk (durations in nanoseconds); ttft is measured client-side.
+    """
+
+    eval_count: int = 0  # generated tokens
+    eval_duration: int = 0
+    prompt_eval_count: int = 0  # prompt tokens actually evaluated (not KV-cached)
+    prompt_eval_duration: int = 0
+    load_duration: int = 0  # time spent loading the model, ~0 when warm
+    total_duration: int = 0
+    ttft: Optional[float] = None  # seconds from request to first token
+    done: bool = False  # the server reported completion
+    cached: bool = False  # replayed from the response cache, no server timings
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        if not self.eval_count or not self.eval_duration:
+            return None
+        return self.eval_count / (self.eval_duration / 1e9)
+
+    @property
+    def prompt_tokens_per_second(self) -> Optional[float]:
+        if not self.prompt_eval_count or not self.prompt_eval_duration:
+            return None
+        return self.prompt_eval_count / (self.prompt_eval_duration / 1e9)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact, JSON-friendly form (milliseconds) for message metadata."""
+        data: Dict[str, Any] = {}
+        if self.ttft is not None:
+            data["ttft_ms"] = round(self.ttft * 1000, 1)
+        if self.cached:
+            data["cached"] = True
+        if self.done:
+            data.update(
+                eval_count=self.eval_count,
+                prompt_eval_count=self.prompt_eval_count,
+                eval_ms=round(self.eval_duration / 1e6, 1),
+                prompt_eval_ms=round(self.prompt_eval_duration / 1e6, 1),
+                load_ms=round(self.load_duration / 1e6, 1),
+                total_ms=round(self.total_duration / 1e6, 1),
+            )
+            tps = self.tokens_per_second
+            if tps is not None:
+                data["tokens_per_second"] = round(tps, 2)
+        return data
+
+
+@dataclass
+class SearchHit:
+    """A message matching a full-text search, with a highlighted excerpt."""
+
+    message_id: UUID
+    session_id: UUID
+    session_title: str
+    role: Role
+    created_at: datetime
+    snippet: str
+    rank: float  # lower is more relevant (bm25)
+
+
+@dataclass
+class Document:
+    """A source document to ingest: where it came from and its text."""
+
+    source: str
+    text: str
+
+
+@dataclass
+class DocumentChunk:
+    """A piece of an ingested document. `id` is also its row in the vector index."""
+
+    id: int
+    document_id: UUID
+    source: str
+    ordinal: int  # position within the document
+    content: str
+    content_hash: str
+
+
+@dataclass
+class RetrievedChunk:
+    chunk: DocumentChunk
+    score: float  # cosine similarity to the query, higher is more relevant
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"  # healthy: requests go through
+    OPEN = "open"  # failing: requests fail fast until a probe succeeds
+    HALF_OPEN = "half_open"  # recovering: a trial request decides
+
+
+@dataclass
+class BackendHealth:
+    """Health of the LLM backend as seen by the circuit breaker."""
+
+    state: CircuitState
+    consecutive_failures: int = 0
+    last_error: Optional[str] = None
+    last_failure_at: Optional[datetime] = None
+    retry_in: Optional[float] = None  # seconds until the next trial, while open
+
+    @property
+    def degraded(self) -> bool:
+        return self.state != CircuitState.CLOSED
+
+
+@dataclass(frozen=True)
+class PageCursor:
+    """
+    Keyset pagination position: the (timestamp, id) of the last item seen.
+    encode()/decode() give an opaque token safe to hand to the UI.
+    """
+
+    timestamp: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        raw = f"{self.timestamp.isoformat()}|{self.id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "PageCursor":
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+            timestamp, id_ = raw.split("|", 1)
+            return cls(timestamp=datetime.fromisoformat(timestamp), id=UUID(id_))
+        except ValueError as e:
+            raise ValueError(f"Invalid page cursor: {token!r}") from e
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None  # None when there are no more items
@@ -14,3 +14,27 @@ class LLMModelNotFoundError(LLMException):
     """Raised when a requested model is not found."""
 
     pass
+
+
+class LLMQueueFullError(LLMException):
+    """Raised when the request queue for a model is full (server busy)."""
+
+    pass
+
+
+class LLMPullError(LLMException):
+    """Raised when the provider rejects a model pull (e.g. unknown model); not retryable."""
+
+    pass
+
+
+class LLMTimeoutError(LLMConnectionError):
+    """Raised when the provider does not answer (or stops streaming) in time."""
+
+    pass
+
+
+class LLMUnavailableError(LLMConnectionError):
+    """Raised without contacting the provider while it is considered down (circuit open)."""
+
+    pass
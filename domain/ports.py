@@ -1,7 +1,27 @@
-from typing import AsyncIterator, List, Optional, Protocol, runtime_checkable
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    Tuple,
+    runtime_checkable,
+)
 from uuid import UUID
 
-from domain.entities import ChatSession, Message, ModelInfo
+from domain.entities import (
+    BackendHealth,
+    ChatSession,
+    DocumentChunk,
+    GenerationStats,
+    Message,
+    ModelInfo,
+    PageCursor,
+    SearchHit,
+)
 
 
 @runtime_checkable
@@ -12,10 +32,34 @@ class LLMClient(Protocol):
         """Fetch list of available models."""
         ...
 
+    async def show_model(self, name: str) -> Dict[str, Any]:
+        """Fetch model details (family, quantization_level, context_length, ...)."""
+        ...
+
     async def chat_stream(
-        self, model: str, messages: List[Message], options: dict | None = None
+        self,
+        model: str,
+        messages: List[Message],
+        options: dict | None = None,
+        keep_alive: str | int | None = None,
+        stats: GenerationStats | None = None,
     ) -> AsyncIterator[str]:
-        """Stream chat completion."""
+        """
+        Stream chat completion. keep_alive controls how long the model stays loaded.
+        If `stats` is given, it is filled with the server's timings when the stream ends.
+        """
+        ...
+
+    async def list_running_models(self) -> List[Dict[str, Any]]:
+        """Models currently loaded in memory (name, size_vram, expires_at)."""
+        ...
+
+    async def load_model(self, name: str, keep_alive: str | int | None = None) -> None:
+        """Load a model into memory without generating."""
+        ...
+
+    async def unload_model(self, name: str) -> None:
+        """Evict a model from memory."""
         ...
 
     async def pull_model(self, name: str) -> AsyncIterator[dict]:
@@ -26,6 +70,10 @@ class LLMClient(Protocol):
         """Delete a model."""
         ...
 
+    async def embed(self, model: str, inputs: List[str]) -> List[List[float]]:
+        """Embedding vectors for `inputs` (one request for the whole batch)."""
+        ...
+
 
 @runtime_checkable
 class ChatRepository(Protocol):
@@ -35,10 +83,136 @@ class ChatRepository(Protocol):
 
     async def create_session(self, title: str, model_name: str) -> ChatSession: ...
 
-    async def add_message(self, session_id: UUID, message: Message) -> None: ...
+    async def add_message(self, session_id: UUID, message: Message) -> None:
+        """
+        Append to the session's branch: the message's parent defaults to the
+        session head, and it becomes the new head.
+        """
+        ...
+
+    async def fork_session(
+        self, session_id: UUID, message_id: Optional[UUID] = None, title: Optional[str] = None
+    ) -> Optional[ChatSession]:
+        """
+        New session continuing from `message_id` (default: the session head),
+        sharing the history up to it without copying. None if the session
+        does not exist.
+        """
+        ...
+
+    async def list_sessions(
+        self, limit: Optional[int] = None, before: Optional[PageCursor] = None
+    ) -> List[ChatSession]:
+        """
+        Sessions (without messages), most recently updated first.
+        Keyset-paginated on (updated_at, id): pass the cursor of the last
+        session of the previous page as `before`.
+        """
+        ...
 
-    async def list_sessions(self) -> List[ChatSession]: ...
+    async def get_messages(
+        self, session_id: UUID, before: Optional[PageCursor] = None, limit: int = 50
+    ) -> List[Message]:
+        """
+        The `limit` most recent messages of the session's branch, older than
+        `before` (the oldest message of the previous page). Returned in
+        chronological order.
+        """
+        ...
+
+    async def search_messages(
+        self, query: str, limit: int = 20, offset: int = 0, session_id: Optional[UUID] = None
+    ) -> List[SearchHit]:
+        """Full-text search over message content, best matches first."""
+        ...
 
     async def update_session_title(self, session_id: UUID, title: str) -> None: ...
 
     async def delete_session(self, session_id: UUID) -> None: ...
+
+
+@runtime_checkable
+class MessageBatchWriter(Protocol):
+    """Interface for persisting many messages in a single transaction."""
+
+    async def add_messages(self, items: Sequence[Tuple[UUID, Message]]) -> None: ...
+
+
+@runtime_checkable
+class ChatArchiveStore(Protocol):
+    """Interface for bulk export/import of all chat data."""
+
+    def stream_sessions(self, batch_size: int = 1000) -> AsyncIterator[ChatSession]:
+        """Every session (without messages), read through a server-side cursor."""
+        ...
+
+    def stream_messages(self, batch_size: int = 1000) -> AsyncIterator[Tuple[UUID, Message]]:
+        """Every message with its session id, grouped by session in chronological order."""
+        ...
+
+    async def import_sessions(self, sessions: Sequence[ChatSession]) -> List[UUID]:
+        """Insert sessions as-is (timestamps kept); returns the ids that already existed."""
+        ...
+
+    async def import_messages(self, items: Sequence[Tuple[UUID, Message]]) -> None:
+        """Insert messages as-is, without touching their sessions."""
+        ...
+
+
+@runtime_checkable
+class MetricsSink(Protocol):
+    """Interface for recording operational metrics (counters and histograms)."""
+
+    def inc(
+        self, name: str, value: float = 1.0, labels: Optional[Dict[str, str]] = None
+    ) -> None: ...
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None: ...
+
+
+@runtime_checkable
+class VectorIndex(Protocol):
+    """Interface for an append-only store of embedding vectors with top-k search."""
+
+    model: Optional[str]  # embedding model the vectors came from; None while empty
+
+    def __len__(self) -> int: ...
+
+    async def add(self, model: str, vectors: Sequence[Sequence[float]]) -> int:
+        """Append vectors; returns the row of the first one (rows are consecutive)."""
+        ...
+
+    async def search(self, vector: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        """The `k` rows most similar to `vector` as (row, cosine similarity), best first."""
+        ...
+
+
+@runtime_checkable
+class DocumentStore(Protocol):
+    """Interface for persisting ingested documents and their chunks."""
+
+    async def begin_document(self, source: str, content_hash: str) -> Optional[UUID]:
+        """
+        Register a document before its chunks are stored. Returns its id, or
+        None if a document with this content was already fully ingested.
+        """
+        ...
+
+    async def finish_document(self, document_id: UUID, chunk_count: int) -> None: ...
+
+    async def existing_chunk_hashes(self, hashes: Sequence[str]) -> Set[str]:
+        """The subset of `hashes` already stored (used to skip duplicate chunks)."""
+        ...
+
+    async def add_chunks(self, chunks: Sequence[DocumentChunk]) -> None: ...
+
+    async def get_chunks(self, ids: Sequence[int]) -> List[DocumentChunk]:
+        """Chunks by id, in no particular order; unknown ids are ignored."""
+        ...
+
+
+@runtime_checkable
+class HealthMonitor(Protocol):
+    """Interface for reading the current health of the LLM backend."""
+
+    def health(self) -> BackendHealth: ...
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Literal
+from typing import Dict, List, Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -19,13 +19,126 @@ class Settings(BaseSettings):
     # Environment
     ENVIRONMENT: Literal["development", "production", "testing"] = "development"
     LOG_LEVEL: str = "INFO"
+    # Log records pass through a bounded queue to a writer thread
+    LOG_QUEUE_SIZE: int = 10_000
+    LOG_QUEUE_DROP_POLICY: Literal["drop_new", "drop_oldest"] = "drop_new"
+    LOG_RATE_LIMIT: float = 10.0  # records/s per call site below ERROR; 0 disables
+    LOG_RATE_LIMIT_BURST: int = 20
+    LOG_SAMPLE_RATES: Dict[str, float] = {}  # JSON, DEBUG/INFO kept, e.g. {"adapters.db": 0.1}
 
     # Ollama
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OLLAMA_TIMEOUT: float = 60.0
+    OLLAMA_CONNECT_TIMEOUT: float = 5.0  # a dead server should fail fast
+    OLLAMA_FIRST_BYTE_TIMEOUT: float = 120.0  # includes model load and prompt evaluation
+    OLLAMA_READ_TIMEOUT: float = 60.0  # between chunks once a response has started
+    # Connection pool shared by all requests to Ollama
+    OLLAMA_MAX_CONNECTIONS: int = 100
+    OLLAMA_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OLLAMA_KEEPALIVE_EXPIRY: float = 30.0
+    OLLAMA_HTTP2: bool = False  # Requires the 'http2' extra (h2)
+    # Multiple nodes (JSON list). When set, requests are routed across them
+    # by model residency and load, and OLLAMA_BASE_URL is ignored.
+    OLLAMA_BASE_URLS: List[str] = []
+    OLLAMA_NODE_POLL_INTERVAL: float = 5.0  # seconds between /api/ps polls
+    OLLAMA_NODE_COOLDOWN: float = 15.0  # seconds a failed node stays out of rotation
+    # Circuit breaker: fail fast while Ollama is down, probe until it recovers
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 3  # consecutive connection failures
+    CIRCUIT_BREAKER_RESET_TIMEOUT: float = 5.0  # seconds open before a trial, doubled on failure
+    CIRCUIT_BREAKER_MAX_RESET_TIMEOUT: float = 60.0
+    HEALTH_PROBE_INTERVAL: float = 10.0  # seconds without a successful request before probing
+    HEALTH_PROBE_TIMEOUT: float = 3.0
+    # Model listing/details cache (seconds); details are also keyed on digest
+    MODEL_CACHE_TTL: float = 30.0
+
+    # Model pulls (single-flight, throttled progress, retried on failure)
+    PULL_MAX_CONCURRENT: int = 1
+    PULL_PROGRESS_INTERVAL: float = 0.5  # seconds between progress updates
+    PULL_MAX_RETRIES: int = 3
+    PULL_RETRY_BACKOFF: float = 2.0  # seconds, doubled per attempt
+    PULL_STALL_TIMEOUT: float = 120.0  # seconds without progress before retrying
+
+    # Model residency (keep_alive policies, preloading, memory budget)
+    MODEL_RESIDENCY_ENABLED: bool = True
+    MODEL_KEEP_ALIVE_DEFAULT: Optional[str] = None  # e.g. "30m"; None = Ollama default
+    MODEL_KEEP_ALIVE: Dict[str, str] = {}  # JSON, e.g. {"llama3": "1h", "big": "0"}
+    MODEL_MEMORY_BUDGET_BYTES: Optional[int] = None  # unload LRU models beyond this
+    MODEL_RESIDENCY_POLL_INTERVAL: float = 10.0
+
+    # Response cache for deterministic requests (temperature 0 or fixed seed)
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    RESPONSE_CACHE_TTL: float = 24 * 3600  # seconds
+    RESPONSE_CACHE_PATH: Optional[str] = None  # e.g. ./data/response_cache.db
+
+    # Request scheduler (admission control in front of Ollama)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_CONCURRENCY: int = 2  # generations in flight per model
+    SCHEDULER_MODEL_CONCURRENCY: Dict[str, int] = {}  # JSON, e.g. {"llama3": 4}
+    SCHEDULER_MAX_QUEUE: int = 32  # waiting requests per model before rejecting
+    SCHEDULER_MAX_WAIT: Optional[float] = None  # seconds; None waits indefinitely
+
+    # Context window (prompt token budget per turn)
+    CONTEXT_TOKEN_BUDGET: int = 4096
+    CONTEXT_RESPONSE_RESERVE: int = 512
+    CONTEXT_MODEL_BUDGETS: Dict[str, int] = {}  # JSON, e.g. {"llama3": 8192}
+
+    # Document retrieval (RAG). Ingest with `python -m app.ingest PATH...`;
+    # the vector index needs the 'rag' extra (numpy).
+    RAG_ENABLED: bool = False  # add retrieved excerpts to chat context
+    RAG_EMBED_MODEL: str = "nomic-embed-text"
+    RAG_INDEX_PATH: str = "./data/vectors.f32"  # memory-mapped float32 vectors
+    RAG_CHUNK_TOKENS: int = 256
+    RAG_CHUNK_OVERLAP_TOKENS: int = 32
+    RAG_EMBED_BATCH_SIZE: int = 64  # chunks per /api/embed request
+    RAG_TOP_K: int = 4
+    RAG_MIN_SCORE: float = 0.3  # cosine similarity
+    RAG_MAX_CONTEXT_TOKENS: int = 1024  # cap on excerpts added to a turn
+
+    # Token stream coalescing (fewer, larger chunks to the UI)
+    STREAM_COALESCE_ENABLED: bool = False
+    STREAM_COALESCE_MAX_DELAY: float = 0.03  # seconds
+    STREAM_COALESCE_MAX_BYTES: int = 512
+
+    # In-process metrics (TTFT, tokens/sec, load time per model; Prometheus text)
+    METRICS_ENABLED: bool = True
+
+    # Tracing (spans around service, repository and Ollama calls)
+    TRACING_ENABLED: bool = True
+    TRACING_SAMPLE_RATE: float = 0.05  # fraction of traces kept...
+    TRACING_SLOW_TRACE_MS: Optional[float] = 2000.0  # ...plus every trace slower than this
+    TRACING_MAX_TRACES: int = 200  # in-memory ring buffer
+    TRACING_EXPORT_PATH: Optional[str] = None  # JSON lines, e.g. ./data/traces.jsonl
+    TRACING_EXPORT_FORMAT: Literal["json", "otlp"] = "json"  # otlp = OpenTelemetry OTLP/JSON
+    # Log SQL statements slower than this (milliseconds); None disables
+    SLOW_QUERY_THRESHOLD_MS: Optional[float] = 200.0
 
     # Database
     DATABASE_URL: str = "sqlite:///./data/guiollama.db"
+    # Async connection pool (ignored for in-memory SQLite)
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0
+
+    # SQLite performance profile (PRAGMAs applied on every new connection)
+    SQLITE_PERFORMANCE_MODE: bool = True
+    SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # bytes
+    SQLITE_CACHE_SIZE: int = -64_000  # negative = KiB, positive = pages
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Write-behind message persistence (batched inserts, flushed on shutdown)
+    WRITE_BEHIND_ENABLED: bool = True
+    WRITE_BEHIND_BATCH_SIZE: int = 100
+    WRITE_BEHIND_MAX_DELAY: float = 0.05  # seconds
+    WRITE_BEHIND_MAX_PENDING: int = 1000
+
+    # In-memory session history cache (LRU, write-through)
+    SESSION_CACHE_ENABLED: bool = True
+    SESSION_CACHE_MAX_MESSAGES: int = 10_000
+    SESSION_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
 
     # Chainlit
     CHAINLIT_HOST: str = "0.0.0.0"
@@ -1,15 +1,261 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Literal, Mapping, Optional, Tuple
 
+from infra.tracing import current_span
 
-def configure_logging(level: str, environment: str) -> None:
+DropPolicy = Literal["drop_new", "drop_oldest"]
+
+# Correlation fields bound by log_context(); trace ids fill in the gaps
+_log_context: ContextVar[Optional[Dict[str, str]]] = ContextVar("log_context", default=None)
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRIBUTES = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message",
+    "asctime",
+    "request_id",
+    "session_id",
+}
+
+_listener: Optional["_QueueListener"] = None
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """
+    Attach correlation fields (e.g. request_id, session_id) to every record
+    logged inside the block, including from tasks it spawns.
+    """
+    merged = {
+        **(_log_context.get() or {}),
+        **{k: str(v) for k, v in fields.items() if v is not None},
+    }
+    token = _log_context.set(merged)
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    """
+    Sets record.request_id and record.session_id: from log_context() when
+    bound, else from the current trace (its id, and the session_id
+    argument recorded on its root span).
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get() or {}
+        request_id = context.get("request_id")
+        session_id = context.get("session_id")
+        if request_id is None or session_id is None:
+            span = current_span()
+            if span is not None:
+                request_id = request_id or span.trace_id
+                session_id = session_id or span.trace.spans[0].attributes.get("session_id")
+        record.request_id = request_id
+        record.session_id = session_id
+        for key, value in context.items():
+            if key not in ("request_id", "session_id"):
+                setattr(record, key, value)
+        return True
+
+
+class ThrottleFilter(logging.Filter):
+    """
+    Keeps high-volume messages from flooding the log.
+
+    - Rate limit: each call site (logger + line) may log `burst` records,
+      refilled at `rate` per second (token bucket). Records at ERROR and
+      above are never limited. The next record let through reports how
+      many were suppressed.
+    - Sampling: DEBUG/INFO records of the loggers in `sample_rates`
+      (name prefix -> fraction kept) are sampled.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        sample_rates: Optional[Mapping[str, float]] = None,
+    ):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample_rates = dict(sample_rates or {})
+        self._buckets: Dict[Tuple[str, int], Tuple[float, float, int]] = {}
+        self._lock = threading.Lock()
+
+    def _sample_rate(self, name: str) -> Optional[float]:
+        while True:
+            if name in self.sample_rates:
+                return self.sample_rates[name]
+            if "." not in name:
+                return None
+            name = name.rsplit(".", 1)[0]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+        if self.sample_rates and record.levelno < logging.WARNING:
+            rate = self._sample_rate(record.name)
+            if rate is not None and random.random() >= rate:
+                return False
+        if self.rate <= 0:
+            return True
+
+        key = (record.name, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, suppressed = self._buckets.get(key, (float(self.burst), now, 0))
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+            if tokens < 1.0:
+                self._buckets[key] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[key] = (tokens - 1.0, now, 0)
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the listener thread without ever blocking. When the
+    queue is full the record is dropped ("drop_new") or replaces the
+    oldest queued one ("drop_oldest"); drops are counted and reported by
+    the listener.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[Any]", drop_policy: DropPolicy = "drop_new"):
+        super().__init__(log_queue)
+        self.drop_policy = drop_policy
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the arguments here (cheap, and they may be mutated
+        # later); formatting and serialisation happen on the listener thread.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        self.dropped += 1
+        if self.drop_policy == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def __init__(
+        self,
+        log_queue: "queue.Queue[Any]",
+        producer: BoundedQueueHandler,
+        *handlers: logging.Handler,
+    ):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.producer = producer
+        self._reported = 0
+
+    def _report_drops(self) -> None:
+        dropped = self.producer.dropped
+        if dropped > self._reported:
+            warning = logging.makeLogRecord(
+                {
+                    "name": __name__,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": f"Log queue full: dropped {dropped - self._reported} records",
+                }
+            )
+            self._reported = dropped
+            super().handle(warning)
+
+    def handle(self, record: logging.LogRecord) -> None:
+        self._report_drops()
+        super().handle(record)
+
+    def stop(self) -> None:
+        super().stop()
+        self._report_drops()  # drops after the last record written
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)  # blocking: the queue may be full at shutdown
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra` fields and correlation ids included when set."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "name": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("request_id", "session_id"):
+            value = getattr(record, key, None)
+            if value is not None:
+                data[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def configure_logging(
+    level: str,
+    environment: str,
+    queue_size: int = 10_000,
+    drop_policy: DropPolicy = "drop_new",
+    rate_limit: float = 10.0,
+    rate_limit_burst: int = 20,
+    sample_rates: Optional[Mapping[str, float]] = None,
+) -> None:
     """
     Configure application-wide logging.
 
+    Records are filtered (correlation ids, rate limiting, sampling) on the
+    calling thread, then passed through a bounded queue to a background
+    thread that formats and writes them, so a log call never waits on
+    stdout.
+
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR).
-        environment: Current environment (development, production).
+        environment: Current environment; production logs JSON lines.
+        queue_size: Records buffered for the writer thread.
+        drop_policy: What to drop when the buffer is full.
+        rate_limit: Records per second per call site (below ERROR); 0 disables.
+        rate_limit_burst: Records a call site may log at once before limiting.
+        sample_rates: Fraction of DEBUG/INFO records kept, per logger name prefix.
     """
+    global _listener
+
     numeric_level = getattr(logging, level.upper(), None)
     if not isinstance(numeric_level, int):
         raise ValueError(f"Invalid log level: {level}")
@@ -18,16 +264,13 @@ def configure_logging(level: str, environment: str) -> None:
     root_logger = logging.getLogger()
     root_logger.setLevel(numeric_level)
 
-    # Console Handler
+    # Console Handler, driven by the listener thread
     handler = logging.StreamHandler(sys.stdout)
     handler.setLevel(numeric_level)
 
     # Formatter
     if environment == "production":
-        # JSON-like format for production (simplified for this example)
-        formatter = logging.Formatter(
-            '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "name": "%(name)s", "message": "%(message)s"}'
-        )
+        formatter: logging.Formatter = JsonFormatter()
     else:
         # Human-readable format for development
         formatter = logging.Formatter(
@@ -36,12 +279,33 @@ def configure_logging(level: str, environment: str) -> None:
 
     handler.setFormatter(formatter)
 
-    # Remove existing handlers to avoid duplicates during reloads
+    log_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+    queue_handler = BoundedQueueHandler(log_queue, drop_policy)
+    # Cheap rejection first, so suppressed records cost as little as possible
+    queue_handler.addFilter(ThrottleFilter(rate_limit, rate_limit_burst, sample_rates))
+    queue_handler.addFilter(CorrelationFilter())
+
+    # Remove existing handlers to avoid duplicates during reloads, then
+    # drain the previous queue
     if root_logger.hasHandlers():
         root_logger.handlers.clear()
+    shutdown_logging()
 
-    root_logger.addHandler(handler)
+    root_logger.addHandler(queue_handler)
+    _listener = _QueueListener(log_queue, queue_handler, handler)
+    _listener.start()
 
     # Silence noisy libraries
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("watchfiles").setLevel(logging.WARNING)
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the writer thread (also run at exit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
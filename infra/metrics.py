@@ -0,0 +1,185 @@
+import bisect
+import math
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Seconds: covers warm first tokens (tens of ms) up to cold loads of big models
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+THROUGHPUT_BUCKETS = (1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 60.0, 80.0, 120.0, 200.0)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192)
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = ""):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, value: float = 1.0, labels: Optional[Dict[str, str]] = None) -> None:
+        key = _label_key(labels)
+        self._values[key] = self._values.get(key, 0.0) + value
+
+    def value(self, labels: Optional[Dict[str, str]] = None) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set (Prometheus semantics)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # per label set: (non-cumulative bucket counts incl. +Inf, sum, count)
+        self._series: Dict[LabelKey, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        key = _label_key(labels)
+        counts, total, count = self._series.get(key) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._series[key] = (counts, total + value, count + 1)
+
+    def count(self, labels: Optional[Dict[str, str]] = None) -> int:
+        series = self._series.get(_label_key(labels))
+        return series[2] if series else 0
+
+    def sum(self, labels: Optional[Dict[str, str]] = None) -> float:
+        series = self._series.get(_label_key(labels))
+        return series[1] if series else 0.0
+
+    def render(self) -> List[str]:
+        lines: List[str] = []
+        for key, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts, strict=True):
+                cumulative += n
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    In-process metrics store, rendered in the Prometheus text exposition
+    format by render_prometheus(). Implements the MetricsSink port, so
+    services record by name; unknown names are created on first use
+    (histograms with latency buckets), known ones keep their buckets.
+    """
+
+    def __init__(self, namespace: str = "guiollama"):
+        self.namespace = namespace
+        self._metrics: Dict[str, "Counter | Histogram"] = {}
+        self._lock = threading.Lock()  # render may run on another thread
+
+    def _full_name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = Counter(self._full_name(name), help)
+                self._metrics[name] = metric
+        if not isinstance(metric, Counter):
+            raise ValueError(f"Metric {name} is a {metric.kind}, not a counter")
+        return metric
+
+    def histogram(
+        self, name: str, help: str = "", buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = Histogram(self._full_name(name), help, buckets)
+                self._metrics[name] = metric
+        if not isinstance(metric, Histogram):
+            raise ValueError(f"Metric {name} is a {metric.kind}, not a histogram")
+        return metric
+
+    def inc(self, name: str, value: float = 1.0, labels: Optional[Dict[str, str]] = None) -> None:
+        counter = self.counter(name)
+        with self._lock:
+            counter.inc(value, labels)
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        histogram = self.histogram(name)
+        with self._lock:
+            histogram.observe(value, labels)
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for metric in self._metrics.values():
+                if metric.help:
+                    lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def register_chat_metrics(registry: MetricsRegistry) -> MetricsRegistry:
+    """Declare the per-model metrics recorded by ChatService."""
+    registry.histogram(
+        "scheduler_wait_seconds", "Time spent queued for a generation slot", LATENCY_BUCKETS
+    )
+    registry.histogram(
+        "llm_time_to_first_token_seconds", "Client-side time to first token", LATENCY_BUCKETS
+    )
+    registry.histogram("llm_load_seconds", "Model load time reported by Ollama", LATENCY_BUCKETS)
+    registry.histogram(
+        "llm_prompt_eval_seconds", "Prompt evaluation time reported by Ollama", LATENCY_BUCKETS
+    )
+    registry.histogram(
+        "llm_generation_seconds", "Token generation time reported by Ollama", LATENCY_BUCKETS
+    )
+    registry.histogram(
+        "llm_tokens_per_second", "Generation throughput per request", THROUGHPUT_BUCKETS
+    )
+    registry.histogram("llm_completion_tokens", "Generated tokens per request", TOKEN_BUCKETS)
+    registry.counter("llm_prompt_tokens_total", "Prompt tokens evaluated")
+    registry.counter("llm_completion_tokens_total", "Tokens generated")
+    registry.counter("chat_turns_total", "Chat turns by outcome")
+    registry.histogram(
+        "chat_cancel_seconds", "Time from cancel() to the upstream stream closing", LATENCY_BUCKETS
+    )
+    registry.histogram(
+        "rag_retrieval_seconds", "Query embedding, vector search and chunk lookup", LATENCY_BUCKETS
+    )
+    return registry
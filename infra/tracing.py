@@ -0,0 +1,348 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import random
+import time
+from collections import deque
+from contextlib import aclosing, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    TypeVar,
+)
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+ExportFormat = Literal["json", "otlp"]
+
+# Call arguments worth recording on a span. Anything else (prompts, message
+# content) is deliberately left out of traces.
+TRACED_ARGUMENTS = frozenset(
+    {"session_id", "model", "model_name", "name", "limit", "offset", "priority"}
+)
+
+
+@dataclass
+class Span:
+    name: str
+    trace: "_Trace"
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: Literal["ok", "error", "cancelled"] = "ok"
+    error: Optional[str] = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns or time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add(self, key: str, value: float) -> None:
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {"code": 2 if self.status == "error" else 1}
+        if self.error:
+            status["message"] = self.error
+        otlp: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": status,
+        }
+        if self.parent_id:
+            otlp["parentSpanId"] = self.parent_id
+        return otlp
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class _Trace:
+    __slots__ = ("trace_id", "spans", "sampled", "finished")
+
+    def __init__(self, sampled: bool):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.spans: List[Span] = []
+        self.sampled = sampled
+        self.finished = False
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class JsonLinesExporter:
+    """Appends each kept trace as one JSON line (plain or OTLP/JSON) to a file."""
+
+    def __init__(self, path: str, format: ExportFormat = "json"):
+        self.path = path
+        self.format = format
+
+    def __call__(self, spans: List[Span]) -> None:
+        record = to_otlp(spans) if self.format == "otlp" else to_json(spans)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+def to_json(spans: List[Span]) -> Dict[str, Any]:
+    root = spans[0]
+    return {
+        "trace_id": root.trace_id,
+        "name": root.name,
+        "duration_ms": round(root.duration_ms, 3),
+        "spans": [s.to_dict() for s in spans],
+    }
+
+
+def to_otlp(spans: List[Span], service_name: str = "guiollama") -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest, accepted by OpenTelemetry collectors."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]
+                },
+                "scopeSpans": [
+                    {"scope": {"name": service_name}, "spans": [s.to_otlp() for s in spans]}
+                ],
+            }
+        ]
+    }
+
+
+class Tracer:
+    """
+    In-process tracer with head + tail sampling.
+
+    Every call inside a trace gets a span (cheap: a small object and two
+    clock reads). When the root span ends, the trace is kept if it was
+    sampled (probability `sample_rate`) or took longer than
+    `slow_trace_ms`, so slow turns are never lost to sampling. Kept
+    traces go to a ring buffer of `max_traces` and to the exporter.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        sample_rate: float = 1.0,
+        slow_trace_ms: Optional[float] = None,
+        max_traces: int = 100,
+        max_spans: int = 512,
+        exporter: Optional[Callable[[List[Span]], None]] = None,
+    ):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.slow_trace_ms = slow_trace_ms
+        self.max_spans = max_spans
+        self.exporter = exporter
+        self.traces: Deque[List[Span]] = deque(maxlen=max_traces)
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Span:
+        parent = _current_span.get()
+        if parent is not None and not parent.trace.finished:
+            trace = parent.trace
+        else:
+            parent = None
+            trace = _Trace(sampled=random.random() < self.sample_rate)
+        span = Span(
+            name=name,
+            trace=trace,
+            span_id=f"{random.getrandbits(64):016x}",
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes or {},
+        )
+        if len(trace.spans) < self.max_spans:
+            trace.spans.append(span)
+        return span
+
+    def end_span(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        if span.parent_id is None:
+            self._finish(span.trace, span)
+
+    def _finish(self, trace: _Trace, root: Span) -> None:
+        trace.finished = True
+        slow = self.slow_trace_ms is not None and root.duration_ms >= self.slow_trace_ms
+        if not (trace.sampled or slow):
+            return
+        self.traces.append(trace.spans)
+        if self.exporter is not None:
+            try:
+                self.exporter(trace.spans)
+            except Exception as e:  # tracing must never break the request
+                logger.warning(f"Trace export failed: {e}")
+
+    @contextmanager
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Span]:
+        span = self.start_span(name, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except (GeneratorExit, asyncio.CancelledError):
+            span.status = "cancelled"
+            raise
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.end_span(span)
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Async generators can be finalized from another context
+                _current_span.set(None)
+
+    def export(self, format: ExportFormat = "json") -> List[Dict[str, Any]]:
+        """Buffered traces, oldest first."""
+        convert = to_otlp if format == "otlp" else to_json
+        return [convert(spans) for spans in list(self.traces)]
+
+
+# Process-wide tracer, reconfigured by configure_tracing()
+tracer = Tracer(enabled=False)
+
+
+def configure_tracing(
+    enabled: bool,
+    sample_rate: float = 1.0,
+    slow_trace_ms: Optional[float] = None,
+    max_traces: int = 100,
+    export_path: Optional[str] = None,
+    export_format: ExportFormat = "json",
+) -> Tracer:
+    """
+    Configure the process-wide tracer.
+
+    Args:
+        enabled: Create spans at all; instrument() is a no-op when False.
+        sample_rate: Fraction of traces kept regardless of duration.
+        slow_trace_ms: Traces at least this slow are always kept.
+        max_traces: Size of the in-memory ring buffer.
+        export_path: Optional JSON-lines file receiving every kept trace.
+        export_format: "json" or "otlp" (OpenTelemetry OTLP/JSON).
+    """
+    tracer.enabled = enabled
+    tracer.sample_rate = sample_rate
+    tracer.slow_trace_ms = slow_trace_ms
+    tracer.traces = deque(tracer.traces, maxlen=max_traces)
+    tracer.exporter = JsonLinesExporter(export_path, export_format) if export_path else None
+    return tracer
+
+
+def _arguments(names: List[str], args: tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    attributes: Dict[str, Any] = {}
+    for name, value in [*zip(names, args, strict=False), *kwargs.items()]:
+        if name in TRACED_ARGUMENTS and isinstance(value, (str, int, float, bool, UUID)):
+            attributes[name] = str(value) if isinstance(value, UUID) else value
+    return attributes
+
+
+def _record_stats(span: Span, names: List[str], args: tuple, kwargs: Dict[str, Any]) -> None:
+    # Attach server-side generation timings (GenerationStats) to chat spans
+    stats = kwargs.get("stats")
+    if stats is None and "stats" in names and names.index("stats") < len(args):
+        stats = args[names.index("stats")]
+    if stats is not None and hasattr(stats, "to_dict"):
+        for key, value in stats.to_dict().items():
+            span.set(f"llm.{key}", value)
+
+
+def traced(name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a bound coroutine or async generator method in a span."""
+    names = [p for p in inspect.signature(func).parameters]
+
+    if inspect.isasyncgenfunction(func):
+
+        @functools.wraps(func)
+        async def stream_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracer.span(name, _arguments(names, args, kwargs)) as span:
+                started = time.perf_counter()
+                items = 0
+                async with aclosing(func(*args, **kwargs)) as stream:
+                    async for item in stream:
+                        if items == 0:
+                            span.set(
+                                "first_item_ms", round((time.perf_counter() - started) * 1000, 3)
+                            )
+                        items += 1
+                        yield item
+                span.set("items", items)
+                _record_stats(span, names, args, kwargs)
+
+        return stream_wrapper
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with tracer.span(name, _arguments(names, args, kwargs)):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+def instrument(obj: T, prefix: str, exclude: Iterable[str] = ()) -> T:
+    """
+    Trace every public async method (and async generator) of `obj` by
+    replacing it on the instance with a wrapper recording a span named
+    `prefix.method`. Does nothing while tracing is disabled.
+    """
+    if not tracer.enabled:
+        return obj
+    skip = set(exclude)
+    for attr, member in inspect.getmembers(type(obj), inspect.isfunction):
+        if attr.startswith("_") or attr in skip:
+            continue
+        if not (inspect.iscoroutinefunction(member) or inspect.isasyncgenfunction(member)):
+            continue
+        setattr(obj, attr, traced(f"{prefix}.{attr}", getattr(obj, attr)))
+    return obj
@@ -0,0 +1,42 @@
+"""performance_indexes
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 10:12:31.418206
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "002"
+down_revision: str | Sequence[str] | None = "001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # History loads filter on session_id and order by created_at (id breaks ties),
+    # so the composite index serves both without a temp B-tree sort. It also
+    # covers session_id lookups, making the single-column index redundant.
+    op.create_index(
+        "ix_messages_session_id_created_at",
+        "messages",
+        ["session_id", "created_at", "id"],
+        unique=False,
+    )
+    op.drop_index(op.f("ix_messages_session_id"), table_name="messages")
+    # Session listing orders by updated_at DESC, id DESC
+    op.create_index(
+        "ix_chat_sessions_updated_at_id", "chat_sessions", ["updated_at", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_chat_sessions_updated_at_id", table_name="chat_sessions")
+    op.create_index(op.f("ix_messages_session_id"), "messages", ["session_id"], unique=False)
+    op.drop_index("ix_messages_session_id_created_at", table_name="messages")
@@ -0,0 +1,56 @@
+"""message_tree
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 18:40:27.115904
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: str | Sequence[str] | None = "004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Messages form a tree: a session's history is the chain of parents from
+    # its head. Forks share their prefix instead of copying it. parent_id is
+    # not a foreign key: adding one to an existing SQLite table means
+    # rebuilding it, which would renumber the rowids messages_fts relies on.
+    op.add_column("messages", sa.Column("parent_id", sa.String(length=36), nullable=True))
+    op.add_column("chat_sessions", sa.Column("head_id", sa.String(length=36), nullable=True))
+    op.add_column("chat_sessions", sa.Column("forked_from_id", sa.String(length=36), nullable=True))
+    op.create_index(
+        "ix_chat_sessions_forked_from_id", "chat_sessions", ["forked_from_id"], unique=False
+    )
+
+    # Existing sessions are linear: link each message to the one before it
+    # (UPDATE ... FROM needs SQLite 3.33+)
+    op.execute(
+        "UPDATE messages SET parent_id = ordered.previous_id "
+        "FROM (SELECT id, LAG(id) OVER ("
+        "PARTITION BY session_id ORDER BY created_at, id) AS previous_id "
+        "FROM messages) AS ordered "
+        "WHERE messages.id = ordered.id AND ordered.previous_id IS NOT NULL"
+    )
+    op.execute(
+        "UPDATE chat_sessions SET head_id = ("
+        "SELECT m.id FROM messages AS m WHERE m.session_id = chat_sessions.id "
+        "ORDER BY m.created_at DESC, m.id DESC LIMIT 1)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Forks lose the history they shared with their source
+    op.drop_index("ix_chat_sessions_forked_from_id", table_name="chat_sessions")
+    op.drop_column("chat_sessions", "forked_from_id")
+    op.drop_column("chat_sessions", "head_id")
+    op.drop_column("messages", "parent_id")
@@ -0,0 +1,219 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from domain.entities import ChatSession, Message, Role
+from domain.ports import ChatArchiveStore
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT = "guiollama-chats"
+ARCHIVE_VERSION = 2  # 2: message tree (parent_id, head_id, forked_from_id)
+
+
+@dataclass
+class TransferProgress:
+    sessions: int = 0
+    messages: int = 0
+    skipped_sessions: int = 0  # already present on import
+    skipped_messages: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished: bool = False
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def records_per_second(self) -> float:
+        elapsed = self.elapsed
+        return (self.sessions + self.messages) / elapsed if elapsed > 0 else 0.0
+
+
+ProgressCallback = Callable[[TransferProgress], None]
+
+
+def _uuid_or_none(value: Optional[str]) -> Optional[UUID]:
+    return UUID(value) if value else None
+
+
+class ArchiveService:
+    """
+    Streaming export/import of all sessions and messages.
+
+    Export yields one JSON-serialisable record per session and per
+    message (sessions first), read through server-side cursors, so memory
+    stays flat however large the database is. Import consumes the same
+    records and writes them with bulk inserts of `batch_size` rows per
+    transaction; sessions that already exist are skipped with their
+    messages. `on_progress` is called at most every `progress_interval`
+    seconds and once at the end.
+
+    Version 1 archives predate the message tree: their messages are
+    chained per session in archive order on import.
+    """
+
+    def __init__(
+        self,
+        store: ChatArchiveStore,
+        batch_size: int = 1000,
+        progress_interval: float = 1.0,
+    ):
+        self.store = store
+        self.batch_size = batch_size
+        self.progress_interval = progress_interval
+
+    def _reporter(self, on_progress: Optional[ProgressCallback]) -> Callable[..., None]:
+        last = 0.0
+
+        def report(progress: TransferProgress, final: bool = False) -> None:
+            nonlocal last
+            if on_progress is None:
+                return
+            now = time.monotonic()
+            if final or now - last >= self.progress_interval:
+                last = now
+                progress.finished = final
+                on_progress(progress)
+
+        return report
+
+    async def export_records(
+        self, on_progress: Optional[ProgressCallback] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        progress = TransferProgress()
+        report = self._reporter(on_progress)
+        yield {
+            "type": "header",
+            "format": ARCHIVE_FORMAT,
+            "version": ARCHIVE_VERSION,
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+        async for session in self.store.stream_sessions(self.batch_size):
+            yield {
+                "type": "session",
+                "id": str(session.id),
+                "title": session.title,
+                "created_at": session.created_at.isoformat(),
+                "updated_at": session.updated_at.isoformat(),
+                "model_name": session.model_name,
+                "head_id": str(session.head_id) if session.head_id else None,
+                "forked_from_id": str(session.forked_from_id) if session.forked_from_id else None,
+            }
+            progress.sessions += 1
+            report(progress)
+
+        async for session_id, message in self.store.stream_messages(self.batch_size):
+            yield {
+                "type": "message",
+                "id": str(message.id),
+                "session_id": str(session_id),
+                "role": message.role.value,
+                "content": message.content,
+                "created_at": message.created_at.isoformat(),
+                "metadata": message.metadata,
+                "parent_id": str(message.parent_id) if message.parent_id else None,
+            }
+            progress.messages += 1
+            report(progress)
+
+        report(progress, final=True)
+
+    async def import_records(
+        self,
+        records: AsyncIterable[Dict[str, Any]],
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> TransferProgress:
+        progress = TransferProgress()
+        report = self._reporter(on_progress)
+        sessions: List[ChatSession] = []
+        messages: List[Tuple[UUID, Message]] = []
+        skipped: Set[UUID] = set()
+        version = ARCHIVE_VERSION
+        previous: Dict[UUID, UUID] = {}  # version 1: last message per session
+
+        async def flush_sessions() -> None:
+            existing = await self.store.import_sessions(sessions)
+            skipped.update(existing)
+            progress.sessions += len(sessions) - len(existing)
+            progress.skipped_sessions += len(existing)
+            sessions.clear()
+            report(progress)
+
+        async def flush_messages() -> None:
+            await self.store.import_messages(messages)
+            progress.messages += len(messages)
+            messages.clear()
+            report(progress)
+
+        async for record in records:
+            kind = record.get("type")
+            if kind == "header":
+                version = self._check_header(record)
+            elif kind == "session":
+                sessions.append(self._session_from_record(record))
+                if len(sessions) >= self.batch_size:
+                    await flush_sessions()
+            elif kind == "message":
+                if sessions:
+                    await flush_sessions()  # parents must exist before their messages
+                session_id = UUID(record["session_id"])
+                if session_id in skipped:
+                    progress.skipped_messages += 1
+                    continue
+                message = self._message_from_record(record)
+                if version < 2:
+                    message.parent_id = previous.get(session_id)
+                    previous[session_id] = message.id
+                messages.append((session_id, message))
+                if len(messages) >= self.batch_size:
+                    await flush_messages()
+            else:
+                raise ValueError(f"Unknown archive record type: {kind!r}")
+
+        if sessions:
+            await flush_sessions()
+        if messages:
+            await flush_messages()
+        report(progress, final=True)
+        logger.info(
+            f"Imported {progress.sessions} sessions and {progress.messages} messages "
+            f"in {progress.elapsed:.1f}s ({progress.skipped_sessions} sessions already present)"
+        )
+        return progress
+
+    @staticmethod
+    def _check_header(record: Dict[str, Any]) -> int:
+        if record.get("format") != ARCHIVE_FORMAT:
+            raise ValueError(f"Not a chat archive: format={record.get('format')!r}")
+        version = record.get("version", 0)
+        if version > ARCHIVE_VERSION:
+            raise ValueError(f"Archive version {version} is newer than supported")
+        return version
+
+    @staticmethod
+    def _session_from_record(record: Dict[str, Any]) -> ChatSession:
+        return ChatSession(
+            id=UUID(record["id"]),
+            title=record["title"],
+            created_at=datetime.fromisoformat(record["created_at"]),
+            updated_at=datetime.fromisoformat(record["updated_at"]),
+            model_name=record["model_name"],
+            head_id=_uuid_or_none(record.get("head_id")),
+            forked_from_id=_uuid_or_none(record.get("forked_from_id")),
+        )
+
+    @staticmethod
+    def _message_from_record(record: Dict[str, Any]) -> Message:
+        return Message(
+            id=UUID(record["id"]),
+            role=Role(record["role"]),
+            content=record["content"],
+            created_at=datetime.fromisoformat(record["created_at"]),
+            metadata=record.get("metadata") or {},
+            parent_id=_uuid_or_none(record.get("parent_id")),
+        )
@@ -1,12 +1,77 @@
+import asyncio
 import logging
-from typing import AsyncIterator, List, Optional
-from uuid import UUID
+import time
+from contextlib import aclosing, nullcontext
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import UUID, uuid4
 
-from domain.entities import ChatSession, Message, ModelInfo, Role
-from domain.ports import ChatRepository, LLMClient
+from domain.entities import (
+    BackendHealth,
+    ChatSession,
+    CircuitState,
+    GenerationStats,
+    Message,
+    ModelInfo,
+    Page,
+    PageCursor,
+    RetrievedChunk,
+    Role,
+    SearchHit,
+)
+from domain.exceptions import LLMException, LLMUnavailableError
+from domain.ports import ChatRepository, HealthMonitor, LLMClient, MetricsSink
+from infra.logging import log_context
+from services.context_window import ContextWindowBuilder
+from services.model_residency import ModelResidencyManager
+from services.pull_manager import PullManager
+from services.retrieval import Retriever
+from services.scheduler import RequestScheduler, SchedulerStats
+from services.stream_coalescer import TokenCoalescer
 
 logger = logging.getLogger(__name__)
 
+_END_OF_TURN = object()
+# Chunks a turn may run ahead of its reader; beyond that generation waits,
+# so a slow reader slows the upstream stream instead of filling memory
+_TURN_BUFFER = 8
+
+
+def _drain(queue: "asyncio.Queue[Any]") -> None:
+    while not queue.empty():
+        queue.get_nowait()
+
+
+@dataclass
+class _ActiveTurn:
+    """A chat turn in progress, so that cancel() can find and stop it."""
+
+    session_id: UUID
+    request_id: str
+    model: str
+    task: Optional["asyncio.Task[None]"] = None
+    # queued -> preparing -> waiting (for the first token) -> streaming
+    stage: str = "queued"
+    cancelled_stage: Optional[str] = None
+    cancel_requested_at: Optional[float] = None
+    released_at: Optional[float] = None  # upstream closed, slot about to be freed
+
+    def cancel(self) -> bool:
+        if self.task is None or self.task.done() or self.released_at is not None:
+            return False  # finished, or only persisting what it got
+        if self.cancel_requested_at is None:
+            self.cancel_requested_at = time.perf_counter()
+            self.cancelled_stage = self.stage
+            # Preparation writes to the repository: let it finish and stop
+            # before the model is called rather than interrupt a write
+            if self.stage != "preparing":
+                self.task.cancel()
+        return True
+
+    def release(self) -> None:
+        if self.released_at is None:
+            self.released_at = time.perf_counter()
+
 
 class ChatService:
     """
@@ -14,20 +79,113 @@ class ChatService:
     Orchestrates persistence and LLM interaction.
     """
 
-    def __init__(self, llm_client: LLMClient, chat_repo: ChatRepository):
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        chat_repo: ChatRepository,
+        context_window: Optional[ContextWindowBuilder] = None,
+        coalescer: Optional[TokenCoalescer] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        residency: Optional[ModelResidencyManager] = None,
+        metrics: Optional[MetricsSink] = None,
+        pulls: Optional[PullManager] = None,
+        retriever: Optional[Retriever] = None,
+        health: Optional[HealthMonitor] = None,
+    ):
         self.llm = llm_client
         self.repo = chat_repo
+        self.context_window = context_window or ContextWindowBuilder()
+        # Optional: batch tokens before they reach the UI
+        self.coalescer = coalescer
+        # Optional: admission control / fair queueing in front of the LLM
+        self.scheduler = scheduler
+        # Optional: keep_alive policies, preloading and cold-start tracking
+        self.residency = residency
+        # Optional: per-model latency/throughput histograms
+        self.metrics = metrics
+        # Optional: deduplicated, throttled and retried model downloads
+        self.pulls = pulls
+        # Optional: excerpts from ingested documents added to the context
+        self.retriever = retriever
+        # Optional: circuit breaker state, to fail fast and report degraded mode
+        self.health = health
+        self._turns: Dict[str, _ActiveTurn] = {}
 
     async def get_all_sessions(self) -> List[ChatSession]:
         return await self.repo.list_sessions()
 
+    async def list_sessions_page(
+        self, limit: int = 20, cursor: Optional[str] = None
+    ) -> Page[ChatSession]:
+        """One page of sessions for the sidebar. Pass next_cursor to get the next one."""
+        before = PageCursor.decode(cursor) if cursor else None
+        sessions = await self.repo.list_sessions(limit=limit, before=before)
+        next_cursor = None
+        if len(sessions) == limit:
+            last = sessions[-1]
+            next_cursor = PageCursor(timestamp=last.updated_at, id=last.id).encode()
+        return Page(items=sessions, next_cursor=next_cursor)
+
+    async def get_messages(
+        self, session_id: UUID, limit: int = 50, cursor: Optional[str] = None
+    ) -> Page[Message]:
+        """Most recent messages first; next_cursor pages further back in history."""
+        before = PageCursor.decode(cursor) if cursor else None
+        messages = await self.repo.get_messages(session_id, before=before, limit=limit)
+        next_cursor = None
+        if len(messages) == limit:
+            oldest = messages[0]
+            next_cursor = PageCursor(timestamp=oldest.created_at, id=oldest.id).encode()
+        return Page(items=messages, next_cursor=next_cursor)
+
+    async def search_messages(
+        self,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        session_id: Optional[UUID] = None,
+    ) -> Page[SearchHit]:
+        """Ranked full-text search over chat history, paginated by next_cursor."""
+        offset = int(cursor) if cursor else 0
+        hits = await self.repo.search_messages(
+            query, limit=limit, offset=offset, session_id=session_id
+        )
+        next_cursor = str(offset + limit) if len(hits) == limit else None
+        return Page(items=hits, next_cursor=next_cursor)
+
     async def create_new_session(self, model_name: str = "llama2") -> ChatSession:
         return await self.repo.create_session(title="New Chat", model_name=model_name)
 
     async def get_session(self, session_id: UUID) -> Optional[ChatSession]:
         return await self.repo.get_session(session_id)
 
+    async def open_session(self, session_id: UUID) -> Optional[ChatSession]:
+        """Load a session for display and start warming its model in the background."""
+        session = await self.repo.get_session(session_id)
+        if session is not None and self.residency is not None:
+            self.residency.preload(session.model_name)
+        return session
+
+    async def fork_session(
+        self, session_id: UUID, message_id: Optional[UUID] = None, title: Optional[str] = None
+    ) -> Optional[ChatSession]:
+        """
+        Branch a conversation at `message_id` (default: its latest message).
+        The fork shares the history up to there; nothing is copied.
+        """
+        return await self.repo.fork_session(session_id, message_id=message_id, title=title)
+
     async def delete_session(self, session_id: UUID) -> None:
+        """Delete a session, stopping its running turns first so no reply lands after it."""
+        await self.cancel(session_id=session_id)
+        # Turns already past the model call are only saving their reply
+        saving = [
+            turn.task
+            for turn in list(self._turns.values())
+            if turn.session_id == session_id and turn.task is not None
+        ]
+        if saving:
+            await asyncio.wait(saving)
         await self.repo.delete_session(session_id)
 
     async def rename_session(self, session_id: UUID, new_title: str) -> None:
@@ -36,22 +194,206 @@ class ChatService:
     async def list_models(self) -> List[ModelInfo]:
         return await self.llm.list_models()
 
+    async def get_model_details(self, model_name: str) -> Dict[str, Any]:
+        return await self.llm.show_model(model_name)
+
+    def pull_model(self, model_name: str) -> AsyncIterator[Dict[str, Any]]:
+        """Progress of downloading a model, shared with any pull of it already running."""
+        if self.pulls is not None:
+            return self.pulls.pull(model_name)
+        return self.llm.pull_model(model_name)
+
+    async def _context_details(self, model_name: str) -> Optional[Dict[str, Any]]:
+        # Best effort: fall back to the configured budget if details are unavailable
+        try:
+            return await self.llm.show_model(model_name)
+        except LLMException as e:
+            logger.warning(f"Could not fetch details for {model_name}: {e}")
+            return None
+
+    def queue_position(self, session_id: UUID) -> Optional[int]:
+        """1-based position of the session's pending turn in the queue, or None."""
+        if self.scheduler is None:
+            return None
+        return self.scheduler.position(str(session_id))
+
+    def queue_stats(self) -> Optional[SchedulerStats]:
+        return self.scheduler.stats() if self.scheduler is not None else None
+
+    def backend_health(self) -> Optional[BackendHealth]:
+        """Health of the model server; `degraded` is True while requests fail fast."""
+        return self.health.health() if self.health is not None else None
+
     async def stream_chat(
         self,
         session_id: UUID,
         user_input: str,
         model_name: str,
         system_prompt: Optional[str] = None,
+        priority: int = 0,
+        options: Optional[Dict[str, Any]] = None,
+        use_documents: bool = True,
+        request_id: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream one chat turn. With a scheduler configured, the turn first
+        waits for a slot on the model (raising LLMQueueFullError when the
+        queue is full) before anything is persisted. With a retriever
+        configured, relevant document excerpts are added to the context
+        unless `use_documents` is False. While the model server is known to
+        be down, LLMUnavailableError is raised before queueing or persisting.
+
+        The turn runs in its own task so cancel() can stop it at any stage;
+        `request_id` names it for cancel(). A cancelled turn's stream simply
+        ends. Closing the stream early cancels the turn too.
+        """
+        if self.health is not None:
+            health = self.health.health()
+            if health.state == CircuitState.OPEN and health.retry_in:
+                raise LLMUnavailableError(
+                    f"Model server unavailable, retrying in {health.retry_in:.0f}s: "
+                    f"{health.last_error}"
+                )
+        request_id = request_id or uuid4().hex
+        if request_id in self._turns:
+            raise ValueError(f"Request {request_id} is already running")
+
+        turn = _ActiveTurn(session_id=session_id, request_id=request_id, model=model_name)
+        chunks: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=_TURN_BUFFER)
+        turn.task = asyncio.create_task(
+            self._run_turn(
+                turn, chunks, user_input, system_prompt, priority, options, use_documents
+            ),
+            name=f"chat-turn-{request_id}",
+        )
+        self._turns[request_id] = turn
+        try:
+            while True:
+                item = await chunks.get()
+                if item is _END_OF_TURN:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # No-op if the turn has finished; otherwise the caller went away.
+            # Drop what it did not read so the turn is not left waiting on a
+            # full queue while it saves the reply
+            turn.cancel()
+            _drain(chunks)
+            await asyncio.wait((turn.task,))
+
+    async def cancel(
+        self, session_id: Optional[UUID] = None, request_id: Optional[str] = None
+    ) -> int:
+        """
+        Stop the running turns of a session, or the one started with
+        `request_id`. A queued turn leaves the queue; a generating one has
+        its upstream stream closed at once, so Ollama stops generating and
+        the slot goes to the next request. What was generated so far is
+        saved with metadata {"cancelled": True}. Returns the number of
+        turns stopped, once they have wound down.
+        """
+        if session_id is None and request_id is None:
+            raise ValueError("Pass a session_id or a request_id")
+        stopped = [
+            turn
+            for turn in list(self._turns.values())
+            if (request_id is None or turn.request_id == request_id)
+            and (session_id is None or turn.session_id == session_id)
+            and turn.cancel()
+        ]
+        if stopped:
+            await asyncio.wait([turn.task for turn in stopped if turn.task is not None])
+        return len(stopped)
+
+    async def _run_turn(
+        self,
+        turn: _ActiveTurn,
+        out: "asyncio.Queue[Any]",
+        user_input: str,
+        system_prompt: Optional[str],
+        priority: int,
+        options: Optional[Dict[str, Any]],
+        use_documents: bool,
+    ) -> None:
+        """Admission and generation of one turn, feeding `out` with chunks (or the error)."""
+        with log_context(request_id=turn.request_id, session_id=turn.session_id):
+            admission = (
+                self.scheduler.slot(turn.model, key=str(turn.session_id), priority=priority)
+                if self.scheduler is not None
+                else nullcontext()
+            )
+            outcome: Any = _END_OF_TURN
+            try:
+                async with admission as ticket:
+                    if ticket is not None and self.metrics is not None:
+                        self.metrics.observe(
+                            "scheduler_wait_seconds", ticket.wait_time, {"model": turn.model}
+                        )
+                    turn.stage = "preparing"
+                    chat = self._chat_turn(
+                        turn.session_id,
+                        user_input,
+                        turn.model,
+                        system_prompt,
+                        options,
+                        use_documents,
+                        turn,
+                    )
+                    async with aclosing(chat):
+                        async for chunk in chat:
+                            await out.put(chunk)
+            except asyncio.CancelledError:
+                if turn.cancel_requested_at is None:
+                    _drain(out)
+                    out.put_nowait(_END_OF_TURN)
+                    raise  # not ours, e.g. the event loop is shutting down
+                asyncio.current_task().uncancel()  # type: ignore[union-attr]
+            except Exception as e:
+                outcome = e
+            finally:
+                turn.release()
+                del self._turns[turn.request_id]
+                if turn.cancel_requested_at is not None:
+                    self._record_cancellation(turn)
+            # The reader stops at the end marker or the error, after the last chunk
+            await out.put(outcome)
+
+    def _record_cancellation(self, turn: _ActiveTurn) -> None:
+        assert turn.cancel_requested_at is not None and turn.released_at is not None
+        latency = turn.released_at - turn.cancel_requested_at
+        logger.info(
+            f"Cancelled chat turn {turn.request_id} while {turn.cancelled_stage} "
+            f"in {latency * 1000:.1f} ms"
+        )
+        if self.metrics is not None:
+            self.metrics.observe(
+                "chat_cancel_seconds",
+                latency,
+                {"model": turn.model, "stage": turn.cancelled_stage or ""},
+            )
+
+    async def _chat_turn(
+        self,
+        session_id: UUID,
+        user_input: str,
+        model_name: str,
+        system_prompt: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        use_documents: bool = True,
+        turn: Optional[_ActiveTurn] = None,
     ) -> AsyncIterator[str]:
         """
         Main chat loop:
         1. Save User Message
-        2. Load History
+        2. Load History (plus retrieved document excerpts)
         3. Stream from LLM
-        4. Save Assistant Message
+        4. Save Assistant Message (with generation stats in its metadata)
         """
         # 1. Save User Message
         user_msg = Message(role=Role.USER, content=user_input)
+        self.context_window.count(user_msg)  # Persist the token count with the message
         await self.repo.add_message(session_id, user_msg)
 
         # 2. Load History (re-fetch session to get context)
@@ -59,37 +401,131 @@ class ChatService:
         if not session:
             raise ValueError(f"Session {session_id} not found")
 
-        # Construct context window
-        # TODO: Implement context window limiting here based on token counts
-        history = session.messages
-
         # Prepend system prompt if exists and not already there
         if system_prompt:
             # Basic check, in prod we might handle system prompts more robustly in the entity
-            if not history or history[0].role != Role.SYSTEM:
-                history.insert(0, Message(role=Role.SYSTEM, content=system_prompt))
+            if not session.messages or session.messages[0].role != Role.SYSTEM:
+                session.messages.insert(0, Message(role=Role.SYSTEM, content=system_prompt))
+
+        # Document excerpts go after the leading system messages, so the
+        # context window always keeps them (they are capped in size)
+        messages = session.messages
+        sources: List[Dict[str, Any]] = []
+        if use_documents and self.retriever is not None:
+            retrieved = await self._retrieve(self.retriever, model_name, user_input)
+            context = self.retriever.context_message(retrieved)
+            if context is not None:
+                split = 0
+                while split < len(messages) and messages[split].role == Role.SYSTEM:
+                    split += 1
+                messages = [*messages[:split], context, *messages[split:]]
+                sources = context.metadata["sources"]
+
+        # Construct context window: fit history into the model's token budget
+        details = await self._context_details(model_name)
+        history = self.context_window.build(messages, model_name, details)
+
+        # Stopped while preparing: do not start generating
+        if turn is not None:
+            if turn.cancel_requested_at is not None:
+                return
+            turn.stage = "waiting"
 
         # 3. Stream from LLM
         accumulated_response = []
+        cold_start: Optional[bool] = None
+        keep_alive = None
+        stats = GenerationStats()
+        outcome = "cancelled"  # unless the stream completes or fails
+        if self.residency is not None:
+            cold_start = self.residency.begin_request(model_name)
+            keep_alive = self.residency.keep_alive_for(model_name)
+        started = time.perf_counter()
         try:
-            stream = self.llm.chat_stream(model=model_name, messages=history)
+            stream = self.llm.chat_stream(
+                model=model_name,
+                messages=history,
+                options=options,
+                keep_alive=keep_alive,
+                stats=stats,
+            )
+            if self.coalescer is not None:
+                stream = self.coalescer(stream)
 
             async for chunk in stream:
+                if stats.ttft is None:
+                    # As the caller sees it, i.e. after coalescing
+                    stats.ttft = time.perf_counter() - started
+                    if turn is not None:
+                        turn.stage = "streaming"
                 accumulated_response.append(chunk)
                 yield chunk
+            outcome = "ok"
 
         except Exception as e:
+            outcome = "error"
             logger.error(f"Error during chat stream: {e}")
             yield f"\n\n*Error generating response: {str(e)}*"
             raise e
         finally:
+            if turn is not None:
+                turn.release()  # the upstream stream is closed by now
+            if self.residency is not None:
+                self.residency.end_request(model_name)
+            self._record_generation(model_name, stats, outcome)
+
             # 4. Save Assistant Message (even if partial/failed, we might want to save what we got)
             if accumulated_response:
                 full_content = "".join(accumulated_response)
                 ai_msg = Message(role=Role.ASSISTANT, content=full_content)
+                if cold_start is not None:
+                    ai_msg.metadata["cold_start"] = cold_start
+                generation = stats.to_dict()
+                if generation:
+                    ai_msg.metadata["generation"] = generation
+                if sources:
+                    ai_msg.metadata["sources"] = sources
+                if outcome == "cancelled":
+                    ai_msg.metadata["cancelled"] = True
+                self.context_window.count(ai_msg)
                 await self.repo.add_message(session_id, ai_msg)
 
                 # Auto-title (simple heuristic for first turn)
                 if len(session.messages) <= 2:  # System + User or just User
                     short_title = user_input[:30] + "..." if len(user_input) > 30 else user_input
                     await self.repo.update_session_title(session_id, short_title)
+
+    async def _retrieve(
+        self, retriever: Retriever, model_name: str, query: str
+    ) -> List[RetrievedChunk]:
+        # Best effort: answer without documents rather than fail the turn
+        started = time.perf_counter()
+        try:
+            retrieved = await retriever.retrieve(query)
+        except (LLMException, ValueError) as e:
+            logger.warning(f"Document retrieval failed: {e}")
+            return []
+        if self.metrics is not None:
+            self.metrics.observe(
+                "rag_retrieval_seconds", time.perf_counter() - started, {"model": model_name}
+            )
+        return retrieved
+
+    def _record_generation(self, model_name: str, stats: GenerationStats, outcome: str) -> None:
+        if self.metrics is None:
+            return
+        labels = {"model": model_name}
+        self.metrics.inc("chat_turns_total", labels={**labels, "outcome": outcome})
+        if stats.ttft is not None:
+            self.metrics.observe("llm_time_to_first_token_seconds", stats.ttft, labels)
+        if not stats.done:
+            return
+        self.metrics.observe("llm_load_seconds", stats.load_duration / 1e9, labels)
+        self.metrics.observe("llm_prompt_eval_seconds", stats.prompt_eval_duration / 1e9, labels)
+        self.metrics.observe("llm_generation_seconds", stats.eval_duration / 1e9, labels)
+        self.metrics.observe("llm_completion_tokens", stats.eval_count, labels)
+        self.metrics.inc("llm_prompt_tokens_total", stats.prompt_eval_count, labels)
+        self.metrics.inc("llm_completion_tokens_total", stats.eval_count, labels)
+        tps = stats.tokens_per_second
+        if tps is not None:
+            self.metrics.observe("llm_tokens_per_second", tps, labels)
@@ -0,0 +1,131 @@
+import logging
+import math
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from domain.entities import Message, Role
+
+logger = logging.getLogger(__name__)
+
+TokenCounter = Callable[[str], int]
+
+# Metadata key under which a message's token count is cached
+TOKEN_COUNT_KEY = "token_count"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap tokenizer-free estimate (~4 characters per token for English text).
+    Good enough for budgeting; swap in a real tokenizer via ContextWindowBuilder.
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / 4)
+
+
+class ContextWindowBuilder:
+    """
+    Fits chat history into a per-model token budget.
+
+    Leading system messages are always kept. Remaining turns are taken
+    newest-first until the budget is spent, so the oldest turns are dropped
+    first. If the newest message alone does not fit, its head is trimmed.
+    Token counts are cached in Message.metadata so they are computed once.
+    """
+
+    def __init__(
+        self,
+        default_budget: int = 4096,
+        response_reserve: int = 512,
+        model_budgets: Optional[Mapping[str, int]] = None,
+        message_overhead: int = 4,
+        counter: TokenCounter = estimate_tokens,
+    ):
+        self.default_budget = default_budget
+        self.response_reserve = response_reserve
+        self.model_budgets: Dict[str, int] = dict(model_budgets or {})
+        self.message_overhead = message_overhead
+        self.counter = counter
+
+    def budget_for(self, model_name: str, details: Optional[Mapping[str, Any]] = None) -> int:
+        """
+        Prompt budget for a model, minus the response reserve:
+        1. an explicit per-model setting,
+        2. the model's configured runtime context (num_ctx),
+        3. the default, capped by the model's maximum context_length
+           (Ollama runs with its own default context, not the maximum).
+        """
+        details = details or {}
+        budget = self.model_budgets.get(model_name)
+        if budget is None:
+            num_ctx = details.get("num_ctx")
+            if isinstance(num_ctx, int) and num_ctx > 0:
+                budget = num_ctx
+        if budget is None:
+            budget = self.default_budget
+            context_length = details.get("context_length")
+            if isinstance(context_length, int) and context_length > 0:
+                budget = min(budget, context_length)
+        return max(budget - self.response_reserve, 1)
+
+    def count(self, message: Message) -> int:
+        """Token count of a message, cached in its metadata."""
+        cached = message.metadata.get(TOKEN_COUNT_KEY)
+        if isinstance(cached, int):
+            return cached
+        tokens = self.counter(message.content) + self.message_overhead
+        message.metadata[TOKEN_COUNT_KEY] = tokens
+        return tokens
+
+    def build(
+        self,
+        messages: List[Message],
+        model_name: str,
+        details: Optional[Mapping[str, Any]] = None,
+    ) -> List[Message]:
+        budget = self.budget_for(model_name, details)
+
+        split = 0
+        while split < len(messages) and messages[split].role == Role.SYSTEM:
+            split += 1
+        system, turns = messages[:split], messages[split:]
+
+        remaining = budget - sum(self.count(m) for m in system)
+        kept: List[Message] = []
+        for message in reversed(turns):
+            tokens = self.count(message)
+            if tokens <= remaining:
+                kept.append(message)
+                remaining -= tokens
+                continue
+            if not kept:
+                trimmed = self._trim(message, remaining)
+                if trimmed is not None:
+                    kept.append(trimmed)
+            break
+
+        dropped = len(turns) - len(kept)
+        if dropped:
+            logger.debug(
+                f"Context window for {model_name}: dropped {dropped} oldest message(s) "
+                f"to fit {budget} tokens"
+            )
+
+        kept.reverse()
+        return system + kept
+
+    def _trim(self, message: Message, available: int) -> Optional[Message]:
+        """Keep the tail of an oversized message so the latest text survives."""
+        available -= self.message_overhead
+        if available <= 0:
+            return None
+        total = max(self.counter(message.content), 1)
+        keep_chars = int(len(message.content) * available / total)
+        if keep_chars <= 0:
+            return None
+        return Message(
+            role=message.role,
+            content=message.content[-keep_chars:],
+            id=message.id,
+            created_at=message.created_at,
+            metadata={**message.metadata, TOKEN_COUNT_KEY: available + self.message_overhead},
+        )
@@ -0,0 +1,215 @@
+import hashlib
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterable, Callable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+from domain.entities import Document, DocumentChunk
+from domain.ports import DocumentStore, LLMClient, VectorIndex
+
+logger = logging.getLogger(__name__)
+
+# Same ~4 characters per token as services.context_window.estimate_tokens
+CHARS_PER_TOKEN = 4
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def content_hash(text: str) -> str:
+    """sha256 of the text with whitespace collapsed, so reflowed copies still match."""
+    return hashlib.sha256(_WHITESPACE.sub(" ", text).strip().encode()).hexdigest()
+
+
+def _pieces(text: str, max_chars: int) -> Iterator[str]:
+    """Paragraphs, split further at sentence ends and then at words when too long."""
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            yield paragraph
+            continue
+        for sentence in _SENTENCE_END.split(paragraph):
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                yield sentence[:cut]
+                sentence = sentence[cut:].lstrip()
+            if sentence:
+                yield sentence
+
+
+def chunk_text(text: str, max_chars: int = 1024, overlap_chars: int = 128) -> Iterator[str]:
+    """
+    Split text into chunks of at most `max_chars`, packing whole paragraphs
+    (or sentences) greedily. Each chunk starts with the last `overlap_chars`
+    of the previous one, cut at a word boundary, so context spanning a
+    boundary is retrievable from either side.
+    """
+    current = ""
+    for piece in _pieces(text, max_chars):
+        if current and len(current) + 2 + len(piece) > max_chars:
+            yield current
+            tail = current[-overlap_chars:] if overlap_chars else ""
+            space = tail.find(" ")
+            tail = tail[space + 1 :] if space >= 0 else ""
+            current = tail if len(tail) + 2 + len(piece) <= max_chars else ""
+        current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        yield current
+
+
+class _PendingChunk(NamedTuple):
+    document_id: UUID
+    ordinal: int
+    content: str
+    content_hash: str
+
+
+@dataclass
+class IngestionProgress:
+    documents: int = 0
+    skipped_documents: int = 0  # already ingested (same content hash)
+    chunks: int = 0  # embedded and stored
+    duplicate_chunks: int = 0  # skipped, an identical chunk is already stored
+    started_at: float = field(default_factory=time.monotonic)
+    finished: bool = False
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def chunks_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.chunks / elapsed if elapsed > 0 else 0.0
+
+
+IngestionCallback = Callable[[IngestionProgress], None]
+
+
+class IngestionService:
+    """
+    Streaming document ingestion: chunk, deduplicate, embed, store.
+
+    Documents are consumed one at a time and chunks are embedded in
+    batches of `batch_size` (one /api/embed request each, spanning
+    document boundaries), so memory is bounded by one document plus one
+    batch however large the corpus. Documents whose content was already
+    ingested are skipped whole; chunks identical to a stored chunk are
+    skipped before embedding. Vectors are appended to the index before
+    their chunks are recorded, so an interrupted run leaves at most
+    unreferenced vectors behind and is resumed by ingesting the same
+    documents again.
+    """
+
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        index: VectorIndex,
+        store: DocumentStore,
+        model: str,
+        chunk_tokens: int = 256,
+        overlap_tokens: int = 32,
+        batch_size: int = 64,
+        progress_interval: float = 1.0,
+    ):
+        self.llm = llm_client
+        self.index = index
+        self.store = store
+        self.model = model
+        self.max_chars = chunk_tokens * CHARS_PER_TOKEN
+        self.overlap_chars = overlap_tokens * CHARS_PER_TOKEN
+        self.batch_size = batch_size
+        self.progress_interval = progress_interval
+
+    async def ingest(
+        self,
+        documents: AsyncIterable[Document],
+        on_progress: Optional[IngestionCallback] = None,
+    ) -> IngestionProgress:
+        progress = IngestionProgress()
+        batch: List[_PendingChunk] = []
+        seen: Set[str] = set()  # duplicates within a batch never reach the store
+        chunked: List[Tuple[UUID, int]] = []  # documents waiting for their last batch
+        last_report = 0.0
+
+        def report(final: bool = False) -> None:
+            nonlocal last_report
+            now = time.monotonic()
+            if on_progress is not None and (final or now - last_report >= self.progress_interval):
+                last_report = now
+                progress.finished = final
+                on_progress(progress)
+
+        async def flush() -> None:
+            if batch:
+                await self._flush(batch, progress)
+                batch.clear()
+                seen.clear()
+            # Only now are all chunks of these documents stored
+            for document_id, chunk_count in chunked:
+                await self.store.finish_document(document_id, chunk_count)
+            progress.documents += len(chunked)
+            chunked.clear()
+            report()
+
+        async for document in documents:
+            document_id = await self.store.begin_document(
+                document.source, content_hash(document.text)
+            )
+            if document_id is None or any(document_id == d for d, _ in chunked):
+                # Already ingested, or the same content seen earlier in this batch
+                progress.skipped_documents += 1
+                continue
+
+            chunk_count = 0
+            for text in chunk_text(document.text, self.max_chars, self.overlap_chars):
+                chunk_count += 1
+                digest = content_hash(text)
+                if digest in seen:
+                    progress.duplicate_chunks += 1
+                    continue
+                seen.add(digest)
+                batch.append(_PendingChunk(document_id, chunk_count - 1, text, digest))
+                if len(batch) >= self.batch_size:
+                    await flush()
+            chunked.append((document_id, chunk_count))
+
+        await flush()
+        report(final=True)
+        logger.info(
+            f"Ingested {progress.documents} documents ({progress.chunks} chunks, "
+            f"{progress.chunks_per_second:,.0f} chunks/s); skipped "
+            f"{progress.skipped_documents} known documents and "
+            f"{progress.duplicate_chunks} duplicate chunks"
+        )
+        return progress
+
+    async def _flush(self, batch: List[_PendingChunk], progress: IngestionProgress) -> None:
+        known = await self.store.existing_chunk_hashes([c.content_hash for c in batch])
+        fresh = [c for c in batch if c.content_hash not in known]
+        progress.duplicate_chunks += len(batch) - len(fresh)
+        if not fresh:
+            return
+
+        vectors = await self.llm.embed(self.model, [c.content for c in fresh])
+        first_row = await self.index.add(self.model, vectors)
+        await self.store.add_chunks(
+            [
+                DocumentChunk(
+                    id=first_row + i,
+                    document_id=c.document_id,
+                    source="",  # stored on the document
+                    ordinal=c.ordinal,
+                    content=c.content,
+                    content_hash=c.content_hash,
+                )
+                for i, c in enumerate(fresh)
+            ]
+        )
+        progress.chunks += len(fresh)
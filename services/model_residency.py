@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Set
+
+from domain.entities import KeepAlive, ModelInfo
+from domain.exceptions import LLMException
+from domain.ports import LLMClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ResidentModel:
+    name: str
+    size: int = 0  # bytes in (V)RAM as reported by /api/ps
+    last_used: float = 0.0
+
+
+class ModelResidencyManager:
+    """
+    Tracks which models Ollama has loaded and keeps the right ones warm.
+
+    - Polls /api/ps so begin_request() can tell whether a turn is a cold start.
+      Only /api/ps makes a model resident: a request for a model it did not
+      report triggers an immediate refresh when it ends, rather than
+      assuming the model got (and stayed) loaded until the next poll.
+    - preload() loads a session's model in the background when it is opened.
+    - keep_alive_for() applies per-model keep_alive policies to every request.
+    - With a memory budget, least recently used models are unloaded when the
+      resident set grows past it (models with requests in flight are kept).
+    """
+
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        default_keep_alive: Optional[KeepAlive] = None,
+        keep_alive: Optional[Mapping[str, KeepAlive]] = None,
+        memory_budget: Optional[int] = None,
+        poll_interval: float = 10.0,
+    ):
+        self.llm = llm_client
+        self.default_keep_alive = default_keep_alive
+        self.keep_alive: Dict[str, KeepAlive] = {
+            ModelInfo.full_name(name): value for name, value in (keep_alive or {}).items()
+        }
+        self.memory_budget = memory_budget
+        self.poll_interval = poll_interval
+
+        self.resident: Dict[str, ResidentModel] = {}
+        self._in_use: Dict[str, int] = {}
+        self._loading: Dict[str, "asyncio.Task[None]"] = {}
+        self._poller: Optional["asyncio.Task[None]"] = None
+        self._refreshing: Optional["asyncio.Task[None]"] = None
+
+    def keep_alive_for(self, model: str) -> Optional[KeepAlive]:
+        return self.keep_alive.get(ModelInfo.full_name(model), self.default_keep_alive)
+
+    def is_resident(self, model: str) -> bool:
+        return ModelInfo.full_name(model) in self.resident
+
+    async def start(self) -> None:
+        await self.refresh()
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll(), name="model-residency-poller")
+
+    async def stop(self) -> None:
+        tasks = [
+            t for t in [self._poller, self._refreshing, *self._loading.values()] if t is not None
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._poller = None
+        self._refreshing = None
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            await self._safe_refresh()
+
+    async def _safe_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:  # never let the poller die
+            logger.error(f"Model residency refresh failed: {e}")
+
+    def _refresh_soon(self) -> None:
+        """Ask /api/ps now instead of at the next poll."""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(
+                self._safe_refresh(), name="model-residency-refresh"
+            )
+
+    async def refresh(self) -> None:
+        """Sync the resident set with /api/ps."""
+        try:
+            running = await self.llm.list_running_models()
+        except LLMException as e:
+            logger.warning(f"Could not list running models: {e}")
+            return
+
+        previous = self.resident
+        self.resident = {}
+        for entry in running:
+            name = entry.get("name", "")
+            if not name:
+                continue
+            name = ModelInfo.full_name(name)
+            size = int(entry.get("size_vram") or entry.get("size") or 0)
+            last_used = previous[name].last_used if name in previous else time.monotonic()
+            self.resident[name] = ResidentModel(name=name, size=size, last_used=last_used)
+        await self._enforce_budget()
+
+    def preload(self, model: str) -> None:
+        """Start loading `model` in the background unless it is resident or loading."""
+        name = ModelInfo.full_name(model)
+        if name in self.resident or name in self._loading:
+            return
+        self._loading[name] = asyncio.create_task(self._load(model))
+
+    async def _load(self, model: str) -> None:
+        started = time.monotonic()
+        try:
+            await self.llm.load_model(model, keep_alive=self.keep_alive_for(model))
+            logger.info(f"Preloaded {model} in {time.monotonic() - started:.2f}s")
+            await self.refresh()  # confirms it is resident, with its real size for budgeting
+        except LLMException as e:
+            logger.warning(f"Preloading {model} failed: {e}")
+        finally:
+            self._loading.pop(ModelInfo.full_name(model), None)
+
+    def begin_request(self, model: str) -> bool:
+        """Mark `model` in use; returns True if this request is a cold start."""
+        model = ModelInfo.full_name(model)
+        cold = model not in self.resident
+        self._in_use[model] = self._in_use.get(model, 0) + 1
+        self._touch(model)
+        return cold
+
+    def end_request(self, model: str) -> None:
+        model = ModelInfo.full_name(model)
+        remaining = self._in_use.get(model, 0) - 1
+        if remaining > 0:
+            self._in_use[model] = remaining
+        else:
+            self._in_use.pop(model, None)
+        if model in self.resident:
+            self._touch(model)
+        else:
+            # It may have been loaded by this request, or failed to load
+            self._refresh_soon()
+
+    def _touch(self, model: str) -> None:
+        entry = self.resident.get(model)
+        if entry is not None:
+            entry.last_used = time.monotonic()
+
+    async def _enforce_budget(self) -> None:
+        if self.memory_budget is None:
+            return
+        total = sum(m.size for m in self.resident.values())
+        protected: Set[str] = set(self._in_use) | set(self._loading)
+        for entry in sorted(self.resident.values(), key=lambda m: m.last_used):
+            if total <= self.memory_budget:
+                break
+            if entry.name in protected:
+                continue
+            try:
+                await self.llm.unload_model(entry.name)
+            except LLMException as e:
+                logger.warning(f"Unloading {entry.name} failed: {e}")
+                continue
+            logger.info(f"Unloaded cold model {entry.name} to stay within memory budget")
+            total -= entry.size
+            self.resident.pop(entry.name, None)
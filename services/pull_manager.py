@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from domain.exceptions import LLMConnectionError, LLMException, LLMPullError
+from domain.ports import LLMClient
+
+logger = logging.getLogger(__name__)
+
+
+class _Subscriber:
+    """One consumer of a pull's progress. Unread progress updates collapse into the latest."""
+
+    def __init__(self) -> None:
+        self.items: Deque[Dict[str, Any]] = deque()
+        self.ready = asyncio.Event()
+
+    def push(self, progress: Dict[str, Any]) -> None:
+        if self.items and self.items[-1].get("status") == progress.get("status"):
+            self.items[-1] = progress  # a slow reader only needs the newest figure
+        else:
+            self.items.append(progress)
+        self.ready.set()
+
+
+@dataclass
+class PullJob:
+    name: str
+    latest: Dict[str, Any]
+    task: Optional["asyncio.Task[None]"] = None
+    subscribers: List[_Subscriber] = field(default_factory=list)
+    attempts: int = 0
+    last_sent: float = 0.0
+    error: Optional[LLMException] = None
+    done: bool = False
+
+
+class PullManager:
+    """
+    Coordinates model downloads.
+
+    - Single flight: concurrent pull(name) calls share one upstream pull
+      and each subscriber gets the same progress stream.
+    - Progress is throttled to one update per `progress_interval` seconds
+      (status changes and the final result always go through).
+    - Transient failures and stalls (no progress for `stall_timeout`)
+      are retried with exponential backoff; Ollama keeps partially
+      downloaded layers, so a retry resumes rather than restarts.
+    - At most `max_concurrent` pulls run at once so downloads do not
+      starve inference of bandwidth; the rest report status "queued".
+    """
+
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        max_concurrent: int = 1,
+        progress_interval: float = 0.5,
+        max_retries: int = 3,
+        retry_backoff: float = 2.0,
+        stall_timeout: Optional[float] = 120.0,
+    ):
+        self.llm = llm_client
+        self.progress_interval = progress_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.stall_timeout = stall_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._jobs: Dict[str, PullJob] = {}
+
+    def active(self) -> Dict[str, Dict[str, Any]]:
+        """Latest progress of every pull that is queued or running."""
+        return {name: dict(job.latest) for name, job in self._jobs.items()}
+
+    async def pull(self, name: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Progress dicts for pulling `name`, ending with status "success".
+        Joins a pull already in flight. Raises LLMException if it fails.
+        Leaving early does not stop the download; use cancel() for that.
+        """
+        job = self._jobs.get(name)
+        if job is None:
+            job = PullJob(name=name, latest={"status": "queued", "model": name})
+            self._jobs[name] = job
+            job.task = asyncio.create_task(self._run(job), name=f"pull-{name}")
+
+        subscriber = _Subscriber()
+        subscriber.push(dict(job.latest))
+        job.subscribers.append(subscriber)
+        try:
+            while True:
+                while subscriber.items:
+                    yield subscriber.items.popleft()
+                if job.done:
+                    break
+                subscriber.ready.clear()
+                await subscriber.ready.wait()
+            if job.error is not None:
+                raise job.error
+        finally:
+            job.subscribers.remove(subscriber)
+
+    async def cancel(self, name: str) -> bool:
+        job = self._jobs.get(name)
+        if job is None or job.task is None:
+            return False
+        job.task.cancel()
+        await asyncio.gather(job.task, return_exceptions=True)
+        return True
+
+    async def close(self) -> None:
+        for name in list(self._jobs):
+            await self.cancel(name)
+
+    async def _run(self, job: PullJob) -> None:
+        try:
+            async with self._semaphore:
+                await self._pull_with_retries(job)
+        except asyncio.CancelledError:
+            job.error = LLMException(f"Pull of {job.name} was cancelled")
+            self._publish(job, {"status": "cancelled"}, force=True)
+        except LLMException as e:
+            job.error = e
+            self._publish(job, {"status": "error", "error": str(e)}, force=True)
+            logger.error(f"Pulling {job.name} failed after {job.attempts} attempt(s): {e}")
+        except Exception as e:
+            # A bug or a malformed progress line: still end every stream with an error
+            job.error = LLMPullError(f"Pulling {job.name} failed unexpectedly: {e!r}")
+            self._publish(job, {"status": "error", "error": str(job.error)}, force=True)
+            logger.exception(f"Pulling {job.name} failed unexpectedly")
+        finally:
+            job.done = True
+            self._jobs.pop(job.name, None)
+            for subscriber in job.subscribers:
+                subscriber.ready.set()
+
+    async def _pull_with_retries(self, job: PullJob) -> None:
+        for attempt in range(self.max_retries + 1):
+            job.attempts = attempt + 1
+            try:
+                await self._pull_once(job)
+                logger.info(f"Pulled {job.name} in {job.attempts} attempt(s)")
+                return
+            except LLMPullError:
+                raise
+            except LLMException as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff * (2**attempt)
+                logger.warning(f"Pull of {job.name} failed ({e}), retrying in {delay:.1f}s")
+                progress = {"status": "retrying", "attempt": job.attempts, "error": str(e)}
+                self._publish(job, progress, force=True)
+                await asyncio.sleep(delay)
+
+    async def _pull_once(self, job: PullJob) -> None:
+        status = None
+        async with aclosing(self.llm.pull_model(job.name)) as stream:
+            while True:
+                try:
+                    progress = await asyncio.wait_for(anext(stream), self.stall_timeout)
+                except StopAsyncIteration:
+                    break
+                except TimeoutError:
+                    raise LLMConnectionError(
+                        f"No pull progress for {self.stall_timeout}s"
+                    ) from None
+                if "error" in progress:
+                    raise LLMPullError(f"Cannot pull {job.name}: {progress['error']}")
+                status = progress.get("status")
+                self._publish(job, progress)
+        if status != "success":
+            raise LLMConnectionError("Pull stream ended before completion")
+
+    def _publish(self, job: PullJob, progress: Dict[str, Any], force: bool = False) -> None:
+        progress = {**progress, "model": job.name}
+        total, completed = progress.get("total"), progress.get("completed")
+        if total and completed is not None:
+            progress["percent"] = round(100.0 * completed / total, 1)
+
+        status_changed = progress.get("status") != job.latest.get("status")
+        job.latest = progress
+        now = time.monotonic()
+        if not (force or status_changed or now - job.last_sent >= self.progress_interval):
+            return
+        job.last_sent = now
+        for subscriber in job.subscribers:
+            subscriber.push(dict(progress))
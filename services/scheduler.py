@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, List, Mapping, Optional
+
+from domain.exceptions import LLMQueueFullError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Ticket:
+    """A request waiting for (or holding) a generation slot."""
+
+    model: str
+    key: str  # fairness key, usually the session id
+    priority: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+    granted_at: Optional[float] = None
+    future: Optional["asyncio.Future[None]"] = None  # set while queued
+
+    @property
+    def wait_time(self) -> float:
+        end = self.granted_at if self.granted_at is not None else time.monotonic()
+        return end - self.enqueued_at
+
+
+@dataclass
+class SchedulerStats:
+    active: int = 0
+    queued: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.admitted if self.admitted else 0.0
+
+
+class _ModelQueue:
+    """Waiters for one model: priority levels, each round-robin across keys."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.levels: Dict[int, "OrderedDict[str, Deque[Ticket]]"] = {}
+        self.size = 0
+
+    def push(self, ticket: Ticket) -> None:
+        keys = self.levels.setdefault(ticket.priority, OrderedDict())
+        keys.setdefault(ticket.key, deque()).append(ticket)
+        self.size += 1
+
+    def pop(self) -> Optional[Ticket]:
+        for priority in sorted(self.levels, reverse=True):
+            keys = self.levels[priority]
+            if not keys:
+                continue
+            key, tickets = keys.popitem(last=False)
+            ticket = tickets.popleft()
+            if tickets:
+                keys[key] = tickets  # back of the line: round-robin across keys
+            if not keys:
+                del self.levels[priority]
+            self.size -= 1
+            return ticket
+        return None
+
+    def remove(self, ticket: Ticket) -> bool:
+        keys = self.levels.get(ticket.priority)
+        tickets = keys.get(ticket.key) if keys else None
+        if not tickets or ticket not in tickets:
+            return False
+        tickets.remove(ticket)
+        if not tickets:
+            del keys[ticket.key]  # type: ignore[union-attr]
+        if not keys:
+            del self.levels[ticket.priority]
+        self.size -= 1
+        return True
+
+    def order(self) -> List[Ticket]:
+        """Waiters in the order they would be admitted."""
+        ordered: List[Ticket] = []
+        for priority in sorted(self.levels, reverse=True):
+            queues = [list(t) for t in self.levels[priority].values()]
+            depth = max((len(q) for q in queues), default=0)
+            for i in range(depth):
+                ordered.extend(q[i] for q in queues if i < len(q))
+        return ordered
+
+
+class RequestScheduler:
+    """
+    Admission control in front of the LLM backend.
+
+    Each model gets at most `concurrency` generations in flight; further
+    requests wait in a bounded queue and are admitted by priority, then
+    round-robin across fairness keys (sessions) so one busy session cannot
+    starve the others. When the queue is full, acquire() fails immediately
+    with LLMQueueFullError instead of piling up until the HTTP timeout.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 2,
+        max_queue: int = 32,
+        model_concurrency: Optional[Mapping[str, int]] = None,
+        max_wait: Optional[float] = None,
+    ):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.model_concurrency: Dict[str, int] = dict(model_concurrency or {})
+        self.max_wait = max_wait
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._stats = SchedulerStats()
+
+    def _queue(self, model: str) -> _ModelQueue:
+        queue = self._queues.get(model)
+        if queue is None:
+            queue = _ModelQueue(self.model_concurrency.get(model, self.concurrency))
+            self._queues[model] = queue
+        return queue
+
+    async def acquire(self, model: str, key: str, priority: int = 0) -> Ticket:
+        queue = self._queue(model)
+        ticket = Ticket(model=model, key=key, priority=priority)
+
+        if queue.active < queue.limit and queue.size == 0:
+            self._grant(queue, ticket)
+            return ticket
+
+        if queue.size >= self.max_queue:
+            self._stats.rejected += 1
+            raise LLMQueueFullError(
+                f"Server busy: {queue.size} requests already queued for {model}"
+            )
+
+        ticket.future = asyncio.get_running_loop().create_future()
+        queue.push(ticket)
+        try:
+            await asyncio.wait_for(asyncio.shield(ticket.future), timeout=self.max_wait)
+        except TimeoutError:
+            if queue.remove(ticket):
+                self._stats.rejected += 1
+                raise LLMQueueFullError(
+                    f"Timed out after {self.max_wait}s waiting for a {model} slot"
+                ) from None
+        except asyncio.CancelledError:
+            if not queue.remove(ticket) and ticket.granted_at is not None:
+                # Granted while we were being cancelled: hand the slot on
+                self.release(ticket)
+            raise
+        return ticket
+
+    def _grant(self, queue: _ModelQueue, ticket: Ticket) -> None:
+        queue.active += 1
+        ticket.granted_at = time.monotonic()
+        wait = ticket.wait_time
+        self._stats.admitted += 1
+        self._stats.total_wait += wait
+        self._stats.max_wait = max(self._stats.max_wait, wait)
+        if ticket.future is not None and not ticket.future.done():
+            ticket.future.set_result(None)
+
+    def release(self, ticket: Ticket) -> None:
+        queue = self._queue(ticket.model)
+        queue.active -= 1
+        while queue.active < queue.limit:
+            waiter = queue.pop()
+            if waiter is None:
+                break
+            self._grant(queue, waiter)
+
+    @asynccontextmanager
+    async def slot(self, model: str, key: str, priority: int = 0) -> AsyncIterator[Ticket]:
+        ticket = await self.acquire(model, key, priority)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def position(self, key: str, model: Optional[str] = None) -> Optional[int]:
+        """1-based queue position of the first waiting request for `key`, if queued."""
+        for name, queue in self._queues.items():
+            if model is not None and name != model:
+                continue
+            for index, ticket in enumerate(queue.order(), start=1):
+                if ticket.key == key:
+                    return index
+        return None
+
+    def depth(self, model: Optional[str] = None) -> int:
+        if model is not None:
+            return self._queue(model).size
+        return sum(q.size for q in self._queues.values())
+
+    def stats(self) -> SchedulerStats:
+        return SchedulerStats(
+            active=sum(q.active for q in self._queues.values()),
+            queued=self.depth(),
+            admitted=self._stats.admitted,
+            rejected=self._stats.rejected,
+            total_wait=self._stats.total_wait,
+            max_wait=self._stats.max_wait,
+        )
@@ -0,0 +1,64 @@
+import asyncio
+import time
+from typing import AsyncIterator, List, Optional
+
+
+class TokenCoalescer:
+    """
+    Batches a token stream into larger chunks before it reaches the UI.
+
+    Buffered tokens are emitted once they reach max_bytes, or max_delay
+    seconds after the first buffered token, even if the upstream stream is
+    stalled at that moment. The concatenated output is identical to the input.
+    """
+
+    def __init__(self, max_delay: float = 0.03, max_bytes: int = 512):
+        self.max_delay = max_delay
+        self.max_bytes = max_bytes
+
+    async def __call__(self, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        buffer: List[str] = []
+        size = 0
+        deadline = 0.0
+        next_token: Optional["asyncio.Future[str]"] = None
+
+        try:
+            while True:
+                if next_token is None:
+                    next_token = asyncio.ensure_future(stream.__anext__())
+
+                timeout = max(deadline - time.monotonic(), 0.0) if buffer else None
+                done, _ = await asyncio.wait({next_token}, timeout=timeout)
+
+                if not done:
+                    # Deadline hit while upstream is still thinking: flush what we have
+                    yield "".join(buffer)
+                    buffer, size = [], 0
+                    continue
+
+                try:
+                    token = next_token.result()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    next_token = None
+
+                if not buffer:
+                    deadline = time.monotonic() + self.max_delay
+                buffer.append(token)
+                size += len(token)  # characters; close enough to bytes for batching
+
+                if size >= self.max_bytes or time.monotonic() >= deadline:
+                    yield "".join(buffer)
+                    buffer, size = [], 0
+
+            if buffer:
+                yield "".join(buffer)
+        finally:
+            if next_token is not None:
+                # Settle the in-flight __anext__ before closing the generator
+                next_token.cancel()
+                await asyncio.gather(next_token, return_exceptions=True)
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
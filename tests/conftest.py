@@ -0,0 +1,42 @@
+import os
+import tempfile
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+# Point the module-level engines in adapters.db at a scratch database before
+# anything imports the settings
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='guiollama-tests-')}/app.db"
+
+import pytest  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from adapters.chat_repository import SqlAlchemyChatRepository  # noqa: E402
+from adapters.orm import Base  # noqa: E402
+from benchmarks.fake_ollama import FakeOllamaConfig, FakeOllamaServer  # noqa: E402
+
+
+@pytest.fixture
+async def repo(tmp_path) -> AsyncIterator[SqlAlchemyChatRepository]:
+    """A chat repository on a fresh SQLite file."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/chat.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield SqlAlchemyChatRepository(
+        session_factory=async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    )
+    await engine.dispose()
+
+
+@pytest.fixture
+async def fake_ollama() -> AsyncIterator[Callable[..., Awaitable[FakeOllamaServer]]]:
+    """Start fake Ollama servers: `await fake_ollama(tokens_per_second=...)`."""
+    servers: list[FakeOllamaServer] = []
+
+    async def start(**config: object) -> FakeOllamaServer:
+        defaults: dict[str, object] = {"jitter": 0.0, "load_latency": 0.0, "prompt_latency": 0.0}
+        server = await FakeOllamaServer(FakeOllamaConfig(**{**defaults, **config})).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        await server.stop()
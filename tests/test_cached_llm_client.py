@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from adapters.cached_llm_client import CachingLLMClient
+from domain.entities import ModelInfo
+
+
+class _Backend:
+    """Lists one tagged model and counts /api/show calls."""
+
+    def __init__(self):
+        self.digest = "sha256:abc"
+        self.shows = 0
+
+    async def list_models(self) -> list[ModelInfo]:
+        return [
+            ModelInfo(
+                name="llama2:latest", size=1, digest=self.digest, modified_at=datetime(2024, 1, 1)
+            )
+        ]
+
+    async def show_model(self, name: str) -> dict:
+        self.shows += 1
+        return {"name": name}
+
+
+async def test_untagged_name_keeps_its_details_across_refreshes():
+    backend = _Backend()
+    client = CachingLLMClient(backend, ttl=0)
+    await client.list_models()
+
+    await client.show_model("llama2")
+    await client.list_models()  # a TTL refresh with the same digest
+    await client.show_model("llama2")
+    await client.show_model("llama2:latest")
+
+    assert backend.shows == 1
+
+
+async def test_untagged_name_is_refetched_when_the_digest_changes():
+    backend = _Backend()
+    client = CachingLLMClient(backend, ttl=0)
+    await client.list_models()
+    await client.show_model("llama2")
+
+    backend.digest = "sha256:def"  # re-pulled
+    await client.list_models()
+    await client.show_model("llama2")
+
+    assert backend.shows == 2
+
+
+async def test_invalidating_either_name_clears_the_details():
+    backend = _Backend()
+    client = CachingLLMClient(backend)
+    await client.list_models()
+
+    await client.show_model("llama2:latest")
+    client.invalidate("llama2")
+    await client.show_model("llama2:latest")
+
+    assert backend.shows == 2
@@ -0,0 +1,202 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from uuid import UUID
+
+import pytest
+
+from adapters.ollama_client import OllamaClient
+from domain.entities import Role
+from infra.metrics import MetricsRegistry, register_chat_metrics
+from services.chat_services import ChatService
+from services.scheduler import RequestScheduler
+
+MODEL = "fake:latest"
+
+
+@dataclass
+class _Consumer:
+    """A chat turn read to the end in the background, like the UI does."""
+
+    task: "asyncio.Task[None]"
+    chunks: list[str] = field(default_factory=list)
+
+
+def _consume(svc: ChatService, session_id: UUID, request_id: str) -> _Consumer:
+    consumer = _Consumer(task=None)  # type: ignore[arg-type]
+
+    async def read() -> None:
+        async for chunk in svc.stream_chat(
+            session_id, f"question {request_id}", MODEL, request_id=request_id
+        ):
+            consumer.chunks.append(chunk)
+
+    consumer.task = asyncio.create_task(read())
+    return consumer
+
+
+async def _until_stage(svc: ChatService, request_id: str, stage: str) -> None:
+    async with asyncio.timeout(5):
+        while request_id not in svc._turns or svc._turns[request_id].stage != stage:
+            await asyncio.sleep(0.001)
+
+
+@pytest.fixture
+async def chat(fake_ollama, repo):
+    """A ChatService on a fake Ollama with one generation slot; stopped afterwards."""
+    services = []
+
+    async def make(**config: object):
+        server = await fake_ollama(**config)
+        client = OllamaClient(server.base_url)
+        scheduler = RequestScheduler(concurrency=1)
+        metrics = register_chat_metrics(MetricsRegistry())
+        svc = ChatService(client, repo, scheduler=scheduler, metrics=metrics)
+        services.append((svc, client))
+        return svc, scheduler, metrics, server
+
+    yield make
+    for svc, client in services:
+        for turn in list(svc._turns.values()):
+            turn.cancel()
+            if turn.task is not None:
+                await asyncio.wait((turn.task,))
+        await client.aclose()
+
+
+def _cancelled_in(metrics: MetricsRegistry, stage: str) -> int:
+    return metrics.histogram("chat_cancel_seconds").count({"model": MODEL, "stage": stage})
+
+
+async def test_cancel_while_queued_leaves_the_queue(chat, repo):
+    svc, scheduler, metrics, _ = await chat(tokens_per_second=20, response_tokens=200)
+    busy = await repo.create_session("busy", MODEL)
+    queued = await repo.create_session("queued", MODEL)
+    first = _consume(svc, busy.id, "first")
+    await _until_stage(svc, "first", "streaming")
+    second = _consume(svc, queued.id, "second")
+    await _until_stage(svc, "second", "queued")
+
+    assert await svc.cancel(request_id="second") == 1
+    await second.task
+
+    assert second.chunks == []
+    assert scheduler.position(str(queued.id)) is None
+    assert scheduler.stats().queued == 0
+    # Never admitted: nothing was saved
+    assert (await repo.get_session(queued.id)).messages == []
+    assert _cancelled_in(metrics, "queued") == 1
+    assert not first.task.done()
+
+
+async def test_cancel_while_preparing_skips_the_model(chat, repo, monkeypatch):
+    svc, scheduler, metrics, server = await chat()
+    session = await repo.create_session("t", MODEL)
+    load = repo.get_session
+
+    async def slow_get_session(session_id: UUID):
+        await asyncio.sleep(0.2)
+        return await load(session_id)
+
+    monkeypatch.setattr(repo, "get_session", slow_get_session)
+    turn = _consume(svc, session.id, "turn")
+    await _until_stage(svc, "turn", "preparing")
+
+    assert await svc.cancel(request_id="turn") == 1
+    await turn.task
+    monkeypatch.undo()
+
+    assert turn.chunks == []
+    assert server.loaded == set()  # /api/chat was never called
+    assert scheduler.stats().active == 0
+    # The user message was written before the cancel; no reply follows
+    saved = (await repo.get_session(session.id)).messages
+    assert [m.role for m in saved] == [Role.USER]
+    assert _cancelled_in(metrics, "preparing") == 1
+
+
+async def test_cancel_while_waiting_for_the_first_token(chat, repo):
+    svc, scheduler, metrics, _ = await chat(prompt_latency=10)
+    session = await repo.create_session("t", MODEL)
+    turn = _consume(svc, session.id, "turn")
+    await _until_stage(svc, "turn", "waiting")
+
+    started = time.perf_counter()
+    assert await svc.cancel(session_id=session.id) == 1
+    await turn.task
+
+    assert time.perf_counter() - started < 1
+    assert turn.chunks == []
+    assert scheduler.stats().active == 0
+    saved = (await repo.get_session(session.id)).messages
+    assert [m.role for m in saved] == [Role.USER]
+    assert _cancelled_in(metrics, "waiting") == 1
+
+
+async def test_cancel_while_streaming_saves_the_partial_reply(chat, repo):
+    svc, scheduler, metrics, _ = await chat(tokens_per_second=20, response_tokens=200)
+    session = await repo.create_session("t", MODEL)
+    other = await repo.create_session("other", MODEL)
+    turn = _consume(svc, session.id, "turn")
+    await _until_stage(svc, "turn", "streaming")
+    await asyncio.sleep(0.2)
+    next_turn = _consume(svc, other.id, "next")
+    await _until_stage(svc, "next", "queued")
+
+    assert await svc.cancel(request_id="turn") == 1
+    await turn.task
+
+    # The slot goes to the queued turn
+    await _until_stage(svc, "next", "waiting")
+    assert scheduler.stats().active == 1
+    saved = (await repo.get_session(session.id)).messages
+    assert [m.role for m in saved] == [Role.USER, Role.ASSISTANT]
+    reply = saved[-1]
+    assert reply.metadata["cancelled"] is True
+    assert reply.content == "".join(turn.chunks)
+    assert 0 < len(turn.chunks) < 200
+    assert _cancelled_in(metrics, "streaming") == 1
+
+    await svc.cancel(request_id="next")
+    await next_turn.task
+    assert scheduler.stats().active == 0
+
+
+async def test_cancel_without_a_match_stops_nothing(chat, repo):
+    svc, _, _, _ = await chat()
+    assert await svc.cancel(request_id="missing") == 0
+    with pytest.raises(ValueError):
+        await svc.cancel()
+
+
+async def test_slow_reader_holds_back_generation(chat, repo):
+    svc, _, _, _ = await chat(tokens_per_second=1000, response_tokens=200)
+    session = await repo.create_session("t", MODEL)
+    stream = svc.stream_chat(session.id, "hi", MODEL, request_id="turn")
+
+    first = await anext(stream)
+    await asyncio.sleep(0.5)  # long enough to generate all 200 tokens
+
+    # The turn waits for the reader instead of buffering the rest
+    assert svc._turns["turn"].stage == "streaming"
+    assert [m.role for m in (await repo.get_session(session.id)).messages] == [Role.USER]
+    rest = [chunk async for chunk in stream]
+    reply = (await repo.get_session(session.id)).messages[-1]
+    assert reply.content == first + "".join(rest)
+    assert "cancelled" not in reply.metadata
+
+
+async def test_closing_a_stream_with_a_full_buffer_does_not_hang(chat, repo):
+    svc, scheduler, _, _ = await chat(tokens_per_second=1000, response_tokens=200)
+    session = await repo.create_session("t", MODEL)
+    stream = svc.stream_chat(session.id, "hi", MODEL, request_id="turn")
+    await anext(stream)
+    await asyncio.sleep(0.2)  # the buffer fills up
+
+    async with asyncio.timeout(2):
+        await stream.aclose()
+
+    assert "turn" not in svc._turns
+    assert scheduler.stats().active == 0
+    reply = (await repo.get_session(session.id)).messages[-1]
+    assert reply.metadata["cancelled"] is True
@@ -0,0 +1,140 @@
+import asyncio
+import sqlite3
+import time
+from itertools import pairwise
+
+from adapters.ollama_client import OllamaClient
+from domain.entities import Message, PageCursor, Role
+
+
+async def test_streams_keep_flowing_while_the_database_is_locked(repo, fake_ollama, tmp_path):
+    session = await repo.create_session("t", "fake:latest")
+    server = await fake_ollama(tokens_per_second=100, response_tokens=100)
+    client = OllamaClient(server.base_url)
+
+    # Another process holds the write lock for half a second
+    lock_holder = sqlite3.connect(tmp_path / "chat.db", isolation_level=None)
+    lock_holder.execute("BEGIN EXCLUSIVE")
+    asyncio.get_running_loop().call_later(0.5, lock_holder.rollback)
+
+    async def write() -> float:
+        started = time.perf_counter()
+        await repo.add_message(session.id, Message(role=Role.USER, content="hello"))
+        return time.perf_counter() - started
+
+    async def stream() -> list[float]:
+        arrivals = []
+        async for _ in client.chat_stream("fake:latest", [Message(role=Role.USER, content="hi")]):
+            arrivals.append(time.perf_counter())
+        return arrivals
+
+    try:
+        write_time, arrivals = await asyncio.gather(write(), stream())
+    finally:
+        lock_holder.close()
+        await client.aclose()
+
+    # The write waited for the lock, while tokens kept arriving 10 ms apart
+    assert write_time >= 0.4
+    assert len(arrivals) == 100
+    assert max(b - a for a, b in pairwise(arrivals)) < 0.1
+    saved = (await repo.get_session(session.id)).messages
+    assert [m.content for m in saved] == ["hello"]
+
+
+async def _say(repo, session_id, *contents: str) -> list[Message]:
+    messages = [Message(role=Role.USER, content=content) for content in contents]
+    for message in messages:
+        await repo.add_message(session_id, message)
+    return messages
+
+
+async def _history(repo, session_id) -> list[str]:
+    return [m.content for m in (await repo.get_session(session_id)).messages]
+
+
+async def _stored(repo) -> list[str]:
+    return sorted([m.content async for _, m in repo.stream_messages()])
+
+
+async def test_fork_shares_history_then_diverges(repo):
+    original = await repo.create_session("t", "m")
+    _, answer, _ = await _say(repo, original.id, "q1", "a1", "q2")
+
+    whole = await repo.fork_session(original.id)
+    early = await repo.fork_session(original.id, message_id=answer.id, title="early")
+    assert await _history(repo, whole.id) == ["q1", "a1", "q2"]
+    assert await _history(repo, early.id) == ["q1", "a1"]
+    assert (early.title, early.forked_from_id) == ("early", answer.id)
+
+    await _say(repo, original.id, "original")
+    await _say(repo, whole.id, "whole")
+    await _say(repo, early.id, "early")
+
+    assert await _history(repo, original.id) == ["q1", "a1", "q2", "original"]
+    assert await _history(repo, whole.id) == ["q1", "a1", "q2", "whole"]
+    assert await _history(repo, early.id) == ["q1", "a1", "early"]
+    # Forking copied nothing
+    assert len(await _stored(repo)) == 6
+
+
+async def test_fork_of_a_fork(repo):
+    original = await repo.create_session("t", "m")
+    await _say(repo, original.id, "q1", "a1")
+    fork = await repo.fork_session(original.id)
+    await _say(repo, fork.id, "b1")
+    grandchild = await repo.fork_session(fork.id)
+    await _say(repo, grandchild.id, "c1")
+
+    assert await _history(repo, original.id) == ["q1", "a1"]
+    assert await _history(repo, fork.id) == ["q1", "a1", "b1"]
+    assert await _history(repo, grandchild.id) == ["q1", "a1", "b1", "c1"]
+
+
+async def test_deleting_the_original_keeps_the_forks_history(repo):
+    original = await repo.create_session("t", "m")
+    _, m2, _ = await _say(repo, original.id, "m1", "m2", "m3")
+    early = await repo.fork_session(original.id, message_id=m2.id)
+    late = await repo.fork_session(original.id)
+    await _say(repo, early.id, "early")
+    await _say(repo, original.id, "unshared")
+
+    await repo.delete_session(original.id)
+
+    assert await repo.get_session(original.id) is None
+    assert await _history(repo, early.id) == ["m1", "m2", "early"]
+    assert await _history(repo, late.id) == ["m1", "m2", "m3"]
+    assert await _stored(repo) == ["early", "m1", "m2", "m3"]
+
+    # m1 and m2 went to the older fork, which `late` still builds on
+    await repo.delete_session(early.id)
+
+    assert await _history(repo, late.id) == ["m1", "m2", "m3"]
+    assert await _stored(repo) == ["m1", "m2", "m3"]
+
+
+async def test_deleting_a_fork_leaves_its_parent_alone(repo):
+    original = await repo.create_session("t", "m")
+    await _say(repo, original.id, "q1", "a1")
+    fork = await repo.fork_session(original.id)
+    await _say(repo, fork.id, "mine")
+
+    await repo.delete_session(fork.id)
+
+    assert await repo.get_session(fork.id) is None
+    assert await _history(repo, original.id) == ["q1", "a1"]
+    assert await _stored(repo) == ["a1", "q1"]
+
+
+async def test_get_messages_pages_back_across_the_fork_point(repo):
+    original = await repo.create_session("t", "m")
+    shared = await _say(repo, original.id, *(f"m{i}" for i in range(6)))
+    fork = await repo.fork_session(original.id, message_id=shared[3].id)
+    await _say(repo, fork.id, *(f"b{i}" for i in range(4)))
+
+    pages, before = [], None
+    while page := await repo.get_messages(fork.id, before=before, limit=3):
+        pages.append([m.content for m in page])
+        before = PageCursor(timestamp=page[0].created_at, id=page[0].id)
+
+    assert pages == [["b1", "b2", "b3"], ["m2", "m3", "b0"], ["m0", "m1"]]
@@ -0,0 +1,30 @@
+from adapters.document_store import SqlAlchemyDocumentStore
+from domain.entities import DocumentChunk
+
+
+def _chunk(row: int, document_id, content: str) -> DocumentChunk:
+    return DocumentChunk(
+        id=row,
+        document_id=document_id,
+        source="",
+        ordinal=row,
+        content=content,
+        content_hash=f"hash-{content}",
+    )
+
+
+async def test_chunk_stored_concurrently_does_not_fail_the_batch(repo):
+    store = SqlAlchemyDocumentStore(session_factory=repo._session_factory)
+    ours = await store.begin_document("ours.md", "a")
+    theirs = await store.begin_document("theirs.md", "b")
+
+    # Another process stores "shared" between our dedup check and our insert
+    assert await store.existing_chunk_hashes(["hash-shared"]) == set()
+    await store.add_chunks([_chunk(0, theirs, "shared")])
+    await store.add_chunks([_chunk(1, ours, "shared"), _chunk(2, ours, "own")])
+
+    chunks = await store.get_chunks([0, 1, 2])
+    assert sorted((c.id, c.source, c.content) for c in chunks) == [
+        (0, "theirs.md", "shared"),
+        (2, "ours.md", "own"),
+    ]
@@ -0,0 +1,50 @@
+import logging
+from uuid import UUID
+
+from adapters.ollama_client import OllamaClient
+from infra.logging import CorrelationFilter
+from services.chat_services import ChatService
+
+
+class _Records(logging.Handler):
+    """Collects records after the correlation filter has run, as the queue handler does."""
+
+    def __init__(self):
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+        self.addFilter(CorrelationFilter())
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+async def test_records_logged_during_a_turn_carry_its_ids(repo, fake_ollama, monkeypatch):
+    server = await fake_ollama()
+    client = OllamaClient(server.base_url)
+    svc = ChatService(client, repo)
+    session = await repo.create_session("t", "fake:latest")
+    load = repo.get_session
+
+    async def logged_get_session(session_id: UUID):
+        logging.getLogger("tests.repo").warning("loading history")
+        return await load(session_id)
+
+    monkeypatch.setattr(repo, "get_session", logged_get_session)
+    handler = _Records()
+    logging.getLogger().addHandler(handler)
+    try:
+        async for _ in svc.stream_chat(session.id, "hi", "fake:latest", request_id="req-1"):
+            pass
+        logging.getLogger("tests.repo").warning("after the turn")
+    finally:
+        logging.getLogger().removeHandler(handler)
+        await client.aclose()
+
+    during, after = (
+        next(r for r in handler.records if r.getMessage() == message)
+        for message in ("loading history", "after the turn")
+    )
+    assert during.request_id == "req-1"
+    assert during.session_id == str(session.id)
+    assert after.request_id is None
+    assert after.session_id is None
@@ -0,0 +1,131 @@
+import pytest
+from sqlalchemy import update
+
+from adapters.orm import MessageModel
+from adapters.write_behind import WriteBehindChatRepository
+from domain.entities import Message, Role
+from services.chat_services import ChatService
+
+
+async def _say(repo, session_id, *contents: str) -> list[Message]:
+    messages = [Message(role=Role.USER, content=content) for content in contents]
+    for message in messages:
+        await repo.add_message(session_id, message)
+    return messages
+
+
+async def _found(repo, query: str, **kwargs) -> list[str]:
+    hits = await repo.search_messages(query, **kwargs)
+    return sorted(str(hit.message_id) for hit in hits)
+
+
+def _ids(*messages: Message) -> list[str]:
+    return sorted(str(m.id) for m in messages)
+
+
+async def test_hits_are_ranked_with_highlighted_snippets(repo):
+    session = await repo.create_session("Pets", "m")
+    once, often, _ = await _say(
+        repo,
+        session.id,
+        "my neighbour has a parrot and a very old dog that sleeps all day",
+        "parrot parrot parrot",
+        "nothing to see here",
+    )
+
+    hits = await repo.search_messages("parrot")
+
+    assert [hit.message_id for hit in hits] == [often.id, once.id]
+    assert hits[0].rank <= hits[1].rank
+    assert "**parrot**" in hits[1].snippet
+    assert (hits[0].session_id, hits[0].session_title, hits[0].role) == (
+        session.id,
+        "Pets",
+        Role.USER,
+    )
+    # The last term matches as a prefix
+    assert await _found(repo, "neighbour parr") == _ids(once)
+
+
+async def test_pages_cover_every_hit_once(repo):
+    session = await repo.create_session("t", "m")
+    messages = await _say(repo, session.id, *(f"kiwi {'kiwi ' * i}note {i}" for i in range(5)))
+    svc = ChatService(None, repo)  # type: ignore[arg-type]
+
+    seen, ranks, cursor = [], [], None
+    while True:
+        page = await svc.search_messages("kiwi", limit=2, cursor=cursor)
+        seen += [hit.message_id for hit in page.items]
+        ranks += [hit.rank for hit in page.items]
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+
+    assert sorted(str(i) for i in seen) == _ids(*messages)
+    assert ranks == sorted(ranks)
+    assert len(await repo.search_messages("kiwi", limit=2, offset=4)) == 1
+
+
+async def test_session_filter(repo):
+    first = await repo.create_session("first", "m")
+    second = await repo.create_session("second", "m")
+    (mine,) = await _say(repo, first.id, "mango smoothie")
+    (theirs,) = await _say(repo, second.id, "mango chutney")
+
+    assert await _found(repo, "mango") == _ids(mine, theirs)
+    assert await _found(repo, "mango", session_id=first.id) == _ids(mine)
+    assert await _found(repo, "mango", session_id=second.id) == _ids(theirs)
+
+
+@pytest.mark.parametrize(
+    ("query", "matches"),
+    [
+        ('"fox', True),  # unbalanced quote
+        ('say "fox" twice', False),  # quotes are literal, not a phrase
+        ("fox*", True),
+        ("*", False),
+        ("NEAR", True),  # a word, not the NEAR operator
+        ("NEAR(fox well)", False),
+        ("-fox", True),  # a word, not NOT
+        ("fox -well", True),
+        ("fox OR zebra", False),  # OR is a word that no message contains
+        ("", False),
+        ("   ", False),
+    ],
+)
+async def test_fts_syntax_in_user_input_is_quoted(repo, query, matches):
+    session = await repo.create_session("t", "m")
+    (message,) = await _say(repo, session.id, "the fox ran near the well - twice")
+
+    assert await _found(repo, query) == (_ids(message) if matches else [])
+
+
+async def test_index_follows_inserts_updates_and_deletes(repo):
+    session = await repo.create_session("t", "m")
+    (message,) = await _say(repo, session.id, "original wording")
+    assert await _found(repo, "original") == _ids(message)
+
+    async with repo._session_factory() as db:
+        await db.execute(
+            update(MessageModel)
+            .where(MessageModel.id == str(message.id))
+            .values(content="revised wording")
+        )
+        await db.commit()
+    assert await _found(repo, "original") == []
+    assert await _found(repo, "revised") == _ids(message)
+    assert await _found(repo, "wording") == _ids(message)
+
+    await repo.delete_session(session.id)
+    assert await _found(repo, "wording") == []
+
+
+async def test_messages_written_through_write_behind_are_indexed(repo):
+    session = await repo.create_session("t", "m")
+    wb = WriteBehindChatRepository(repo, repo, max_delay=60)
+    messages = await _say(wb, session.id, "batched papaya", "batched guava", "batched papaya")
+
+    # Searching flushes the buffer first
+    assert await _found(wb, "papaya") == _ids(messages[0], messages[2])
+    assert await _found(repo, "batched") == _ids(*messages)
+    await wb.close()
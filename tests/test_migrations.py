@@ -0,0 +1,60 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The history and session-list queries, on columns every revision has
+HISTORY = (
+    "SELECT id, role, content, created_at FROM messages "
+    "WHERE session_id = 'x' ORDER BY created_at, id"
+)
+SESSION_LIST = (
+    "SELECT id, title, updated_at FROM chat_sessions ORDER BY updated_at DESC, id DESC LIMIT 50"
+)
+
+
+def _migrate(database: Path, *args: str) -> None:
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database}"}
+    subprocess.run(
+        [sys.executable, "-m", "alembic", *args], cwd=ROOT, env=env, check=True, capture_output=True
+    )
+
+
+def _plan(database: Path, query: str) -> str:
+    with sqlite3.connect(database) as conn:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+
+@pytest.fixture
+def database(tmp_path: Path) -> Path:
+    return tmp_path / "migrated.db"
+
+
+def test_002_indexes_serve_history_and_session_list(database):
+    _migrate(database, "upgrade", "001")
+    history, sessions = _plan(database, HISTORY), _plan(database, SESSION_LIST)
+    # Before: the rows are found by session_id, then sorted
+    assert "USING INDEX ix_messages_session_id (" in history
+    assert "USE TEMP B-TREE FOR ORDER BY" in history
+    assert "USE TEMP B-TREE FOR ORDER BY" in sessions
+
+    _migrate(database, "upgrade", "002")
+    history, sessions = _plan(database, HISTORY), _plan(database, SESSION_LIST)
+    # After: both read in index order, no sort
+    assert "ix_messages_session_id_created_at" in history
+    assert "TEMP B-TREE" not in history
+    assert "ix_chat_sessions_updated_at_id" in sessions
+    assert "TEMP B-TREE" not in sessions
+
+
+def test_002_downgrade_restores_the_session_id_index(database):
+    _migrate(database, "upgrade", "002")
+    _migrate(database, "downgrade", "001")
+    history = _plan(database, HISTORY)
+    assert "USING INDEX ix_messages_session_id (" in history
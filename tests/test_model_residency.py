@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from services.model_residency import ModelResidencyManager
+
+
+class _Ollama:
+    """/api/ps as a mutable list of loaded model names."""
+
+    def __init__(self, *loaded: str):
+        self.loaded = list(loaded)
+        self.ps_calls = 0
+
+    async def list_running_models(self) -> list[dict]:
+        self.ps_calls += 1
+        return [{"name": name, "size_vram": 1000} for name in self.loaded]
+
+
+async def _settle() -> None:
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+async def test_request_does_not_mark_an_unloaded_model_resident():
+    ollama = _Ollama()
+    residency = ModelResidencyManager(ollama)
+    await residency.refresh()
+
+    # The model failed to load: /api/ps still does not list it
+    assert residency.begin_request("llama3") is True
+    residency.end_request("llama3")
+    await _settle()
+
+    assert not residency.is_resident("llama3")
+    assert residency.begin_request("llama3") is True
+    residency.end_request("llama3")
+    await residency.stop()
+
+
+async def test_model_loaded_by_a_request_is_confirmed_without_waiting_for_the_poll():
+    ollama = _Ollama()
+    residency = ModelResidencyManager(ollama, poll_interval=3600)
+    await residency.start()
+
+    assert residency.begin_request("llama3") is True
+    ollama.loaded.append("llama3:latest")  # Ollama loaded it to answer
+    residency.end_request("llama3")
+    await _settle()
+
+    assert residency.is_resident("llama3")
+    assert residency.resident["llama3:latest"].size == 1000
+    assert residency.begin_request("llama3:latest") is False
+    residency.end_request("llama3:latest")
+    await residency.stop()
+
+
+async def test_requests_for_resident_models_do_not_poll():
+    ollama = _Ollama("llama3:latest")
+    residency = ModelResidencyManager(ollama)
+    await residency.refresh()
+
+    for _ in range(3):
+        assert residency.begin_request("llama3") is False
+        residency.end_request("llama3")
+    await _settle()
+
+    assert ollama.ps_calls == 1
+
+
+@pytest.mark.parametrize(
+    ("configured", "requested"),
+    [("llama3", "llama3:latest"), ("llama3:latest", "llama3"), ("llama3", "llama3")],
+)
+def test_keep_alive_applies_under_either_name(configured, requested):
+    residency = ModelResidencyManager(
+        _Ollama(), default_keep_alive="5m", keep_alive={configured: "1h", "llama3:8b": "0"}
+    )
+
+    assert residency.keep_alive_for(requested) == "1h"
+    assert residency.keep_alive_for("llama3:8b") == "0"
+    assert residency.keep_alive_for("mistral") == "5m"
@@ -0,0 +1,67 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+
+import pytest
+
+from adapters.ollama_client import OllamaClient
+from domain.entities import Message, Role
+from domain.exceptions import LLMTimeoutError
+from services.stream_coalescer import TokenCoalescer
+
+MESSAGES = [Message(role=Role.USER, content="hi")]
+
+
+@pytest.fixture(params=[False, True], ids=["plain", "coalesced"])
+def coalesce(request: pytest.FixtureRequest) -> bool:
+    return bool(request.param)
+
+
+def _stream(client: OllamaClient, coalesce: bool) -> AsyncIterator[str]:
+    stream = client.chat_stream("fake:latest", MESSAGES)
+    # The coalescer reads every chunk from a new task
+    return TokenCoalescer(max_delay=0.01)(stream) if coalesce else stream
+
+
+async def _drain(stream: AsyncIterator[str], pause: float = 0.0) -> str:
+    chunks = []
+    async for chunk in stream:
+        chunks.append(chunk)
+        await asyncio.sleep(pause)
+    return "".join(chunks)
+
+
+async def test_stalled_stream_times_out(fake_ollama, coalesce):
+    # One token, then nothing for 10 seconds
+    server = await fake_ollama(tokens_per_second=0.1, response_tokens=3)
+    client = OllamaClient(server.base_url, read_timeout=0.3, first_byte_timeout=5)
+    started = time.perf_counter()
+    try:
+        with pytest.raises(LLMTimeoutError):
+            await asyncio.wait_for(_drain(_stream(client, coalesce)), timeout=5)
+    finally:
+        await client.aclose()
+    assert time.perf_counter() - started < 2
+
+
+async def test_no_first_byte_times_out(fake_ollama, coalesce):
+    server = await fake_ollama(prompt_latency=10)
+    client = OllamaClient(server.base_url, read_timeout=5, first_byte_timeout=0.3)
+    started = time.perf_counter()
+    try:
+        with pytest.raises(LLMTimeoutError):
+            await asyncio.wait_for(_drain(_stream(client, coalesce)), timeout=5)
+    finally:
+        await client.aclose()
+    assert time.perf_counter() - started < 2
+
+
+async def test_slow_consumer_does_not_time_out(fake_ollama, coalesce):
+    server = await fake_ollama(tokens_per_second=1000, response_tokens=3)
+    client = OllamaClient(server.base_url, read_timeout=0.2, first_byte_timeout=2)
+    try:
+        # Each pause outlasts read_timeout: the reader's own time must not count
+        text = await _drain(_stream(client, coalesce), pause=0.5)
+    finally:
+        await client.aclose()
+    assert text == "tok0 tok1 tok2 "
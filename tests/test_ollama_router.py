@@ -0,0 +1,63 @@
+from datetime import datetime
+
+from adapters.ollama_router import OllamaRouter
+from domain.entities import Message, ModelInfo, Role
+
+
+class _Node:
+    """Just enough of an OllamaClient: /api/ps, /api/tags and a one-chunk chat."""
+
+    def __init__(self, url: str, running: tuple[str, ...] = (), installed: tuple[str, ...] = ()):
+        self.base_url = url
+        self.running = list(running)
+        self.installed = list(installed)
+        self.chats = 0
+
+    async def list_running_models(self) -> list[dict]:
+        return [{"name": name} for name in self.running]
+
+    async def list_models(self) -> list[ModelInfo]:
+        return [
+            ModelInfo(name=name, size=1, digest="d", modified_at=datetime(2024, 1, 1))
+            for name in self.installed
+        ]
+
+    async def chat_stream(self, model, messages, options=None, keep_alive=None, stats=None):
+        self.chats += 1
+        yield "hi"
+
+
+async def _chat(router: OllamaRouter, model: str) -> None:
+    async for _ in router.chat_stream(model, [Message(role=Role.USER, content="hi")]):
+        pass
+
+
+async def test_untagged_name_routes_to_the_node_with_the_model_resident():
+    idle, loaded = _Node("http://a"), _Node("http://b", running=("llama2:latest",))
+    router = OllamaRouter([idle, loaded])
+    await router.refresh()
+
+    assert router.candidates("llama2")[0].client is loaded
+    await _chat(router, "llama2")
+    assert (idle.chats, loaded.chats) == (0, 1)
+
+
+async def test_untagged_name_prefers_the_node_with_the_model_installed():
+    bare, stocked = _Node("http://a"), _Node("http://b", installed=("llama2:latest",))
+    router = OllamaRouter([bare, stocked])
+    await router.list_models()
+
+    assert router.candidates("llama2")[0].client is stocked
+    assert router.candidates("llama2:latest")[0].client is stocked
+
+
+async def test_chat_records_the_model_as_resident_under_its_full_name():
+    first, second = _Node("http://a"), _Node("http://b")
+    router = OllamaRouter([first, second])
+
+    await _chat(router, "llama2")
+
+    assert router.nodes[0].resident == {"llama2:latest"}
+    # The next chat, under either name, sticks to the node that loaded it
+    second_chat = router.candidates("llama2:latest")[0]
+    assert second_chat.client is first
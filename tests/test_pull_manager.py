@@ -0,0 +1,36 @@
+import logging
+
+import pytest
+
+from domain.exceptions import LLMPullError
+from services.pull_manager import PullManager
+
+
+class _Backend:
+    """Streams one progress line, then fails the way a malformed line would."""
+
+    def __init__(self):
+        self.pulls = 0
+
+    async def pull_model(self, name: str):
+        self.pulls += 1
+        yield {"status": "pulling manifest"}
+        raise KeyError("digest")
+
+
+async def test_unexpected_error_ends_every_stream_with_an_error(caplog):
+    backend = _Backend()
+    pulls = PullManager(backend, progress_interval=0)
+    seen = []
+
+    with caplog.at_level(logging.ERROR, logger="services.pull_manager"):
+        with pytest.raises(LLMPullError, match="KeyError"):
+            async for progress in pulls.pull("llama3"):
+                seen.append(progress)
+
+    assert seen[-1]["status"] == "error"
+    assert "KeyError" in seen[-1]["error"]
+    assert backend.pulls == 1  # a bug is not retried
+    assert pulls.active() == {}
+    (record,) = [r for r in caplog.records if "failed unexpectedly" in r.getMessage()]
+    assert record.exc_info is not None
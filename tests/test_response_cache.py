@@ -0,0 +1,75 @@
+import logging
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+import pytest
+
+from adapters.response_cache import ResponseCachingLLMClient
+from domain.entities import Message, ModelInfo, Role
+
+GREEDY = {"temperature": 0}
+MESSAGES = [Message(role=Role.USER, content="hi")]
+
+
+class _Backend:
+    """Just enough of an LLMClient: lists models and counts generations."""
+
+    def __init__(self, *models: ModelInfo):
+        self.models = list(models)
+        self.generations = 0
+
+    async def list_models(self) -> list[ModelInfo]:
+        return self.models
+
+    async def chat_stream(self, model, messages, options=None, keep_alive=None, stats=None):
+        self.generations += 1
+        for chunk in ("Hello", " there"):
+            yield chunk
+
+
+def _model(name: str, digest: str = "sha256:abc") -> ModelInfo:
+    return ModelInfo(name=name, size=1, digest=digest, modified_at=datetime(2024, 1, 1))
+
+
+async def _reply(stream: AsyncIterator[str]) -> str:
+    return "".join([chunk async for chunk in stream])
+
+
+@pytest.mark.parametrize(
+    ("name", "full"),
+    [
+        ("llama3", "llama3:latest"),
+        ("llama3:8b", "llama3:8b"),
+        ("library/llama3", "library/llama3:latest"),
+        ("registry.local:5000/team/llama3", "registry.local:5000/team/llama3:latest"),
+    ],
+)
+def test_full_model_name(name, full):
+    assert ModelInfo.full_name(name) == full
+
+
+@pytest.mark.parametrize("requested", ["llama3", "llama3:latest"])
+async def test_untagged_and_tagged_names_share_the_cache(requested):
+    backend = _Backend(_model("llama3:latest"))
+    client = ResponseCachingLLMClient(backend)
+
+    assert await _reply(client.chat_stream("llama3", MESSAGES, GREEDY)) == "Hello there"
+    assert await _reply(client.chat_stream(requested, MESSAGES, GREEDY)) == "Hello there"
+
+    assert backend.generations == 1
+    assert client.stats.hits == 1
+    assert client.stats.bypassed == 0
+
+
+async def test_model_without_digest_is_reported_once(caplog):
+    backend = _Backend(_model("other:latest"))
+    client = ResponseCachingLLMClient(backend)
+
+    with caplog.at_level(logging.WARNING, logger="adapters.response_cache"):
+        for _ in range(3):
+            await _reply(client.chat_stream("llama3", MESSAGES, GREEDY))
+
+    assert backend.generations == 3
+    assert client.stats.bypassed == 3
+    warnings = [r for r in caplog.records if "No digest" in r.getMessage()]
+    assert len(warnings) == 1
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from domain.exceptions import LLMQueueFullError
+from services.scheduler import RequestScheduler
+
+MODEL = "llama3"
+
+
+async def _queue_up(
+    scheduler: RequestScheduler, order: list[str], *requests: tuple[str, str, int]
+) -> list["asyncio.Task[None]"]:
+    """Queue (name, key, priority) requests in this order; each records its name when admitted."""
+
+    async def request(name: str, key: str, priority: int) -> None:
+        async with scheduler.slot(MODEL, key, priority):
+            order.append(name)
+
+    tasks = []
+    for name, key, priority in requests:
+        tasks.append(asyncio.create_task(request(name, key, priority)))
+        await asyncio.sleep(0)  # enqueued before the next one
+    return tasks
+
+
+async def test_round_robin_across_keys():
+    scheduler = RequestScheduler(concurrency=1)
+    holder = await scheduler.acquire(MODEL, "busy")
+    order: list[str] = []
+    tasks = await _queue_up(
+        scheduler,
+        order,
+        ("a1", "a", 0),
+        ("a2", "a", 0),
+        ("a3", "a", 0),
+        ("b1", "b", 0),
+        ("c1", "c", 0),
+        ("b2", "b", 0),
+    )
+    assert scheduler.position("b") == 2
+    assert scheduler.position("c") == 3
+
+    scheduler.release(holder)
+    await asyncio.gather(*tasks)
+
+    # One turn per session, in arrival order of the sessions
+    assert order == ["a1", "b1", "c1", "a2", "b2", "a3"]
+    assert scheduler.stats().active == 0
+
+
+async def test_higher_priority_goes_first():
+    scheduler = RequestScheduler(concurrency=1)
+    holder = await scheduler.acquire(MODEL, "busy")
+    order: list[str] = []
+    tasks = await _queue_up(scheduler, order, ("low", "a", 0), ("high", "b", 5), ("normal", "c", 1))
+
+    scheduler.release(holder)
+    await asyncio.gather(*tasks)
+
+    assert order == ["high", "normal", "low"]
+
+
+async def test_full_queue_is_rejected_at_once():
+    scheduler = RequestScheduler(concurrency=1, max_queue=1)
+    holder = await scheduler.acquire(MODEL, "busy")
+    order: list[str] = []
+    (queued,) = await _queue_up(scheduler, order, ("queued", "a", 0))
+
+    with pytest.raises(LLMQueueFullError):
+        await scheduler.acquire(MODEL, "b")
+
+    assert scheduler.stats().rejected == 1
+    scheduler.release(holder)
+    await queued
+    assert order == ["queued"]
+
+
+async def test_waiting_past_max_wait_is_rejected():
+    scheduler = RequestScheduler(concurrency=1, max_wait=0.05)
+    holder = await scheduler.acquire(MODEL, "busy")
+
+    with pytest.raises(LLMQueueFullError):
+        await scheduler.acquire(MODEL, "a")
+
+    stats = scheduler.stats()
+    assert (stats.queued, stats.rejected, stats.active) == (0, 1, 1)
+    scheduler.release(holder)
+    assert scheduler.stats().active == 0
+
+
+async def test_per_model_concurrency_overrides_the_default():
+    scheduler = RequestScheduler(concurrency=3, model_concurrency={"big": 1})
+
+    small = [await scheduler.acquire("small", str(i)) for i in range(3)]
+    big = await scheduler.acquire("big", "a")
+    waiting = asyncio.create_task(scheduler.acquire("big", "b"))
+    await asyncio.sleep(0)
+
+    assert scheduler.depth("big") == 1
+    assert scheduler.depth("small") == 0
+    scheduler.release(big)
+    second = await waiting
+    assert second.granted_at is not None
+    for ticket in [*small, second]:
+        scheduler.release(ticket)
+    assert scheduler.stats().active == 0
+
+
+async def test_slot_granted_while_cancelled_passes_to_the_next_waiter():
+    scheduler = RequestScheduler(concurrency=1)
+    holder = await scheduler.acquire(MODEL, "busy")
+    first = asyncio.create_task(scheduler.acquire(MODEL, "a"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(scheduler.acquire(MODEL, "b"))
+    await asyncio.sleep(0)
+
+    # The slot goes to `first`, which is cancelled before it can run
+    scheduler.release(holder)
+    first.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    ticket = await asyncio.wait_for(second, timeout=1)
+    assert ticket.key == "b"
+    assert scheduler.stats().active == 1
+    scheduler.release(ticket)
+    assert scheduler.stats().active == 0
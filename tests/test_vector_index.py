@@ -0,0 +1,66 @@
+import asyncio
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from adapters.vector_index import MmapVectorIndex  # noqa: E402
+
+
+def _append_batches(
+    path: str, worker: int, batches: int, out: "multiprocessing.Queue[int]"
+) -> None:
+    index = MmapVectorIndex(path)
+    for batch in range(batches):
+        first = asyncio.run(index.add("m", [[float(worker), float(batch), 1.0]] * 2))
+        out.put(first)
+
+
+async def test_search_sees_rows_appended_by_another_index(tmp_path: Path):
+    path = str(tmp_path / "vectors.f32")
+    app, ingest = MmapVectorIndex(path), MmapVectorIndex(path)
+    assert await app.search([1.0, 0.0, 0.0], 5) == []
+
+    first = await ingest.add("m", [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+
+    assert first == 0
+    hits = await app.search([1.0, 0.0, 0.0], 1)
+    assert hits == [(0, pytest.approx(1.0))]
+    assert len(app) == 2
+    # Row ids continue from the file, not from this instance's last look
+    assert await app.add("m", [[0.0, 0.0, 1.0]]) == 2
+    assert await ingest.add("m", [[0.0, 0.0, 1.0]]) == 3
+
+
+def test_concurrent_processes_get_distinct_rows(tmp_path: Path):
+    path = str(tmp_path / "vectors.f32")
+    context = multiprocessing.get_context("spawn")
+    out: multiprocessing.Queue[int] = context.Queue()
+    workers = [
+        context.Process(target=_append_batches, args=(path, worker, 25, out)) for worker in range(3)
+    ]
+    for process in workers:
+        process.start()
+    firsts = sorted(out.get(timeout=30) for _ in range(75))
+    for process in workers:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    # Every batch of two got its own rows, with no gaps or overlaps
+    assert firsts == list(range(0, 150, 2))
+    assert len(MmapVectorIndex(path)) == 150
+
+
+async def test_partial_row_is_dropped_on_the_next_append(tmp_path: Path):
+    path = tmp_path / "vectors.f32"
+    index = MmapVectorIndex(str(path))
+    await index.add("m", [[1.0, 0.0, 0.0]])
+    with open(path, "ab") as f:
+        f.write(b"\1\2\3")  # an interrupted write
+
+    reopened = MmapVectorIndex(str(path))
+    assert len(reopened) == 1
+    assert await reopened.add("m", [[0.0, 1.0, 0.0]]) == 1
+    assert await reopened.search([0.0, 1.0, 0.0], 1) == [(1, pytest.approx(1.0))]
@@ -0,0 +1,147 @@
+import asyncio
+from collections.abc import Sequence
+from uuid import UUID
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from adapters.chat_repository import SqlAlchemyChatRepository
+from adapters.write_behind import WriteBehindChatRepository
+from domain.entities import Message, Role
+
+
+def _message(content: str) -> Message:
+    return Message(role=Role.USER, content=content)
+
+
+class _RejectingWriter:
+    """Writes through to the repository but fails every batch holding `poison`."""
+
+    def __init__(self, repo: SqlAlchemyChatRepository, poison: UUID):
+        self.repo = repo
+        self.poison = poison
+
+    async def add_messages(self, items: Sequence[tuple[UUID, Message]]) -> None:
+        if any(message.id == self.poison for _, message in items):
+            raise IntegrityError("INSERT INTO messages", {}, Exception("constraint failed"))
+        await self.repo.add_messages(items)
+
+
+class _OutageWriter:
+    """Writes through to the repository, but the database is locked while `down` is set."""
+
+    def __init__(self, repo: SqlAlchemyChatRepository):
+        self.repo = repo
+        self.down = True
+        self.calls = 0
+
+    async def add_messages(self, items: Sequence[tuple[UUID, Message]]) -> None:
+        self.calls += 1
+        if self.down:
+            raise OperationalError("INSERT INTO messages", {}, Exception("database is locked"))
+        await self.repo.add_messages(items)
+
+
+class _OutageRepository:
+    """The inner repository, locked by the same outage as the writer."""
+
+    def __init__(self, repo: SqlAlchemyChatRepository, writer: _OutageWriter):
+        self.repo = repo
+        self.writer = writer
+
+    async def add_message(self, session_id: UUID, message: Message) -> None:
+        await self.writer.add_messages([(session_id, message)])
+
+
+async def test_close_persists_every_buffered_message(repo):
+    wb = WriteBehindChatRepository(repo, repo, max_batch_size=3, max_delay=60)
+    session = await repo.create_session("t", "m")
+    for i in range(7):
+        await wb.add_message(session.id, _message(f"m{i}"))
+
+    await wb.close()
+
+    assert wb.pending == 0
+    loaded = await repo.get_session(session.id)
+    assert [m.content for m in loaded.messages] == [f"m{i}" for i in range(7)]
+
+
+async def test_reply_to_deleted_session_does_not_block_the_buffer(repo):
+    wb = WriteBehindChatRepository(repo, repo, max_delay=60)
+    gone = await repo.create_session("gone", "m")
+    kept = await repo.create_session("kept", "m")
+    await wb.delete_session(gone.id)
+
+    # A reply that finished after its session was deleted
+    await wb.add_message(gone.id, _message("late reply"))
+    await wb.add_message(kept.id, _message("hello"))
+    await wb.flush()
+
+    assert wb.pending == 0
+    loaded = await repo.get_session(kept.id)
+    assert [m.content for m in loaded.messages] == ["hello"]
+    assert loaded.head_id == loaded.messages[0].id
+    await wb.close()
+
+
+async def test_failing_message_is_isolated_and_dropped(repo):
+    session = await repo.create_session("t", "m")
+    bad = _message("bad")
+    writer = _RejectingWriter(repo, poison=bad.id)
+    wb = WriteBehindChatRepository(repo, writer, max_delay=0.01)
+    await wb.add_message(session.id, _message("before"))
+    await wb.add_message(session.id, bad)
+    await wb.add_message(session.id, _message("after"))
+
+    # The others are written; the bad one cannot be, so it is dropped
+    await wb.flush()
+
+    assert wb.pending == 0
+    assert wb.dropped == 1
+    loaded = await repo.get_session(session.id)
+    assert [m.content for m in loaded.messages] == ["before", "after"]
+    await wb.close()
+
+
+async def test_brief_outage_loses_nothing_and_backs_off(repo):
+    session = await repo.create_session("t", "m")
+    writer = _OutageWriter(repo)
+    wb = WriteBehindChatRepository(repo, writer, max_delay=0.01)
+    for i in range(5):
+        await wb.add_message(session.id, _message(f"m{i}"))
+
+    await asyncio.sleep(0.5)
+    # Retried after 10, 20, 40, 80, 160 ms... rather than every 10 ms
+    assert 3 <= writer.calls <= 8
+    assert wb.pending == 5
+    writer.down = False
+    await wb.close()
+
+    assert wb.dropped == 0
+    loaded = await repo.get_session(session.id)
+    assert [m.content for m in loaded.messages] == [f"m{i}" for i in range(5)]
+
+
+async def test_close_inserts_directly_when_the_batch_path_fails(repo):
+    session = await repo.create_session("t", "m")
+    wb = WriteBehindChatRepository(repo, _OutageWriter(repo), max_delay=60)
+    await wb.add_message(session.id, _message("last words"))
+
+    await wb.close()
+
+    assert wb.pending == 0
+    loaded = await repo.get_session(session.id)
+    assert [m.content for m in loaded.messages] == ["last words"]
+
+
+async def test_close_raises_and_keeps_the_messages_when_nothing_can_write(repo):
+    session = await repo.create_session("t", "m")
+    writer = _OutageWriter(repo)
+    wb = WriteBehindChatRepository(_OutageRepository(repo, writer), writer, max_delay=60)
+    await wb.add_message(session.id, _message("kept"))
+
+    with pytest.raises(OperationalError):
+        await wb.close()
+
+    assert wb.pending == 1
+    assert wb.dropped == 0
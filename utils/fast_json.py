@@ -0,0 +1,16 @@
+import json
+from typing import Any, Callable, Union
+
+JSONLoads = Callable[[Union[str, bytes]], Any]
+
+# Prefer orjson (several times faster on small NDJSON lines) when installed.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+# catching the stdlib exception whichever backend is active.
+try:
+    import orjson
+
+    loads: JSONLoads = orjson.loads
+    BACKEND = "orjson"
+except ImportError:  # pragma: no cover - depends on the environment
+    loads = json.loads
+    BACKEND = "json"